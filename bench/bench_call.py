@@ -0,0 +1,109 @@
+"""func_util.call 性能基准
+
+对比每次调用都解析签名的旧实现与缓存调用适配器的 `func_util.call`，
+覆盖普通函数、绑定方法以及不同参数个数的目标函数。
+
+结果以 JSON Lines 格式输出，每行一个 (目标函数, 实现) 的结果。
+
+用法：
+
+    python -m bench.bench_call
+    python -m bench.bench_call --calls 100000 --output bench_output.txt
+"""
+
+from inspect import signature
+from time import perf_counter
+from typing import Any, Callable, Iterable
+import argparse
+import json
+import sys
+
+from easy_pyoc.utils import func_util
+
+
+def legacy_call(target: Callable, *args, **kwargs) -> Any:
+    """缓存适配器之前的 `func_util.call` 实现"""
+    sig = signature(target)
+
+    _args = 0
+    _kwargs = {}
+    for param in sig.parameters.values():
+        if func_util.has_kwarg(target, param.name):
+            _kwargs[param.name] = kwargs.get(param.name, param.default)
+        else:
+            _args += 1
+    _args = args[:_args]
+
+    return target(*_args, **_kwargs)
+
+
+def _small(data, addr):
+    pass
+
+
+def _wide(a, b, c, d, e=None, f=None, *, g=None, h=None):
+    pass
+
+
+class _Handler:
+    def on_recv(self, data, addr, send_back=None):
+        pass
+
+
+TARGETS: dict[str, tuple[Callable, tuple, dict]] = {
+    'function[2]': (_small, (b'data', ('127.0.0.1', 8080), print), {}),
+    'function[8]': (_wide, (1, 2, 3, 4, 5, 6), {'g': 7, 'x': 8}),
+    'method[3]': (_Handler().on_recv, (b'data', ('127.0.0.1', 8080)), {'send_back': print}),
+}
+
+IMPLEMENTATIONS: dict[str, Callable[..., Any]] = {
+    'legacy': legacy_call,
+    'adapter': func_util.call,
+}
+
+
+def bench(impl: Callable[..., Any], target: Callable, args: tuple, kwargs: dict, calls: int) -> dict:
+    impl(target, *args, **kwargs)  # 预热，建立适配器缓存
+    start = perf_counter()
+    for _ in range(calls):
+        impl(target, *args, **kwargs)
+    elapsed = perf_counter() - start
+    return {'calls_per_sec': calls / elapsed, 'ns_per_call': elapsed / calls * 1e9}
+
+
+def run(targets: Iterable[str], implementations: Iterable[str], calls: int, repeat: int):
+    """运行基准，逐条产出结果"""
+    for target_name in targets:
+        target, args, kwargs = TARGETS[target_name]
+        for impl_name in implementations:
+            for i in range(repeat):
+                yield {
+                    'target': target_name,
+                    'implementation': impl_name,
+                    'calls': calls,
+                    'run': i,
+                    **bench(IMPLEMENTATIONS[impl_name], target, args, kwargs, calls),
+                }
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--targets', nargs='+', choices=list(TARGETS), default=list(TARGETS))
+    parser.add_argument('--implementations', nargs='+', choices=list(IMPLEMENTATIONS), default=list(IMPLEMENTATIONS))
+    parser.add_argument('--calls', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--output', help='输出文件，默认为标准输出')
+    args = parser.parse_args(argv)
+
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        for result in run(args.targets, args.implementations, args.calls, args.repeat):
+            out.write(json.dumps(result, ensure_ascii=False) + '\n')
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == '__main__':
+    main()
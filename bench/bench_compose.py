@@ -0,0 +1,125 @@
+"""func_util.compose 性能基准
+
+对比堆叠装饰器与使用 `compose` 合并后的调用开销，分别测量正常返回与抛出异常两种情况：
+
+- full: `profile`、`catch`、`log`、`hook`、`throttle` 全部堆叠，装饰器自身的开销占主要部分
+- light: `catch`、`hook`、`catch`，主要为包装层本身的开销
+
+结果以 JSON Lines 格式输出，每行一个 (装饰器组合, 场景, 形式) 的结果。
+
+用法：
+
+    python -m bench.bench_compose
+    python -m bench.bench_compose --calls 200000 --output bench_output.txt
+"""
+
+from time import perf_counter
+from typing import Callable, Iterable
+import argparse
+import json
+import sys
+
+from easy_pyoc.utils import func_util
+
+
+def _full() -> list[Callable[[Callable], Callable]]:
+    registry = func_util.LatencyRegistry()
+    return [
+        func_util.profile(name='bench', registry=registry),
+        func_util.catch(lambda msg, tb: None, rate_limit=1),
+        func_util.log(lambda msg: None),
+        func_util.hook(lambda mode, result, *args, **kwargs: None),
+        func_util.throttle(-1),
+    ]
+
+
+def _light() -> list[Callable[[Callable], Callable]]:
+    return [
+        func_util.catch(lambda msg, tb: None, rate_limit=1),
+        func_util.hook(lambda mode, result, *args, **kwargs: None),
+        func_util.catch(lambda msg, tb: None, is_raise=True, rate_limit=1),
+    ]
+
+
+STACKS: dict[str, Callable[[], list[Callable[[Callable], Callable]]]] = {
+    'full': _full,
+    'light': _light,
+}
+
+
+def _handler(data, addr, fail=False):
+    if fail:
+        raise ValueError(data)
+    return data
+
+
+def stacked(decorators: list[Callable[[Callable], Callable]]) -> Callable:
+    fn = _handler
+    for decorator in reversed(decorators):
+        fn = decorator(fn)
+    return fn
+
+
+def composed(decorators: list[Callable[[Callable], Callable]]) -> Callable:
+    return func_util.compose(*decorators)(_handler)
+
+
+FORMS: dict[str, Callable[[list], Callable]] = {
+    'stacked': stacked,
+    'compose': composed,
+}
+
+SCENARIOS: dict[str, tuple[tuple, dict]] = {
+    'return': ((b'data', ('127.0.0.1', 8080)), {}),
+    'raise': ((b'data', ('127.0.0.1', 8080)), {'fail': True}),
+}
+
+
+def bench(fn: Callable, args: tuple, kwargs: dict, calls: int) -> dict:
+    fn(*args, **kwargs)  # 预热
+    start = perf_counter()
+    for _ in range(calls):
+        fn(*args, **kwargs)
+    elapsed = perf_counter() - start
+    return {'calls_per_sec': calls / elapsed, 'ns_per_call': elapsed / calls * 1e9}
+
+
+def run(stacks: Iterable[str], scenarios: Iterable[str], forms: Iterable[str], calls: int, repeat: int):
+    """运行基准，逐条产出结果"""
+    for stack in stacks:
+        for scenario in scenarios:
+            args, kwargs = SCENARIOS[scenario]
+            for form in forms:
+                for i in range(repeat):
+                    yield {
+                        'stack': stack,
+                        'scenario': scenario,
+                        'form': form,
+                        'calls': calls,
+                        'run': i,
+                        **bench(FORMS[form](STACKS[stack]()), args, kwargs, calls),
+                    }
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--stacks', nargs='+', choices=list(STACKS), default=list(STACKS))
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--forms', nargs='+', choices=list(FORMS), default=list(FORMS))
+    parser.add_argument('--calls', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--output', help='输出文件，默认为标准输出')
+    args = parser.parse_args(argv)
+
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        for result in run(args.stacks, args.scenarios, args.forms, args.calls, args.repeat):
+            out.write(json.dumps(result, ensure_ascii=False) + '\n')
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == '__main__':
+    main()
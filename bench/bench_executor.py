@@ -0,0 +1,150 @@
+"""PriorityThreadPoolExecutor 性能基准
+
+与 `concurrent.futures.ThreadPoolExecutor` 对比以下场景：
+
+- submit: 提交吞吐量，只统计提交 N 个空任务的耗时
+- latency: 端到端延迟，逐个提交任务并等待结果
+- fanout: 大量小任务扇出，统计全部完成的耗时
+- mixed: 混合优先级任务，统计各优先级从提交到开始执行的平均等待时长
+
+结果以 JSON Lines 格式输出，每行一个 (场景, 执行器, 线程数) 的结果，便于比较队列实现或加锁方式的改动。
+
+用法：
+
+    python -m bench.bench_executor
+    python -m bench.bench_executor --workers 1 4 16 --tasks 5000 --output bench_output.txt
+"""
+
+from concurrent.futures import Executor, ThreadPoolExecutor, wait
+from time import perf_counter
+from typing import Callable, Iterable
+import argparse
+import json
+import random
+import statistics
+import sys
+
+from easy_pyoc.utils.thread_util import PriorityThreadPoolExecutor
+
+
+EXECUTORS: dict[str, Callable[[int], Executor]] = {
+    'ThreadPoolExecutor': lambda n: ThreadPoolExecutor(max_workers=n),
+    'PriorityThreadPoolExecutor[heap]': lambda n: PriorityThreadPoolExecutor(max_workers=n),
+    'PriorityThreadPoolExecutor[bucket]': lambda n: PriorityThreadPoolExecutor(max_workers=n, queue_backend='bucket'),
+}
+
+
+def _submit(executor: Executor, fn: Callable, *args, priority: int = 0):
+    if isinstance(executor, PriorityThreadPoolExecutor):
+        return executor.submit(fn, *args, priority=priority)
+    return executor.submit(fn, *args)
+
+
+def _noop():
+    pass
+
+
+def _percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def bench_submit(executor: Executor, tasks: int) -> dict:
+    start = perf_counter()
+    futures = [_submit(executor, _noop) for _ in range(tasks)]
+    elapsed = perf_counter() - start
+    wait(futures)
+    return {'ops_per_sec': tasks / elapsed, 'elapsed': elapsed}
+
+
+def bench_latency(executor: Executor, tasks: int) -> dict:
+    latencies = []
+    for _ in range(min(tasks, 2000)):
+        start = perf_counter()
+        _submit(executor, _noop).result()
+        latencies.append(perf_counter() - start)
+    return {
+        'p50_us': _percentile(latencies, 0.5) * 1e6,
+        'p99_us': _percentile(latencies, 0.99) * 1e6,
+        'mean_us': statistics.fmean(latencies) * 1e6,
+    }
+
+
+def bench_fanout(executor: Executor, tasks: int) -> dict:
+    start = perf_counter()
+    wait([_submit(executor, sum, (1, 2, 3)) for _ in range(tasks)])
+    elapsed = perf_counter() - start
+    return {'tasks_per_sec': tasks / elapsed, 'elapsed': elapsed}
+
+
+def bench_mixed(executor: Executor, tasks: int, levels: int = 8) -> dict:
+    waits: dict[int, list[float]] = {p: [] for p in range(levels)}
+
+    def task(priority: int, submitted: float):
+        waits[priority].append(perf_counter() - submitted)
+        sum(range(200))
+
+    rng = random.Random(0)
+    start = perf_counter()
+    wait([
+        _submit(executor, task, p, perf_counter(), priority=p)
+        for p in (rng.randrange(levels) for _ in range(tasks))
+    ])
+    elapsed = perf_counter() - start
+    return {
+        'tasks_per_sec': tasks / elapsed,
+        'wait_mean_ms': {p: statistics.fmean(w) * 1e3 for p, w in waits.items() if w},
+    }
+
+
+BENCHMARKS: dict[str, Callable[[Executor, int], dict]] = {
+    'submit': bench_submit,
+    'latency': bench_latency,
+    'fanout': bench_fanout,
+    'mixed': bench_mixed,
+}
+
+
+def run(benchmarks: Iterable[str], executors: Iterable[str], workers: Iterable[int], tasks: int, repeat: int):
+    """运行基准，逐条产出结果"""
+    for name in benchmarks:
+        for executor_name in executors:
+            for n in workers:
+                for i in range(repeat):
+                    executor = EXECUTORS[executor_name](n)
+                    try:
+                        result = BENCHMARKS[name](executor, tasks)
+                    finally:
+                        executor.shutdown(wait=True)
+                    yield {
+                        'benchmark': name,
+                        'executor': executor_name,
+                        'workers': n,
+                        'tasks': tasks,
+                        'run': i,
+                        **result,
+                    }
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--benchmarks', nargs='+', choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument('--executors', nargs='+', choices=list(EXECUTORS), default=list(EXECUTORS))
+    parser.add_argument('--workers', nargs='+', type=int, default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument('--tasks', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--output', help='输出文件，默认为标准输出')
+    args = parser.parse_args(argv)
+
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        for result in run(args.benchmarks, args.executors, args.workers, args.tasks, args.repeat):
+            out.write(json.dumps(result, ensure_ascii=False) + '\n')
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,7 @@ from selectors import DefaultSelector, EVENT_READ, EVENT_WRITE
 import socket
 
 from ..classes.logger import Logger
+from ..utils.thread_util import Watchdog, RingChannel
 
 
 class ServerSocket():
@@ -18,6 +19,8 @@ class ServerSocket():
             on_recv: Callable[[bytes, tuple[str, int], Callable[[bytes], int]], None],
             bufsize: int = 1024,
             timeout: float | None = None,
+            watchdog: Watchdog | None = None,
+            handoff: int = 0,
         ):
         """服务端套接字
 
@@ -41,6 +44,9 @@ class ServerSocket():
             group (tuple[str, int] | None, optional): 组播地址, 仅在协议类型为 "MULTICAST" 时有效. 默认为 None.
             on_recv (Callable, optional): 接收到数据时的回调函数, 参数为 (data: bytes, client_name: str, send_back: Callable[[bytes], int]). 默认为 None.
             bufsize (int, optional): 接收缓冲区大小, 默认为 1024.
+            watchdog (Watchdog | None, optional): 卡死任务看门狗, 设置后监视 on_recv 回调的执行时间. 默认为 None.
+            handoff (int, optional): 接收与处理分离时环形通道 `RingChannel` 的容量, 大于 0 时接收线程只负责收包,
+                由单独的处理线程批量调用 on_recv, 通道写满时接收线程等待. 默认为 0 (在接收线程中直接调用 on_recv).
 
         Raises:
             ValueError: 无效的协议类型, 应为 [TCP, UDP, MULTICAST]
@@ -82,6 +88,8 @@ class ServerSocket():
         self.on_recv    = on_recv
         self.bufsize    = bufsize
         self.timeout    = timeout
+        self.watchdog   = watchdog
+        self.channel    = RingChannel(handoff, multi_producer=protocol == 'TCP') if handoff > 0 else None
         self.sock: socket.socket | None = None
         self.tcp_sub_socks: list[socket.socket] = []
         self.thread: Thread | Process | None = None
@@ -141,6 +149,31 @@ class ServerSocket():
 
         return send_back
 
+    def __call_on_recv(self, data: bytes, client_addr: tuple[str, int], send_back: Callable[[bytes], int]) -> None:
+        if self.watchdog is None:
+            return self.on_recv(data, client_addr, send_back)
+
+        with self.watchdog.watch(self.on_recv, self):
+            return self.on_recv(data, client_addr, send_back)
+
+    def __dispatch(self, data: bytes, client_addr: tuple[str, int], send_back: Callable[[bytes], int]) -> None:
+        if self.channel is None:
+            return self.__call_on_recv(data, client_addr, send_back)
+        self.channel.put((data, client_addr, send_back))
+
+    def __handler_thread(self) -> None:
+        while True:
+            try:
+                batch = self.channel.get_many(64)
+            except StopIteration:
+                break
+
+            for data, client_addr, send_back in batch:
+                try:
+                    self.__call_on_recv(data, client_addr, send_back)
+                except Exception as e:
+                    self.logger.error(f'{self} 处理线程 "on_recv" 回调函数发生异常: \n{e}')
+
     def __tcp_sub_thread(self, client_sock: socket.socket, client_addr: tuple[str, int]) -> None:
         while self.is_active():
             try:
@@ -150,7 +183,7 @@ class ServerSocket():
 
                 self.logger.debug(f'{self} TCP 子线程 {client_addr} 接收到数据: {data}')
                 try:
-                    self.on_recv(data, client_addr, self.__send_back(client_addr, client_sock))
+                    self.__dispatch(data, client_addr, self.__send_back(client_addr, client_sock))
                 except Exception as e:
                     self.logger.error(f'{self} TCP 子线程 {client_addr} "on_recv" 回调函数发生异常: \n{e}')
             except ConnectionResetError:
@@ -169,6 +202,8 @@ class ServerSocket():
 
     def __main_thread(self) -> None:
         self.__active = True
+        if self.channel is not None:
+            Thread(target=self.__handler_thread, daemon=True).start()
 
         while self.is_active():
             try:
@@ -182,7 +217,7 @@ class ServerSocket():
 
                     self.logger.debug(f'{self} 收到 {client_addr} 的数据: {data}')
                     try:
-                        self.on_recv(data, client_addr, self.__send_back(client_addr))
+                        self.__dispatch(data, client_addr, self.__send_back(client_addr))
                     except Exception as e:
                         self.logger.error(f'{self} 主线程 "on_recv" 回调函数发生异常: \n{e}')
             except Exception as e:
@@ -190,6 +225,9 @@ class ServerSocket():
                     self.logger.error(f'{self} 主线程异常 : \n{e}')
                     break
 
+        if self.channel is not None:
+            self.channel.close()
+
     def getpeername(self) -> tuple[str | None, int | None]:
         """返回套接字连接到的远程地址。"""
         if self.__create_socket():
@@ -1,100 +1,252 @@
 """函数工具"""
 
-from typing import Callable, ParamSpecArgs, ParamSpecKwargs, Any, Literal, TypeAlias, overload
-from types import new_class
-from traceback import format_exc
+from typing import TYPE_CHECKING, Callable, ParamSpecArgs, ParamSpecKwargs, Any, Hashable, Literal, TypeAlias, overload
+from types import new_class, MethodType, SimpleNamespace
+from traceback import format_exception, format_exception_only, print_exc
 from functools import wraps
-from inspect import signature
-from threading import Timer, Lock
-from time import time
+from inspect import signature, iscoroutinefunction, isawaitable
+from threading import Lock, Event, local
+from collections import OrderedDict
+from concurrent.futures import Future
+from weakref import WeakKeyDictionary
+from time import monotonic, perf_counter_ns, sleep
+import asyncio
+import itertools
+import json
+import random
+
+if TYPE_CHECKING:
+    from .thread_util import TimerScheduler
 
 Logger: TypeAlias = Callable[[str], Any]
 CatchLogger: TypeAlias = Callable[[str, str], Any]
 
 
 def log(logger: Logger = print):
-    """装饰器，打印函数调用信息
+    """装饰器，打印函数调用信息，支持协程函数
 
     Args:
         logger (Callable, optional): 日志输出函数. 默认为 `print`.
     """
-    def decorator(func: Callable):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
+    def prepare(func: Callable) -> SimpleNamespace:
+        def write_log(args, kwargs):
             msg = f'调用 "{func.__name__}" 函数'
             if args:   msg += f', 位置参数: {args}'
             if kwargs: msg += f', 关键字参数: {kwargs}'
 
             logger(msg)
+
+        return SimpleNamespace(write_log=write_log)
+
+    def decorator(func: Callable):
+        write_log = prepare(func).write_log
+
+        if iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                write_log(args, kwargs)
+                return await func(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            write_log(args, kwargs)
             return func(*args, **kwargs)
         return wrapper
+
+    decorator.__fusion__ = ('log', prepare)
     return decorator
 
 
-def catch(logger: CatchLogger = print, *, is_raise: bool = False, on_except: Callable[[Exception], None] | None = None):
-    """装饰器，捕获函数异常并输出日志
+class ExceptionRecord:
+    """`catch` 捕获到的异常记录
+
+    回溯文本只在首次访问 `traceback` 或调用 `format()` 时生成。
+
+    Attributes:
+        function (str): 被装饰函数的名称
+        exception (Exception): 异常对象
+        filename (str): 抛出异常的文件
+        lineno (int): 抛出异常的行号
+        raise_function (str): 抛出异常的函数名称
+        args (tuple): 调用的位置参数
+        kwargs (dict): 调用的关键字参数
+        count (int): 相同 (函数, 异常类型, 行号) 的异常累计发生次数
+        suppressed (int): 上次输出以来因限流被抑制的相同异常数
+    """
+
+    __slots__ = ('function', 'exception', 'filename', 'lineno', 'raise_function', 'args', 'kwargs', 'count', 'suppressed', '_traceback')
+
+    def __init__(self, function: str, exception: Exception, args: tuple, kwargs: dict):
+        tb = exception.__traceback__
+        while tb.tb_next is not None:
+            tb = tb.tb_next
+
+        self.function = function
+        self.exception = exception
+        self.filename = tb.tb_frame.f_code.co_filename
+        self.lineno = tb.tb_lineno
+        self.raise_function = tb.tb_frame.f_code.co_name
+        self.args = args
+        self.kwargs = kwargs
+        self.count = 1
+        self.suppressed = 0
+        self._traceback = None
+
+    @property
+    def key(self) -> tuple[str, type, str, int]:
+        """去重键 (函数, 异常类型, 文件, 行号)"""
+        return (self.function, type(self.exception), self.filename, self.lineno)
+
+    @property
+    def exc_text(self) -> str:
+        """异常描述，如 `ValueError: test error`"""
+        return ''.join(format_exception_only(self.exception)).strip()
+
+    @property
+    def traceback(self) -> str:
+        """完整的回溯文本"""
+        if self._traceback is None:
+            self._traceback = ''.join(format_exception(self.exception))
+        return self._traceback
+
+    @property
+    def message(self) -> str:
+        """单行日志消息"""
+        if self.filename == '<string>':
+            msg = f'函数 {self.raise_function} ({self.lineno})'
+        else:
+            msg = f'函数 {self.function}'
+
+        msg += f', 发生异常: {self.exc_text}'
+        msg += f', 调用者: {self.function}'
+
+        if self.args:   msg += f', 位置参数: {self.args}'
+        if self.kwargs: msg += f', 关键字参数: {self.kwargs}'
+        if self.suppressed: msg += f', 已抑制 {self.suppressed} 次相同异常'
+        return msg
+
+    def format(self) -> str:
+        """带参数的回溯日志"""
+        call_fn = self.function
+        raise_fn = self.raise_function if self.filename == '<string>' else 'unknown'
+
+        tb = f'错误回溯开始 {call_fn} -> {raise_fn} ' + '+' * 32 + '\n'
+        if self.args:   tb += f'位置参数: {self.args}\n'
+        if self.kwargs: tb += f'关键字参数: {self.kwargs}\n'
+        tb += f'{self.traceback}\n'
+        tb += f'错误回溯结束 {call_fn} -> {raise_fn} ' + '+' * 32 + '\n'
+        return tb
+
+
+def catch(
+    logger: CatchLogger | Callable[[ExceptionRecord], Any] = print,
+    *,
+    is_raise: bool = False,
+    on_except: Callable[[Exception], None] | None = None,
+    rate_limit: int | None = None,
+    rate_period: float = 60,
+    structured: bool = False,
+):
+    """装饰器，捕获函数异常并输出日志，支持协程函数
+
+    相同 (函数, 异常类型, 行号) 的异常视为同一种异常，设置 rate_limit 后每种异常在 rate_period 内
+    最多输出 rate_limit 次，被抑制的次数附加在下一次输出的日志中，被抑制的异常不会生成回溯文本。
 
     Args:
-        logger (Callable, optional): 日志输出函数. 默认为 `print`.
+        logger (Callable, optional): 日志输出函数，参数为 (消息, 回溯)，structured 为 True 时参数为 `ExceptionRecord`. 默认为 `print`.
         is_raise (bool, optional): 是否抛出异常. 默认为 False.
-        on_except (Callable[[Exception], None] | None, optional): 异常回调函数. 默认为 None.
-    """
-    def decorator(func: Callable):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            try:
-                return func(*args, **kwargs)
-            except Exception as e:
-                fmt_exc = format_exc()
-                _, exc = fmt_exc.split('\n')[-3:-1]
+        on_except (Callable[[Exception], None] | None, optional): 异常回调函数，不受限流影响. 默认为 None.
+        rate_limit (int | None, optional): 每种异常在 rate_period 内最多输出的次数，为 None 时不限制. 默认为 None.
+        rate_period (float, optional): 限流周期 (秒). 默认为 60.
+        structured (bool, optional): 是否向 logger 传递 `ExceptionRecord`，由 logger 决定是否生成回溯文本. 默认为 False.
 
-                call_fn, raise_fn = func.__name__, 'unknown'
+    Examples:
 
-                if _.strip().startswith('File "<string>"'):
-                    raise_fn = _.split(' ')[-1]
-                    line      = _.split(' ')[-3][:-1]
-                    msg = f'函数 {raise_fn} ({line})'
+        >>> @catch(lambda record: log.warning(record.message), structured=True, rate_limit=5, rate_period=10)
+        ... def on_packet(data: bytes):
+        ...     ...
+    """
+    def prepare(func: Callable) -> SimpleNamespace:
+        states: dict[tuple, list[float | int]] = {}  # key: [周期开始时间, 周期内输出次数, 被抑制次数, 累计次数]
+        lock = Lock()
+
+        def handle(e: Exception, args, kwargs):
+            record = ExceptionRecord(func.__name__, e, args, kwargs)
+            now = monotonic()
+
+            with lock:
+                if (state := states.get(record.key)) is None:
+                    state = states[record.key] = [now, 0, 0, 0]
+                state[3] += 1
+                record.count = state[3]
+
+                if rate_limit is not None:
+                    if now - state[0] >= rate_period:
+                        state[0], state[1] = now, 0
+                    if state[1] >= rate_limit:
+                        state[2] += 1
+                        record = None
+                    else:
+                        state[1] += 1
+                        record.suppressed, state[2] = state[2], 0
+
+            if record is not None:
+                if structured:
+                    logger(record)
                 else:
-                    msg = f'函数 {call_fn}'
+                    logger(record.message, record.format())
 
-                msg += f', 发生异常: {exc}'
-                msg += f', 调用者: {call_fn}'
+            if callable(on_except): on_except(e)
 
-                if args:   msg += f', 位置参数: {args}'
-                if kwargs: msg += f', 关键字参数: {kwargs}'
+        return SimpleNamespace(handle=handle, is_raise=is_raise)
 
-                tb = f'错误回溯开始 {call_fn} -> {raise_fn} ' + '+' * 32 + '\n'
-                if args:   tb += f'位置参数: {args}\n'
-                if kwargs: tb += f'关键字参数: {kwargs}\n'
-                tb += f'{fmt_exc}\n'
-                tb += f'错误回溯结束 {call_fn} -> {raise_fn} ' + '+' * 32 + '\n'
-                logger(msg, tb)
+    def decorator(func: Callable):
+        handle = prepare(func).handle
+
+        if iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as e:
+                    handle(e, args, kwargs)
+                    if is_raise: raise
+            return async_wrapper
 
-                if callable(on_except): on_except(e)
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                handle(e, args, kwargs)
                 if is_raise: raise
         return wrapper
+
+    decorator.__fusion__ = ('catch', prepare)
     return decorator
 
 
 @overload
-def class_catch[T](cls: Literal[None] = None, logger: CatchLogger = print, *, is_raise: bool = False, on_except: Callable[[Exception], None] | None = None) -> Callable[[T], T]: ...
+def class_catch[T](cls: Literal[None] = None, logger: CatchLogger = print, *, is_raise: bool = False, on_except: Callable[[Exception], None] | None = None, **options) -> Callable[[T], T]: ...
 @overload
-def class_catch[T](cls: T, logger: CatchLogger = print, *, is_raise: bool = False, on_except: Callable[[Exception], None] | None = None) -> T: ...
+def class_catch[T](cls: T, logger: CatchLogger = print, *, is_raise: bool = False, on_except: Callable[[Exception], None] | None = None, **options) -> T: ...
 
-def class_catch[T](cls: T | None = None, logger: CatchLogger = print, *, is_raise: bool = False, on_except: Callable[[Exception], None] | None = None) -> T | Callable[[T], T]:
-    """装饰器，捕获类方法执行异常，并输出日志
+def class_catch[T](cls: T | None = None, logger: CatchLogger = print, *, is_raise: bool = False, on_except: Callable[[Exception], None] | None = None, **options) -> T | Callable[[T], T]:
+    """装饰器，捕获类方法执行异常，并输出日志，协程方法同样适用
 
     Args:
         logger (Callable, optional): 日志输出函数. 默认为 `print`.
         is_raise (bool, optional): 是否抛出异常. 默认为 False.
         on_except (Callable[[Exception], None] | None, optional): 异常回调函数. 默认为 None.
+        **options: 传递给 `catch` 的其他参数，如 rate_limit、rate_period、structured
     """
     def wrapper(cls: T) -> T:
         for attr in filter(lambda x: not x.startswith('__'), dir(cls)):
             obj = getattr(cls, attr)
 
             if callable(obj):
-                setattr(cls, attr, catch(logger, is_raise=is_raise, on_except=on_except)(obj))
+                setattr(cls, attr, catch(logger, is_raise=is_raise, on_except=on_except, **options)(obj))
         return cls
 
     if cls is None:
@@ -111,13 +263,39 @@ def hook(hook: Callable[[str, Any, ParamSpecArgs, ParamSpecKwargs], bool | Any])
             钩子函数, 将调用两次.
             第一次参数为 ('before', None, *args, **kwargs), 返回 `...` 则跳过函数调用,
             第二次参数为 ('after', result, *args, **kwargs), 返回非 None 值将作为函数调用结果返回.
+            装饰协程函数时，钩子函数也可以是协程函数.
     """
+    async def call_hook(*args, **kwargs):
+        if isawaitable(_ := hook(*args, **kwargs)):
+            return await _
+        return _
+
+    def prepare(func: Callable) -> SimpleNamespace:
+        return SimpleNamespace(hook=hook if callable(hook) else None, call_hook=call_hook)
+
     def decorator(func: Callable):
+        if iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if callable(hook) and await call_hook('before', None, *args, **kwargs) is ...:
+                    return None
+
+                result = None
+                try:
+                    result = await func(*args, **kwargs)
+                finally:
+                    if callable(hook) and (_ := await call_hook('after', result, *args, **kwargs)) is not None:
+                        return _
+
+                return result
+            return async_wrapper
+
         @wraps(func)
         def wrapper(*args, **kwargs):
             if callable(hook) and hook('before', None, *args, **kwargs) is ...:
                 return None
 
+            result = None
             try:
                 result = func(*args, **kwargs)
             finally:
@@ -126,67 +304,1275 @@ def hook(hook: Callable[[str, Any, ParamSpecArgs, ParamSpecKwargs], bool | Any])
 
             return result
         return wrapper
+
+    decorator.__fusion__ = ('hook', prepare)
     return decorator
 
 
-def debounced(delay: float | Callable[[tuple, dict], float], diff_params: bool = False):
+def debounced(
+    delay: float | Callable[[tuple, dict], float],
+    diff_params: bool = False,
+    *,
+    max_keys: int = 1024,
+    scheduler: 'TimerScheduler | None' = None,
+):
     """装饰器，给函数添加防抖功能
 
     防抖是指在函数被连续调用时，只有最后一次调用会生效，在延迟时间内再次调用会重置延迟时间。
 
+    延迟由共享调度器 `thread_util.TimerScheduler` 完成，不会为每次调用创建线程，到期后在调度器的执行器中执行。
+    装饰协程函数时，需要在事件循环中调用，延迟由事件循环的定时器完成，
+    `await` 包装后的函数会立即返回 None，原函数到期后作为任务运行。
+
+    被装饰的函数附带以下方法：
+
+    - `flush()`: 立即执行所有等待中的调用，返回执行的调用数
+    - `cancel()`: 取消所有等待中的调用，返回取消的调用数
+    - `pending()`: 获取等待中的调用数
+
     Args:
         delay (float | Callable[[tuple, dict], float]): 延迟时间 (秒)
         diff_params (bool, optional): 是否对参数进行比较, 相同参数才会进行防抖. 默认为 False.
+        max_keys (int, optional): 最多同时等待的不同参数数，超出时最早登记的调用会立即执行. 默认为 1024.
+        scheduler (TimerScheduler, optional): 调度器，默认为 `TimerScheduler.shared()`
     """
-    timers = {}
-
     def make_key(args, kwargs):
         return (args, tuple(sorted(kwargs.items())))
 
     def decorator(func: Callable):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            nonlocal delay, timers
-
-            _delay = delay(*args, **kwargs) if callable(delay) else delay
-            key = make_key(args, kwargs) if diff_params else None
-
-            if key in timers:
-                timers[key].cancel()
-
-            if _delay > 0:
-                timers[key] = Timer(_delay, func, args=args, kwargs=kwargs)
-                timers[key].start()
+        pending: OrderedDict[Hashable, list] = OrderedDict()  # key: [handle, args, kwargs]
+        lock = Lock()
+        is_async = iscoroutinefunction(func)
+        tasks = set()
+
+        if not is_async:
+            from .thread_util import TimerScheduler
+
+        def run(args, kwargs):
+            if is_async:
+                task = asyncio.ensure_future(func(*args, **kwargs))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
             else:
                 func(*args, **kwargs)
 
+        def fire(key, entry):
+            with lock:
+                # 已被后续调用替换或已被 flush / cancel 取走
+                if pending.get(key) is not entry:
+                    return
+                del pending[key]
+            try:
+                run(entry[1], entry[2])
+            except Exception:
+                # 与 threading.Timer 一致，输出到 stderr 而不是静默丢失在执行器中
+                print_exc()
+
+        def schedule(key, _delay, args, kwargs) -> list[list]:
+            """登记延迟调用，返回因超出 max_keys 而需要立即执行的调用"""
+            evicted = []
+            with lock:
+                if (entry := pending.pop(key, None)) is not None:
+                    entry[0].cancel()
+
+                if _delay > 0:
+                    entry = pending[key] = [None, args, kwargs]
+                    if is_async:
+                        entry[0] = asyncio.get_running_loop().call_later(_delay, fire, key, entry)
+                    else:
+                        entry[0] = (scheduler or TimerScheduler.shared()).call_later(_delay, fire, key, entry)
+
+                    while len(pending) > max_keys:
+                        entry = pending.popitem(last=False)[1]
+                        entry[0].cancel()
+                        evicted.append(entry)
+            return evicted
+
+        def take_all() -> list[list]:
+            with lock:
+                entries = list(pending.values())
+                pending.clear()
+            for entry in entries:
+                entry[0].cancel()
+            return entries
+
+        def flush() -> int:
+            entries = take_all()
+            for entry in entries:
+                run(entry[1], entry[2])
+            return len(entries)
+
+        def cancel() -> int:
+            return len(take_all())
+
+        if is_async:
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                _delay = delay(*args, **kwargs) if callable(delay) else delay
+                key = make_key(args, kwargs) if diff_params else None
+
+                for entry in schedule(key, _delay, args, kwargs):
+                    run(entry[1], entry[2])
+                if _delay <= 0:
+                    await func(*args, **kwargs)
+            wrapper = async_wrapper
+        else:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                _delay = delay(*args, **kwargs) if callable(delay) else delay
+                key = make_key(args, kwargs) if diff_params else None
+
+                for entry in schedule(key, _delay, args, kwargs):
+                    run(entry[1], entry[2])
+                if _delay <= 0:
+                    func(*args, **kwargs)
+
+        wrapper.flush = flush
+        wrapper.cancel = cancel
+        wrapper.pending = lambda: len(pending)
         return wrapper
     return decorator
 
 
-def throttle(wait: float | Callable[[tuple, dict], float]):
+def throttle(
+    wait: float | Callable[[tuple, dict], float],
+    diff_params: bool = False,
+    *,
+    key: Callable[..., Hashable] | None = None,
+    trailing: bool = False,
+    max_keys: int = 1024,
+    scheduler: 'TimerScheduler | None' = None,
+):
     """装饰器，给函数添加节流功能
 
     节流是指在函数被连续调用时，只有第一次调用会生效，超过执行间隔后才会再次调用。
+    检查与更新上次执行时间在锁内完成，多线程并发调用时同一间隔内只会执行一次。
+    装饰协程函数时使用事件循环的时钟与定时器。
 
     Args:
         wait (float | Callable[[tuple, dict], float]): 执行间隔 (秒)
+        diff_params (bool, optional): 是否按参数分别节流. 默认为 False.
+        key (Callable[..., Hashable] | None, optional): 节流键函数，参数与被装饰函数相同，设置后按键分别节流. 默认为 None.
+        trailing (bool, optional): 是否在间隔结束时执行间隔内被节流的最后一次调用，
+            执行由 `thread_util.TimerScheduler` (协程函数为事件循环) 完成. 默认为 False.
+        max_keys (int, optional): 最多记录的节流键数，超出时淘汰最久未使用的键. 默认为 1024.
+        scheduler (TimerScheduler, optional): trailing 使用的调度器，默认为 `TimerScheduler.shared()`
+
+    Examples:
+
+        >>> @throttle(1, key=lambda device_id, state: device_id, trailing=True)
+        ... def report_state(device_id: str, state: dict):
+        ...     ...
     """
-    last_time = 0
+    def make_key(args, kwargs):
+        if key is not None:
+            return key(*args, **kwargs)
+        if diff_params:
+            return (args, tuple(sorted(kwargs.items())))
+        return None
+
+    def prepare(func: Callable) -> SimpleNamespace:
+        states: OrderedDict[Hashable, list] = OrderedDict()  # key: [上次执行时间, 被节流的最后一次调用 (args, kwargs)]
+        lock = Lock()
+        is_async = iscoroutinefunction(func)
+        tasks = set()
+
+        if trailing and not is_async:
+            from .thread_util import TimerScheduler
+
+        def fire(state, clock):
+            with lock:
+                if (call := state[1]) is None:
+                    return
+                state[0], state[1] = clock(), None
+
+            if is_async:
+                task = asyncio.ensure_future(func(*call[0], **call[1]))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                return
+            try:
+                func(*call[0], **call[1])
+            except Exception:
+                print_exc()
+
+        def acquire(args, kwargs, clock) -> bool:
+            """原子地检查并更新节流状态，返回本次调用是否立即执行"""
+            _wait = wait(*args, **kwargs) if callable(wait) else wait
+            k = make_key(args, kwargs)
+            now = clock()
+
+            with lock:
+                if (state := states.get(k)) is None:
+                    state = states[k] = [now, None]
+                    while len(states) > max_keys:
+                        states.popitem(last=False)
+                    return True
+
+                states.move_to_end(k)
+                if now - state[0] > _wait:
+                    # 立即执行的调用比待执行的尾调用更新，丢弃尾调用
+                    state[0], state[1] = now, None
+                    return True
+
+                if trailing:
+                    if state[1] is None:
+                        delay = state[0] + _wait - now
+                        if is_async:
+                            asyncio.get_running_loop().call_later(delay, fire, state, clock)
+                        else:
+                            (scheduler or TimerScheduler.shared()).call_later(delay, fire, state, clock)
+                    state[1] = (args, kwargs)
+                return False
+
+        return SimpleNamespace(acquire=acquire)
 
     def decorator(func: Callable):
+        acquire = prepare(func).acquire
+
+        if iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if acquire(args, kwargs, asyncio.get_running_loop().time):
+                    return await func(*args, **kwargs)
+                return None
+            return async_wrapper
+
         @wraps(func)
         def wrapper(*args, **kwargs):
-            nonlocal wait, last_time
+            if acquire(args, kwargs, monotonic):
+                return func(*args, **kwargs)
+            return None
 
-            _wait = wait(*args, **kwargs) if callable(wait) else wait
-            now   = time()
+        return wrapper
+
+    decorator.__fusion__ = ('throttle', prepare)
+    return decorator
+
+
+_KWD_MARK = object()
+
+
+def _make_key(args: tuple, kwargs: dict, typed: bool) -> Hashable:
+    """由调用参数生成缓存键"""
+    key = args
+    if kwargs:
+        key += (_KWD_MARK, ) + tuple(kwargs.items())
+    if typed:
+        key += tuple(type(v) for v in args)
+        if kwargs:
+            key += tuple(type(v) for v in kwargs.values())
+    elif len(key) == 1 and type(key[0]) in {int, str}:
+        return key[0]
+    return key
+
+
+class _Flight:
+    """正在计算中的缓存项，同一个键的并发调用等待同一次计算"""
+
+    __slots__ = ('event', 'value', 'error')
+
+    def __init__(self):
+        self.event = Event()
+        self.value = None
+        self.error = None
+
+
+def memoize(
+    maxsize: int | None = 128,
+    ttl: float | None = None,
+    *,
+    key: Callable[..., Hashable] | None = None,
+    typed: bool = False,
+    single_flight: bool = True,
+):
+    """装饰器，线程安全的 LRU / TTL 缓存
+
+    缓存函数的返回值 (不缓存异常)，超过 maxsize 时淘汰最久未使用的项，超过 ttl 的项视为过期。
+    被装饰的函数附带以下方法：
+
+    - `cache_info()`: 获取 `{hits, misses, evictions, expirations, size, maxsize, ttl}` 统计
+    - `cache_clear()`: 清空缓存与统计
+    - `invalidate(*args, **kwargs)`: 使指定参数的缓存失效，返回是否存在该项
+
+    Args:
+        maxsize (int | None, optional): 最大缓存项数，为 None 时不限制. 默认为 128.
+        ttl (float | None, optional): 缓存项的有效期 (秒)，为 None 时不过期. 默认为 None.
+        key (Callable[..., Hashable] | None, optional): 缓存键函数，参数与被装饰函数相同，默认由全部参数生成.
+        typed (bool, optional): 是否区分参数类型，如 `1` 与 `1.0`. 默认为 False.
+        single_flight (bool, optional): 同一个键并发未命中时是否只计算一次，其余调用等待并共享结果. 默认为 True.
+
+    Raises:
+        ValueError: maxsize 或 ttl 小于等于 0
+
+    Examples:
+
+        >>> @memoize(maxsize=256, ttl=30)
+        ... def get_device_info(ip: str) -> dict:
+        ...     ...
+        >>>
+        >>> get_device_info('192.168.1.10')
+        >>> get_device_info.invalidate('192.168.1.10')
+        >>> get_device_info.cache_info()
+        {'hits': 0, 'misses': 1, 'evictions': 0, 'expirations': 0, 'size': 0, 'maxsize': 256, 'ttl': 30}
+    """
+    if maxsize is not None and maxsize <= 0:
+        raise ValueError('maxsize 必须大于 0')
+    if ttl is not None and ttl <= 0:
+        raise ValueError('ttl 必须大于 0')
+
+    def decorator(func: Callable):
+        cache: OrderedDict[Hashable, tuple[Any, float | None]] = OrderedDict()
+        flights: dict[Hashable, _Flight] = {}
+        stats = dict.fromkeys(('hits', 'misses', 'evictions', 'expirations'), 0)
+        lock = Lock()
+
+        def make_key(args, kwargs):
+            return key(*args, **kwargs) if key is not None else _make_key(args, kwargs, typed)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            k = make_key(args, kwargs)
+
+            with lock:
+                if (entry := cache.get(k)) is not None:
+                    if entry[1] is None or entry[1] > monotonic():
+                        cache.move_to_end(k)
+                        stats['hits'] += 1
+                        return entry[0]
+                    del cache[k]
+                    stats['expirations'] += 1
+
+                stats['misses'] += 1
+                if single_flight:
+                    if (flight := flights.get(k)) is None:
+                        flight = flights[k] = _Flight()
+                        leader = True
+                    else:
+                        leader = False
+
+            if not single_flight:
+                value = func(*args, **kwargs)
+                store(k, value)
+                return value
+
+            if not leader:
+                flight.event.wait()
+                if flight.error is not None:
+                    raise flight.error
+                return flight.value
+
+            try:
+                flight.value = func(*args, **kwargs)
+                store(k, flight.value)
+                return flight.value
+            except BaseException as e:
+                flight.error = e
+                raise
+            finally:
+                with lock:
+                    flights.pop(k, None)
+                flight.event.set()
+
+        def store(k, value):
+            expire = None if ttl is None else monotonic() + ttl
+            with lock:
+                cache[k] = (value, expire)
+                cache.move_to_end(k)
+                if maxsize is not None:
+                    while len(cache) > maxsize:
+                        cache.popitem(last=False)
+                        stats['evictions'] += 1
+
+        def cache_info() -> dict[str, Any]:
+            with lock:
+                return {**stats, 'size': len(cache), 'maxsize': maxsize, 'ttl': ttl}
+
+        def cache_clear():
+            with lock:
+                cache.clear()
+                for name in stats:
+                    stats[name] = 0
+
+        def invalidate(*args, **kwargs) -> bool:
+            k = make_key(args, kwargs)
+            with lock:
+                return cache.pop(k, None) is not None
+
+        wrapper.cache_info = cache_info
+        wrapper.cache_clear = cache_clear
+        wrapper.invalidate = invalidate
+        return wrapper
+    return decorator
+
+
+def _bucket_index(ns: int) -> int:
+    """耗时 (纳秒) 对应的直方图桶，每个 2 的幂区间再分为 4 个桶，相对误差不超过 25%"""
+    if ns < 8:
+        return ns if ns > 0 else 0
+    b = ns.bit_length()
+    return (b - 2) * 4 + ((ns >> (b - 3)) & 3)
+
+
+def _bucket_value(index: int) -> float:
+    """直方图桶的代表值 (纳秒)，取桶的中点"""
+    if index < 8:
+        return float(index)
+    b, m = index // 4 + 2, index % 4
+    return ((4 + m) << (b - 3)) + (1 << (b - 3)) / 2
+
+
+class _LatencyStripe:
+    """单个分片的计数器，不同线程落在不同分片上以减少锁竞争"""
+
+    __slots__ = ('lock', 'calls', 'errors', 'total_ns', 'max_ns', 'buckets')
+
+    def __init__(self):
+        self.lock = Lock()
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.buckets: dict[int, int] = {}
+
+
+_thread_slot = local()
+_thread_slot_counter = itertools.count()
+
+
+def _get_thread_slot() -> int:
+    """获取当前线程的序号，首次调用时分配
+
+    线程 id 在多数平台上是按页对齐的地址，直接取模会落在同一个分片上，因此按线程顺序分配序号。
+    """
+    try:
+        return _thread_slot.index
+    except AttributeError:
+        index = _thread_slot.index = next(_thread_slot_counter)
+        return index
+
+
+class _LatencyStats:
+    """一个被统计函数的分片计数器"""
+
+    __slots__ = ('stripes', )
+
+    def __init__(self, stripes: int):
+        self.stripes = [_LatencyStripe() for _ in range(stripes)]
+
+    def record(self, ns: int, error: bool):
+        stripe = self.stripes[_get_thread_slot() % len(self.stripes)]
+        index = _bucket_index(ns)
+        with stripe.lock:
+            stripe.calls += 1
+            stripe.total_ns += ns
+            if ns > stripe.max_ns:
+                stripe.max_ns = ns
+            if error:
+                stripe.errors += 1
+            stripe.buckets[index] = stripe.buckets.get(index, 0) + 1
+
+    def snapshot(self) -> dict[str, Any]:
+        calls = errors = total_ns = max_ns = 0
+        buckets: dict[int, int] = {}
+        for stripe in self.stripes:
+            with stripe.lock:
+                calls += stripe.calls
+                errors += stripe.errors
+                total_ns += stripe.total_ns
+                max_ns = max(max_ns, stripe.max_ns)
+                for index, count in stripe.buckets.items():
+                    buckets[index] = buckets.get(index, 0) + count
+
+        result = {
+            'calls': calls,
+            'errors': errors,
+            'total': total_ns / 1e9,
+            'mean': total_ns / calls / 1e9 if calls else 0.0,
+            'max': max_ns / 1e9,
+        }
+
+        ordered = sorted(buckets.items())
+        for name, q in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99)):
+            target, seen, value = q * calls, 0, 0.0
+            for index, count in ordered:
+                seen += count
+                if seen >= target:
+                    value = min(_bucket_value(index), max_ns)
+                    break
+            result[name] = value / 1e9
+        return result
+
+    def reset(self):
+        for stripe in self.stripes:
+            with stripe.lock:
+                stripe.reset()
+
+
+class LatencyRegistry:
+    """进程内函数耗时统计表
+
+    由 `profile` 装饰器写入，记录各函数的调用次数、异常次数与耗时直方图 (对数分桶)，
+    分位数由直方图估算，相对误差不超过 25%。关闭后被装饰函数只多一次属性判断。
+
+    Args:
+        stripes (int, optional): 每个函数的计数器分片数. 默认为 8.
+        enabled (bool, optional): 是否启用统计. 默认为 True.
+
+    Examples:
+
+        >>> profile_registry.snapshot()
+        {'app.on_recv': {'calls': 1024, 'errors': 0, 'total': 0.51, 'mean': 0.0005, 'max': 0.02, 'p50': 0.0004, 'p95': 0.0011, 'p99': 0.004}}
+        >>> print(profile_registry.export('prometheus'))
+    """
+
+    def __init__(self, stripes: int = 8, enabled: bool = True):
+        self.enabled = enabled
+        self._stripes = stripes
+        self._stats: dict[str, _LatencyStats] = {}
+        self._lock = Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def get(self, name: str) -> _LatencyStats:
+        """获取指定名称的计数器，不存在时创建"""
+        if (stats := self._stats.get(name)) is None:
+            with self._lock:
+                if (stats := self._stats.get(name)) is None:
+                    stats = self._stats[name] = _LatencyStats(self._stripes)
+        return stats
+
+    def snapshot(self, name: str | None = None) -> dict[str, dict[str, Any]]:
+        """获取统计快照
+
+        Args:
+            name (str, optional): 函数名称，为 None 时获取全部. 默认为 None.
+
+        Returns:
+            dict[str, dict[str, Any]]: 各函数的 `{calls, errors, total, mean, max, p50, p95, p99}`，耗时单位为秒
+        """
+        with self._lock:
+            items = list(self._stats.items())
+        return {key: stats.snapshot() for key, stats in items if name is None or key == name}
+
+    def reset(self, name: str | None = None):
+        """清空统计
+
+        Args:
+            name (str, optional): 函数名称，为 None 时清空全部. 默认为 None.
+        """
+        with self._lock:
+            items = list(self._stats.items())
+        for key, stats in items:
+            if name is None or key == name:
+                stats.reset()
+
+    def export(self, format: Literal['json', 'prometheus'] = 'json') -> str:
+        """导出统计
+
+        Args:
+            format (str, optional): 'json' 为 JSON 对象，'prometheus' 为 Prometheus 文本格式. 默认为 'json'.
+
+        Returns:
+            str: 导出的文本
+
+        Raises:
+            ValueError: 无效的格式
+        """
+        snapshot = self.snapshot()
+        match format:
+            case 'json':
+                return json.dumps(snapshot, ensure_ascii=False)
+            case 'prometheus':
+                lines = [
+                    '# TYPE easy_pyoc_function_seconds summary',
+                    '# TYPE easy_pyoc_function_errors_total counter',
+                ]
+                for key, stats in snapshot.items():
+                    label = key.replace('\\', '\\\\').replace('"', '\\"')
+                    for name, q in (('p50', '0.5'), ('p95', '0.95'), ('p99', '0.99')):
+                        lines.append(f'easy_pyoc_function_seconds{{function="{label}",quantile="{q}"}} {stats[name]}')
+                    lines.append(f'easy_pyoc_function_seconds_sum{{function="{label}"}} {stats["total"]}')
+                    lines.append(f'easy_pyoc_function_seconds_count{{function="{label}"}} {stats["calls"]}')
+                    lines.append(f'easy_pyoc_function_errors_total{{function="{label}"}} {stats["errors"]}')
+                return '\n'.join(lines) + '\n'
+            case _:
+                raise ValueError(f'无效的导出格式 "{format}"，应为 [json, prometheus]')
+
+
+profile_registry = LatencyRegistry()
+"""`profile` 默认使用的进程内统计表"""
+
+
+@overload
+def profile[F: Callable](func: Literal[None] = None, *, name: str | None = None, registry: LatencyRegistry | None = None) -> Callable[[F], F]: ...
+@overload
+def profile[F: Callable](func: F, *, name: str | None = None, registry: LatencyRegistry | None = None) -> F: ...
+
+def profile[F: Callable](func: F | None = None, *, name: str | None = None, registry: LatencyRegistry | None = None) -> F | Callable[[F], F]:
+    """装饰器，统计函数的调用次数、异常次数与耗时，支持协程函数
+
+    使用 `perf_counter_ns` 计时，结果写入 registry，统计表关闭时直接调用原函数。
 
-            if now - last_time > _wait:
-                last_time = now
+    Args:
+        func (Callable, optional): 被装饰的函数. 默认为 None.
+        name (str, optional): 统计名称，默认为 `模块名.限定名`
+        registry (LatencyRegistry, optional): 统计表，默认为 `profile_registry`
+
+    Examples:
+
+        >>> @profile
+        ... def on_recv(data: bytes, addr: tuple[str, int], send_back):
+        ...     ...
+        >>>
+        >>> profile_registry.snapshot()['app.on_recv']['p99']
+    """
+    def prepare(func: Callable) -> SimpleNamespace:
+        _registry = registry or profile_registry
+        return SimpleNamespace(registry=_registry, stats=_registry.get(name or f'{func.__module__}.{func.__qualname__}'))
+
+    def decorator(func: F) -> F:
+        layer = prepare(func)
+        _registry, stats = layer.registry, layer.stats
+
+        if iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not _registry.enabled:
+                    return await func(*args, **kwargs)
+
+                error = True
+                start = perf_counter_ns()
+                try:
+                    result = await func(*args, **kwargs)
+                    error = False
+                    return result
+                finally:
+                    stats.record(perf_counter_ns() - start, error)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _registry.enabled:
                 return func(*args, **kwargs)
-            return None
 
+            error = True
+            start = perf_counter_ns()
+            try:
+                result = func(*args, **kwargs)
+                error = False
+                return result
+            finally:
+                stats.record(perf_counter_ns() - start, error)
+        return wrapper
+
+    decorator.__fusion__ = ('profile', prepare)
+
+    if func is None:
+        return decorator
+
+    return decorator(func)
+
+
+def _fusion_lines(kinds: list[str], i: int, is_async: bool) -> list[str]:
+    """生成第 i 层及其内层的代码，结果保存在变量 r{i} 中"""
+    aw = 'await ' if is_async else ''
+    if i == len(kinds):
+        return [f'r{i} = {aw}func(*args, **kwargs)']
+
+    inner = _fusion_lines(kinds, i + 1, is_async) + [f'r{i} = r{i + 1}']
+    indent = lambda lines, n=1: ['    ' * n + line for line in lines]
+
+    match kinds[i]:
+        case 'log':
+            return [f'c{i}.write_log(args, kwargs)', *inner]
+        case 'throttle':
+            clock = 'get_running_loop().time' if is_async else 'monotonic'
+            return [
+                f'if c{i}.acquire(args, kwargs, {clock}):',
+                *indent(inner),
+                'else:',
+                f'    r{i} = None',
+            ]
+        case 'catch':
+            return [
+                'try:',
+                *indent(inner),
+                f'except Exception as e{i}:',
+                f'    c{i}.handle(e{i}, args, kwargs)',
+                f'    if c{i}.is_raise: raise',
+                f'    r{i} = None',
+            ]
+        case 'hook':
+            call = f'{aw}c{i}.call_hook' if is_async else f'c{i}.hook'
+            return [
+                f'if {call}("before", None, *args, **kwargs) is ...:',
+                f'    r{i} = None',
+                'else:',
+                f'    r{i + 1} = None',
+                '    try:',
+                *indent(inner[:-1], 2),
+                '    except BaseException:',
+                # 与 hook 装饰器在 finally 中 return 一致，after 返回非 None 时吞掉异常
+                f'        if (h{i} := {call}("after", r{i + 1}, *args, **kwargs)) is None: raise',
+                f'        r{i} = h{i}',
+                '    else:',
+                f'        h{i} = {call}("after", r{i + 1}, *args, **kwargs)',
+                f'        r{i} = r{i + 1} if h{i} is None else h{i}',
+            ]
+        case 'profile':
+            return [
+                f's{i} = perf_counter_ns() if c{i}.registry.enabled else None',
+                'try:',
+                *indent(inner),
+                'except BaseException:',
+                f'    if s{i} is not None: c{i}.stats.record(perf_counter_ns() - s{i}, True)',
+                '    raise',
+                'else:',
+                f'    if s{i} is not None: c{i}.stats.record(perf_counter_ns() - s{i}, False)',
+            ]
+    raise AssertionError(kinds[i])
+
+
+def _fuse(fusions: list[tuple[str, Callable]], func: Callable) -> Callable:
+    # 由内向外准备各层，每层只准备一次；节流的尾调用需要经过内层，
+    # 因此传入由已准备好的内层生成的函数，使尾调用与正常调用共享内层的状态
+    kinds, layers = [], []
+    for kind, prepare in reversed(fusions):
+        target = _build_fusion(kinds, layers, func) if kind == 'throttle' and kinds else func
+        layer = prepare(target)
+        if kind == 'hook' and layer.hook is None:
+            continue
+        kinds.insert(0, kind)
+        layers.insert(0, layer)
+
+    return _build_fusion(kinds, layers, func)
+
+
+def _build_fusion(kinds: list[str], layers: list[SimpleNamespace], func: Callable) -> Callable:
+    """由已准备好的各层生成合并后的包装函数"""
+    is_async = iscoroutinefunction(func)
+    body = _fusion_lines(kinds, 0, is_async) + ['return r0']
+    source = (
+        ('async def' if is_async else 'def') + ' wrapper(*args, **kwargs):\n'
+        + ''.join(f'    {line}\n' for line in body)
+    )
+
+    namespace = {
+        'func': func,
+        'monotonic': monotonic,
+        'perf_counter_ns': perf_counter_ns,
+        'get_running_loop': asyncio.get_running_loop,
+        **{f'c{i}': layers[i] for i in range(len(layers))},
+    }
+    exec(compile(source, f'<compose {func.__qualname__}>', 'exec'), namespace)
+    wrapper = wraps(func)(namespace['wrapper'])
+    wrapper.__fusion_source__ = source
+    return wrapper
+
+
+def compose(*decorators: Callable[[Callable], Callable]):
+    """装饰器，将多个装饰器合并为一个包装函数
+
+    与按相同顺序堆叠装饰器 (第一个在最外层) 的行为一致，但所有行为在同一个函数帧中完成，
+    每次调用只打包一次参数。合并后的代码保存在包装函数的 `__fusion_source__` 属性中。
+
+    支持 `log`、`catch`、`hook`、`throttle` 与 `profile`，支持协程函数。
+
+    Args:
+        *decorators: 装饰器，如 `log()`、`catch(is_raise=True)`
+
+    Raises:
+        TypeError: 装饰器不支持合并
+
+    Examples:
+
+        >>> @compose(profile, catch(logger), log(logger), throttle(0.1))
+        ... def on_recv(data: bytes, addr: tuple[str, int], send_back):
+        ...     ...
+        >>>
+        >>> # 等价于
+        >>> @profile
+        ... @catch(logger)
+        ... @log(logger)
+        ... @throttle(0.1)
+        ... def on_recv(data: bytes, addr: tuple[str, int], send_back):
+        ...     ...
+    """
+    fusions = []
+    for decorator in decorators:
+        if decorator is profile:
+            decorator = profile()
+        if (fusion := getattr(decorator, '__fusion__', None)) is None:
+            raise TypeError(f'装饰器 {decorator!r} 不支持合并，应为 [log, catch, hook, throttle, profile]')
+        fusions.append(fusion)
+
+    def decorator(func: Callable):
+        return _fuse(fusions, func)
+    return decorator
+
+
+def retry(
+    attempts: int = 3,
+    backoff: float = 0.1,
+    *,
+    multiplier: float = 2,
+    max_delay: float = 30,
+    jitter: float = 0.1,
+    retry_on: type[BaseException] | tuple[type[BaseException], ...] = Exception,
+    on_retry: Callable[[int, BaseException], Any] | None = None,
+):
+    """装饰器，函数抛出异常时按指数退避重试，支持协程函数
+
+    第 n 次重试前等待 `min(backoff * multiplier ** (n - 1), max_delay)` 秒，并叠加 ±jitter 比例的随机抖动，
+    避免大量调用方同时重试。熔断器打开时抛出的 `CircuitOpenError` 不会重试。
+
+    被装饰的函数附带 `retry_stats()` 方法，获取 `{calls, successes, retries, failures}` 统计，
+    failures 为重试耗尽后仍然失败的调用数。
+
+    Args:
+        attempts (int, optional): 最多调用次数 (包含第一次). 默认为 3.
+        backoff (float, optional): 第一次重试前的等待时间 (秒). 默认为 0.1.
+        multiplier (float, optional): 每次重试等待时间的倍数. 默认为 2.
+        max_delay (float, optional): 最长等待时间 (秒). 默认为 30.
+        jitter (float, optional): 随机抖动比例，0 为不抖动. 默认为 0.1.
+        retry_on (type | tuple[type, ...], optional): 需要重试的异常类型. 默认为 Exception.
+        on_retry (Callable[[int, BaseException], Any], optional): 每次重试前的回调，参数为 (已失败次数, 异常). 默认为 None.
+
+    Raises:
+        ValueError: attempts 小于 1
+
+    Examples:
+
+        >>> @retry(attempts=5, backoff=0.2, retry_on=(TimeoutError, ConnectionError))
+        ... def read_state(client: ClientSocket) -> bytes:
+        ...     ...
+    """
+    if attempts < 1:
+        raise ValueError('attempts 必须大于等于 1')
+
+    def get_delay(failures: int) -> float:
+        delay = min(backoff * multiplier ** (failures - 1), max_delay)
+        if jitter:
+            delay *= 1 + random.uniform(-jitter, jitter)
+        return max(delay, 0)
+
+    def decorator(func: Callable):
+        stats = dict.fromkeys(('calls', 'successes', 'retries', 'failures'), 0)
+        lock = Lock()
+
+        def count(name: str):
+            with lock:
+                stats[name] += 1
+
+        def should_retry(e: BaseException, failures: int) -> bool:
+            if failures >= attempts or isinstance(e, CircuitOpenError) or not isinstance(e, retry_on):
+                count('failures')
+                return False
+            count('retries')
+            if callable(on_retry): on_retry(failures, e)
+            return True
+
+        if iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                count('calls')
+                failures = 0
+                while True:
+                    try:
+                        result = await func(*args, **kwargs)
+                    except BaseException as e:
+                        failures += 1
+                        if not should_retry(e, failures):
+                            raise
+                        await asyncio.sleep(get_delay(failures))
+                    else:
+                        count('successes')
+                        return result
+            wrapper = async_wrapper
+        else:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                count('calls')
+                failures = 0
+                while True:
+                    try:
+                        result = func(*args, **kwargs)
+                    except BaseException as e:
+                        failures += 1
+                        if not should_retry(e, failures):
+                            raise
+                        sleep(get_delay(failures))
+                    else:
+                        count('successes')
+                        return result
+
+        def retry_stats() -> dict[str, int]:
+            with lock:
+                return dict(stats)
+
+        wrapper.retry_stats = retry_stats
+        return wrapper
+    return decorator
+
+
+class CircuitOpenError(RuntimeError):
+    """熔断器打开时调用被拒绝"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f'熔断器 "{name}" 已打开，{retry_after:.3f} 秒后允许试探调用')
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """熔断器
+
+    - closed: 正常调用，连续失败达到 failure_threshold 次后打开
+    - open: 直接抛出 `CircuitOpenError`，不再调用目标函数，reset_timeout 秒后进入半开状态
+    - half_open: 最多放行 half_open_max_calls 个试探调用，成功则关闭，失败则重新打开
+
+    实例本身可作为装饰器使用，多个函数共用同一个实例时共享熔断状态 (例如访问同一台设备的多个接口)。
+
+    Args:
+        failure_threshold (int, optional): 打开熔断器的连续失败次数. 默认为 5.
+        reset_timeout (float, optional): 打开后进入半开状态的等待时间 (秒). 默认为 30.
+        failure_on (type | tuple[type, ...], optional): 计为失败的异常类型，其他异常视为调用成功. 默认为 Exception.
+        half_open_max_calls (int, optional): 半开状态下同时允许的试探调用数. 默认为 1.
+        name (str, optional): 名称，用于异常信息. 默认为 'CircuitBreaker'.
+
+    Raises:
+        ValueError: failure_threshold 或 half_open_max_calls 小于 1
+
+    Examples:
+
+        >>> breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, name='knx')
+        >>> discover = breaker(knx_util.discover)
+        >>> breaker.stats()['state']
+        'closed'
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30,
+        *,
+        failure_on: type[BaseException] | tuple[type[BaseException], ...] = Exception,
+        half_open_max_calls: int = 1,
+        name: str = 'CircuitBreaker',
+    ):
+        if failure_threshold < 1:
+            raise ValueError('failure_threshold 必须大于等于 1')
+        if half_open_max_calls < 1:
+            raise ValueError('half_open_max_calls 必须大于等于 1')
+
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failure_on = failure_on
+        self.half_open_max_calls = half_open_max_calls
+        self.name = name
+        self._lock = Lock()
+        self._state: Literal['closed', 'open', 'half_open'] = 'closed'
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._counters = dict.fromkeys(('calls', 'successes', 'failures', 'rejected', 'opened', 'half_opened', 'closed'), 0)
+
+    @property
+    def state(self) -> Literal['closed', 'open', 'half_open']:
+        with self._lock:
+            self._update_state()
+            return self._state
+
+    def _update_state(self):
+        if self._state == 'open' and monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = 'half_open'
+            self._probes = 0
+            self._counters['half_opened'] += 1
+
+    def _open(self):
+        self._state = 'open'
+        self._opened_at = monotonic()
+        self._counters['opened'] += 1
+
+    def before_call(self):
+        """调用前检查，熔断器打开或半开且试探调用已满时抛出 `CircuitOpenError`"""
+        with self._lock:
+            self._update_state()
+            if self._state == 'open' or (self._state == 'half_open' and self._probes >= self.half_open_max_calls):
+                self._counters['rejected'] += 1
+                retry_after = max(self._opened_at + self.reset_timeout - monotonic(), 0)
+                raise CircuitOpenError(self.name, retry_after)
+            if self._state == 'half_open':
+                self._probes += 1
+            self._counters['calls'] += 1
+
+    def on_success(self):
+        """记录一次成功调用"""
+        with self._lock:
+            self._counters['successes'] += 1
+            self._failures = 0
+            if self._state == 'half_open':
+                self._state = 'closed'
+                self._counters['closed'] += 1
+
+    def on_failure(self):
+        """记录一次失败调用"""
+        with self._lock:
+            self._counters['failures'] += 1
+            self._failures += 1
+            if self._state == 'half_open' or (self._state == 'closed' and self._failures >= self.failure_threshold):
+                self._open()
+
+    def on_exception(self, e: BaseException):
+        """按异常类型记录调用结果"""
+        if isinstance(e, self.failure_on):
+            self.on_failure()
+        else:
+            self.on_success()
+
+    def reset(self):
+        """关闭熔断器并清空连续失败次数，不影响累计计数"""
+        with self._lock:
+            if self._state != 'closed':
+                self._counters['closed'] += 1
+            self._state = 'closed'
+            self._failures = 0
+            self._probes = 0
+
+    def stats(self) -> dict[str, Any]:
+        """获取熔断器状态与计数
+
+        Returns:
+            dict[str, Any]: `{state, consecutive_failures, calls, successes, failures, rejected, opened, half_opened, closed}`,
+                opened、half_opened、closed 为进入对应状态的次数
+        """
+        with self._lock:
+            self._update_state()
+            return {'state': self._state, 'consecutive_failures': self._failures, **self._counters}
+
+    def __call__(self, func: Callable):
+        if iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                self.before_call()
+                try:
+                    result = await func(*args, **kwargs)
+                except BaseException as e:
+                    self.on_exception(e)
+                    raise
+                self.on_success()
+                return result
+            async_wrapper.breaker = self
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            self.before_call()
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                self.on_exception(e)
+                raise
+            self.on_success()
+            return result
+        wrapper.breaker = self
+        return wrapper
+
+
+def circuit_breaker(failure_threshold: int = 5, reset_timeout: float = 30, **kwargs):
+    """装饰器，为函数添加熔断器，熔断器打开时快速失败，不再等待已失效的目标超时
+
+    被装饰的函数附带 `breaker` 属性，即其 `CircuitBreaker` 实例。
+
+    Args:
+        failure_threshold (int, optional): 打开熔断器的连续失败次数. 默认为 5.
+        reset_timeout (float, optional): 打开后进入半开状态的等待时间 (秒). 默认为 30.
+        **kwargs: 传递给 `CircuitBreaker` 的其他参数
+
+    Examples:
+
+        >>> @retry(attempts=3, retry_on=TimeoutError)
+        ... @circuit_breaker(failure_threshold=5, reset_timeout=10)
+        ... def send(client: ClientSocket, data: bytes) -> int:
+        ...     return client.send(data)
+        >>>
+        >>> send.breaker.stats()
+    """
+    def decorator(func: Callable):
+        return CircuitBreaker(failure_threshold, reset_timeout, **kwargs)(func)
+    return decorator
+
+
+def batched(
+    max_size: int = 64,
+    max_delay: float = 0.01,
+    *,
+    scheduler: 'TimerScheduler | None' = None,
+):
+    """装饰器，将多次单独调用合并为一次批量调用
+
+    被装饰的函数接收元素列表，返回等长的结果列表 (或可迭代对象)，结果为异常实例时该元素的调用方收到该异常。
+    包装后的函数每次接收一个元素并立即返回 `Future`，攒够 max_size 个元素或第一个元素等待超过
+    max_delay 秒后，在调度器 `thread_util.TimerScheduler` 的执行器中调用一次批量函数。
+    批量函数抛出异常时，该批次所有调用方都收到该异常。
+
+    批量函数为协程函数时，包装后的函数需要在事件循环中调用，返回 `asyncio.Future`，
+    延迟由事件循环的定时器完成，批量函数作为任务运行。
+
+    被装饰的函数附带以下方法：
+
+    - `flush()`: 立即在当前线程 (协程函数为事件循环中的任务) 处理等待中的元素，返回元素数
+    - `pending()`: 获取等待中的元素数
+
+    Args:
+        max_size (int, optional): 每批最多元素数. 默认为 64.
+        max_delay (float, optional): 第一个元素最长等待时间 (秒). 默认为 0.01.
+        scheduler (TimerScheduler, optional): 调度器，默认为 `TimerScheduler.shared()`
+
+    Raises:
+        ValueError: max_size 小于 1
+
+    Examples:
+
+        >>> @batched(max_size=100, max_delay=0.05)
+        ... def save_states(states: list[dict]) -> list[int]:
+        ...     return db.insert_many(states)
+        >>>
+        >>> future = save_states({'device': 'lamp', 'on': True})
+        >>> row_id = future.result()
+    """
+    if max_size < 1:
+        raise ValueError('max_size 必须大于等于 1')
+
+    def resolve(items: list[tuple[Any, Any]], results: Any = None, error: BaseException | None = None):
+        """将批量调用的结果分发到各个调用方的 future"""
+        if error is None:
+            # 兼容生成器等可迭代对象，返回 None 等不可迭代对象时作为异常分发
+            try:
+                results = list(results)
+            except BaseException as e:
+                error = TypeError(f'批量函数应返回结果列表，实际为 {type(results).__name__}')
+                error.__cause__ = e
+            else:
+                if len(results) != len(items):
+                    error = ValueError(f'批量函数返回的结果数 {len(results)} 与输入数 {len(items)} 不一致')
+        if error is not None:
+            for _, future in items:
+                if not future.done(): future.set_exception(error)
+            return
+
+        for (_, future), result in zip(items, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def decorator(func: Callable):
+        lock = Lock()
+        batch: list[tuple[Any, Any]] = []
+        timer = None
+        is_async = iscoroutinefunction(func)
+        tasks = set()
+
+        if not is_async:
+            from .thread_util import TimerScheduler
+
+        def take_locked() -> list[tuple[Any, Any]]:
+            nonlocal batch, timer
+            items, batch = batch, []
+            if timer is not None:
+                timer.cancel()
+                timer = None
+            return items
+
+        def take() -> list[tuple[Any, Any]]:
+            with lock:
+                return take_locked()
+
+        def run(items: list[tuple[Any, Future]]):
+            # 跳过调用方已取消的元素
+            items = [(item, future) for item, future in items if future.set_running_or_notify_cancel()]
+            if not items:
+                return
+            try:
+                results = func([item for item, _ in items])
+            except BaseException as e:
+                resolve(items, error=e)
+            else:
+                resolve(items, results)
+
+        async def run_async(items: list[tuple[Any, asyncio.Future]]):
+            items = [(item, future) for item, future in items if not future.cancelled()]
+            if not items:
+                return
+            try:
+                results = await func([item for item, _ in items])
+            except BaseException as e:
+                resolve(items, error=e)
+            else:
+                resolve(items, results)
+
+        def start(items: list):
+            if is_async:
+                task = asyncio.ensure_future(run_async(items))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            else:
+                (scheduler or TimerScheduler.shared()).call_later(0, run, items)
+
+        def on_timer():
+            if items := take():
+                if is_async:
+                    start(items)
+                else:
+                    run(items)
+
+        @wraps(func)
+        def wrapper(item: Any) -> Future | asyncio.Future:
+            nonlocal timer
+
+            if is_async:
+                loop = asyncio.get_running_loop()
+                future = loop.create_future()
+            else:
+                future = Future()
+
+            items = None
+            with lock:
+                batch.append((item, future))
+                if len(batch) >= max_size:
+                    items = take_locked()
+                elif timer is None:
+                    if is_async:
+                        timer = loop.call_later(max_delay, on_timer)
+                    else:
+                        timer = (scheduler or TimerScheduler.shared()).call_later(max_delay, on_timer)
+
+            if items:
+                start(items)
+            return future
+
+        def flush() -> int:
+            items = take()
+            if items:
+                if is_async:
+                    start(items)
+                else:
+                    run(items)
+            return len(items)
+
+        wrapper.flush = flush
+        wrapper.pending = lambda: len(batch)
         return wrapper
     return decorator
 
@@ -227,9 +1613,48 @@ def has_kwarg(func: Callable, name: str) -> bool:
     return False
 
 
+_call_adapters: WeakKeyDictionary[Callable, tuple[int, tuple[tuple[str, Any], ...]]] = WeakKeyDictionary()
+_method_adapters: WeakKeyDictionary[Callable, tuple[int, tuple[tuple[str, Any], ...]]] = WeakKeyDictionary()
+
+
+def _compile_call(target: Callable) -> tuple[int, tuple[tuple[str, Any], ...]]:
+    """解析目标函数的签名，生成 (位置参数个数, ((关键字参数名称, 默认值), ...))"""
+    positional = 0
+    keywords = []
+    for param in signature(target).parameters.values():
+        # 与 has_kwarg 的判断一致
+        if param.kind == param.KEYWORD_ONLY or '=' in str(param):
+            keywords.append((param.name, param.default))
+        else:
+            positional += 1
+    return positional, tuple(keywords)
+
+
+def _get_call_adapter(target: Callable) -> tuple[int, tuple[tuple[str, Any], ...]]:
+    """获取目标函数的调用适配器，按目标函数弱引用缓存
+
+    绑定方法每次访问都会创建新对象，因此以其 `__func__` 为键单独缓存。
+    """
+    if isinstance(target, MethodType):
+        cache, owner = _method_adapters, target.__func__
+    else:
+        cache, owner = _call_adapters, target
+
+    try:
+        return cache[owner]
+    except KeyError:
+        adapter = cache[owner] = _compile_call(target)
+        return adapter
+    except TypeError:
+        # 不支持弱引用或不可哈希的对象不缓存
+        return _compile_call(target)
+
+
 def call[T](target: Callable[..., T], *args, **kwargs) -> T:
     """调用函数，并忽略多余参数
 
+    目标函数的签名只在首次调用时解析，之后按缓存的适配器分发参数。
+
     Args:
         target (Callable[..., T]): 目标函数
         *args: 位置参数
@@ -238,18 +1663,14 @@ def call[T](target: Callable[..., T], *args, **kwargs) -> T:
     Returns:
         T: 目标函数返回值
     """
-    sig = signature(target)
+    positional, keywords = _get_call_adapter(target)
 
-    _args = 0
-    _kwargs = {}
-    for param in sig.parameters.values():
-        if has_kwarg(target, param.name):
-            _kwargs[param.name] = kwargs.get(param.name, param.default)
-        else:
-            _args += 1
-    _args = args[:_args]
+    if kwargs:
+        _kwargs = {name: kwargs.get(name, default) for name, default in keywords}
+    else:
+        _kwargs = dict(keywords)
 
-    return target(*_args, **_kwargs)
+    return target(*args[:positional], **_kwargs)
 
 
 @overload
@@ -1,12 +1,22 @@
 """线程工具"""
 
-from typing import Callable, Any, TypeAlias, ParamSpecArgs, ParamSpecKwargs
-from threading import Thread, Event, Semaphore, Lock, current_thread, active_count, enumerate, get_ident
-from traceback import extract_stack
-from concurrent.futures import Executor, Future
+from typing import Callable, Any, Hashable, Literal, Mapping, TypeAlias, ParamSpecArgs, ParamSpecKwargs
+from threading import Thread, Event, Condition, Semaphore, Lock, RLock, local, current_thread, active_count, enumerate, get_ident
+from types import CodeType, FrameType
+from weakref import finalize
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, BrokenExecutor, InvalidStateError
 from concurrent.futures._base import LOGGER
-from queue import PriorityQueue, Empty
+from queue import Queue, PriorityQueue, Empty, Full
+from collections import deque
+from functools import partial
+from inspect import iscoroutinefunction, unwrap
+from contextlib import contextmanager
+from multiprocessing.context import BaseContext
+from time import perf_counter, monotonic, sleep
 import os
+import sys
+import heapq
+import asyncio
 import itertools
 from concurrent.futures import ThreadPoolExecutor
 
@@ -16,66 +26,160 @@ from . import func_util
 Task: TypeAlias = Callable[..., Any]
 
 
+class _SummaryToken:
+    """保存在线程局部数据中，线程退出时被回收，用于清除该线程记录的调用栈"""
+
+
 class StackThread(Thread):
     """跨线程记录调用栈
 
     使用该类可以在多线程环境下记录和获取线程的调用栈信息。
+
+    记录调用栈时只保存帧对应的代码对象，不读取源码，函数名在调用 `get_brief_stack` 时才解析。
+    线程创建时记录的调用栈保存在线程对象上，随线程对象一起释放；
+    `push_summary` 记录的调用栈在记录线程退出时清除，且总数不超过 `max_summaries`。
     """
 
     ignore_functions = (
-        '_bootstrap', '_bootstrap_inner', 'run', 'get_brief_stack', 'get_fn', 'push_summary'
+        '_bootstrap', '_bootstrap_inner', 'run', 'get_brief_stack', 'get_fn', 'push_summary', 'run_with_stack'
     )
     """调用栈中忽略的函数名"""
 
     ignore_prefix = ('__', )
     """调用栈中忽略的函数名前缀"""
 
-    _stack_tree = {}
-    """调用树"""
+    max_depth = 256
+    """单个调用栈最多保留的帧数，超出时丢弃最外层的帧"""
+
+    max_summaries = 1024
+    """`push_summary` 最多保留的记录数"""
 
-    _summary    = {}
-    """调用栈"""
+    _summary: dict[int, tuple[int, tuple[CodeType, ...]]] = {}
+    """调用栈 {线程标识符: (记录令牌 id, 代码对象元组)}"""
+
+    _summary_lock = RLock()
+    _local = local()
+
+    _borrowed: dict[int, tuple[CodeType, ...]] = {}
+    """通过 `run_with_stack` 临时继承的调用栈 {线程标识符: 代码对象元组}"""
 
     def __init__(self, group=None, target=None, name=None, args=(), kwargs=None, *, daemon=None):
         super().__init__(group, target, name, args, kwargs, daemon=daemon)
-        StackThread.push_summary()
-
-    def start(self):
-        super().start()
-        StackThread._stack_tree[self.ident] = get_ident()
+        self._parent: int | None = None
+        self._origin = StackThread._capture(sys._getframe(1))
 
     def set_parent(self, ident: int):
         """设置父线程标识符
 
         用于记录线程之间的调用关系，比如在消费者线程中手动设置父线程标识符。
+        设置后，调用栈将拼接父线程通过 `push_summary` 记录的调用栈，而不是创建线程时的调用栈。
         """
-        StackThread._stack_tree[self.ident] = ident
+        self._parent = ident
 
     @staticmethod
-    def get_fn():
-        """获取当前线程调用栈"""
+    def _walk(frame: FrameType | None) -> list[CodeType]:
+        """获取从 frame 开始的当前线程调用栈，由外到内排列"""
+        codes = []
+        while frame is not None:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        codes.reverse()
+        return codes
+
+    @staticmethod
+    def _capture(frame: FrameType | None) -> tuple[CodeType, ...]:
+        """记录从 frame 开始的完整调用栈 (包含祖先线程)，由外到内排列"""
+        codes = StackThread._walk(frame)
+
+        if inherited := StackThread._inherited():
+            return (inherited + tuple(codes))[-StackThread.max_depth:]
+
+        return tuple(codes[-StackThread.max_depth:])
+
+    @staticmethod
+    def _inherited(thread: Thread | None = None) -> tuple[CodeType, ...]:
+        """获取线程继承的调用栈，默认为当前线程"""
+        if thread is None:
+            thread = current_thread()
+
+        # 共享线程中执行的回调 (如 SharedStackTimer) 临时继承调用栈
+        if (inherited := StackThread._borrowed.get(thread.ident)) is not None:
+            return inherited
+
+        if isinstance(thread, StackThread):
+            if thread._parent is not None:
+                entry = StackThread._summary.get(thread._parent)
+                return entry[1] if entry else ()
+            return thread._origin
+
+        return ()
+
+    @staticmethod
+    def run_with_stack[T](inherited: tuple[CodeType, ...], function: Callable[..., T], *args, **kwargs) -> T:
+        """以 inherited 作为继承的调用栈执行函数
+
+        用于在共享的工作线程中执行任务时，保持任务提交处的调用栈。
+        """
+        ident = get_ident()
+        previous = StackThread._borrowed.get(ident)
+        StackThread._borrowed[ident] = inherited
+        try:
+            return function(*args, **kwargs)
+        finally:
+            if previous is None:
+                del StackThread._borrowed[ident]
+            else:
+                StackThread._borrowed[ident] = previous
+
+    @staticmethod
+    def _resolve(codes: tuple[CodeType, ...]) -> list[str]:
+        """将代码对象解析为函数名，并过滤忽略的函数"""
         return [
-            f.name for f in extract_stack()
-            if f.name not in StackThread.ignore_functions and not any(f.name.startswith(p) for p in StackThread.ignore_prefix)
+            code.co_name for code in codes
+            if code.co_name not in StackThread.ignore_functions
+            and not any(code.co_name.startswith(p) for p in StackThread.ignore_prefix)
         ]
 
+    @staticmethod
+    def _discard_summary(ident: int, token_id: int):
+        """线程退出时清除其记录的调用栈"""
+        with StackThread._summary_lock:
+            entry = StackThread._summary.get(ident)
+            if entry is not None and entry[0] == token_id:
+                del StackThread._summary[ident]
+
+    @staticmethod
+    def get_fn():
+        """获取当前线程调用栈"""
+        return StackThread._resolve(StackThread._walk(sys._getframe(1)))
+
     @staticmethod
     def push_summary():
         """记录当前线程调用栈
 
         用于在线程切换时手动记录调用栈，比如在生产者线程中手动记录调用栈。
         """
-        StackThread._summary[get_ident()] = StackThread.get_fn()
+        ident = get_ident()
+        if (token := getattr(StackThread._local, 'token', None)) is None:
+            token = StackThread._local.token = _SummaryToken()
+            finalize(token, StackThread._discard_summary, ident, id(token))
+
+        codes = StackThread._capture(sys._getframe(1))
+        with StackThread._summary_lock:
+            StackThread._summary[ident] = (id(token), codes)
+
+            if len(StackThread._summary) > StackThread.max_summaries:
+                # 先清除已退出线程的记录，仍然超出时丢弃最早的记录
+                alive = {t.ident for t in enumerate()}
+                for stale in [i for i in StackThread._summary if i not in alive]:
+                    del StackThread._summary[stale]
+                while len(StackThread._summary) > StackThread.max_summaries:
+                    del StackThread._summary[next(iter(StackThread._summary))]
 
     @staticmethod
     def get_brief_stack():
         """获取当前线程完整调用栈"""
-        stack = StackThread.get_fn()
-        _ftt = get_ident()
-        while _ftt := StackThread._stack_tree.get(_ftt, None):
-            if _ftt in StackThread._summary:
-                stack = StackThread._summary[_ftt] + stack
-        return stack
+        return StackThread._resolve(StackThread._capture(sys._getframe(1)))
 
 
 class StackTimer(StackThread):
@@ -98,6 +202,771 @@ class StackTimer(StackThread):
         self.finished.set()
 
 
+class TimerHandle:
+    """`TimerScheduler.call_later` 返回的定时任务句柄"""
+
+    __slots__ = ('when', 'function', 'args', 'kwargs', 'cancelled', '_queued', '_scheduler')
+
+    def __init__(self, scheduler: 'TimerScheduler', when: float, function: Callable[..., Any], args: tuple, kwargs: dict):
+        self.when = when
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.cancelled = False
+        self._queued = True
+        self._scheduler = scheduler
+
+    def cancel(self):
+        """取消定时任务，O(1)，已取消的任务在到期或队列整理时才从队列中移除"""
+        self._scheduler._cancel(self)
+
+    def _run(self):
+        if not self.cancelled:
+            self.function(*self.args, **self.kwargs)
+
+
+class TimerScheduler:
+    """共享定时调度器
+
+    所有定时任务共用一个调度线程，按到期时间保存在最小堆中，到期后提交到执行器中执行。
+    相比每个定时器占用一个线程 (`threading.Timer`、`StackTimer`)，大量定时任务时可显著减少线程数。
+
+    Args:
+        executor (Executor, optional): 执行到期回调的执行器，默认为按需创建的 `ThreadPoolExecutor`
+        name (str, optional): 调度线程名称. 默认为 'TimerScheduler'.
+
+    Examples:
+
+        >>> scheduler = TimerScheduler.shared()
+        >>> handle = scheduler.call_later(1.5, print, 'hello')
+        >>> handle.cancel()
+    """
+
+    _shared: 'TimerScheduler | None' = None
+    _shared_lock = Lock()
+
+    # 已取消任务超过该数量且超过队列一半时整理队列
+    _compact_threshold = 64
+
+    def __init__(self, executor: Executor | None = None, name: str = 'TimerScheduler'):
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._name = name
+        self._heap: list[tuple[float, int, TimerHandle]] = []
+        self._counter = itertools.count().__next__
+        self._cancelled = 0
+        self._cond = Condition(Lock())
+        self._thread: Thread | None = None
+        self._shutdown = False
+
+    @classmethod
+    def shared(cls) -> 'TimerScheduler':
+        """获取进程内共享的调度器"""
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    cls._shared = cls()
+        return cls._shared
+
+    def call_later(self, delay: float, function: Callable[..., Any], *args, **kwargs) -> TimerHandle:
+        """在 delay 秒后执行 function
+
+        Args:
+            delay (float): 延迟时间 (秒)
+            function (Callable): 到期时执行的函数
+            *args: 传递给 function 的位置参数
+            **kwargs: 传递给 function 的关键字参数
+
+        Returns:
+            TimerHandle: 定时任务句柄，可用于取消任务
+
+        Raises:
+            RuntimeError: 调度器已关闭
+        """
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError('调度器已关闭，无法添加定时任务')
+
+            handle = TimerHandle(self, monotonic() + max(delay, 0), function, args, kwargs)
+            heapq.heappush(self._heap, (handle.when, self._counter(), handle))
+
+            if self._thread is None:
+                self._thread = Thread(name=self._name, target=self._run, daemon=True)
+                self._thread.start()
+            elif self._heap[0][2] is handle:
+                # 新任务最早到期，唤醒调度线程重新计算等待时间
+                self._cond.notify()
+
+            return handle
+
+    def pending(self) -> int:
+        """获取未到期且未取消的定时任务数"""
+        with self._cond:
+            return len(self._heap) - self._cancelled
+
+    def _cancel(self, handle: TimerHandle):
+        with self._cond:
+            if handle.cancelled:
+                return
+            handle.cancelled = True
+            if not handle._queued:
+                return
+
+            self._cancelled += 1
+            if self._cancelled > self._compact_threshold and self._cancelled * 2 > len(self._heap):
+                self._heap = [entry for entry in self._heap if not entry[2].cancelled]
+                heapq.heapify(self._heap)
+                self._cancelled = 0
+
+    def _run(self):
+        """调度线程的主循环"""
+        while True:
+            due = []
+            with self._cond:
+                while not due:
+                    if self._shutdown:
+                        return
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+
+                    now = monotonic()
+                    while self._heap and self._heap[0][0] <= now:
+                        handle = heapq.heappop(self._heap)[2]
+                        handle._queued = False
+                        if handle.cancelled:
+                            self._cancelled -= 1
+                        else:
+                            due.append(handle)
+
+                    if not due and self._heap:
+                        self._cond.wait(self._heap[0][0] - now)
+
+            for handle in due:
+                try:
+                    self._get_executor().submit(handle._run)
+                except BaseException:
+                    LOGGER.critical('Exception in timer scheduler', exc_info=True)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(thread_name_prefix='%s_callback' % self._name)
+        return self._executor
+
+    def shutdown(self, wait: bool = True):
+        """关闭调度器，丢弃所有未到期的定时任务
+
+        Args:
+            wait (bool, optional): 是否等待调度线程以及正在执行的回调结束. 默认为 True.
+        """
+        with self._cond:
+            self._shutdown = True
+            for _, _, handle in self._heap:
+                handle.cancelled = True
+                handle._queued = False
+            self._heap.clear()
+            self._cancelled = 0
+            self._cond.notify()
+
+        if wait and self._thread is not None:
+            self._thread.join()
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=wait)
+
+
+class SharedStackTimer:
+    """基于共享调度器的 `StackTimer`
+
+    接口与 `StackTimer` 一致，但不单独占用线程，而是注册到 `TimerScheduler` 上，
+    到期后在调度器的执行器中执行，并保留创建定时器处的调用栈，
+    在回调中调用 `StackThread.get_brief_stack` 可以获取完整调用栈。
+
+    Args:
+        interval (float): 延迟时间 (秒)
+        function (Callable): 到期时执行的函数
+        args (Iterable, optional): 位置参数
+        kwargs (dict, optional): 关键字参数
+        scheduler (TimerScheduler, optional): 调度器，默认为 `TimerScheduler.shared()`
+
+    Examples:
+
+        >>> timer = SharedStackTimer(3, print, args=('timeout', ))
+        >>> timer.start()
+        >>> timer.cancel()
+    """
+
+    def __init__(self, interval, function, args=None, kwargs=None, *, scheduler: TimerScheduler | None = None):
+        self.interval = interval
+        self.function = function
+        self.args = args if args is not None else []
+        self.kwargs = kwargs if kwargs is not None else {}
+        self.finished = Event()
+        self._scheduler = scheduler or TimerScheduler.shared()
+        self._handle: TimerHandle | None = None
+        self._origin = StackThread._capture(sys._getframe(1))
+
+    def start(self):
+        if self._handle is not None:
+            raise RuntimeError('定时器只能启动一次')
+        self._handle = self._scheduler.call_later(self.interval, self._run)
+
+    def cancel(self):
+        self.finished.set()
+        if self._handle is not None:
+            self._handle.cancel()
+
+    def is_alive(self) -> bool:
+        return self._handle is not None and not self.finished.is_set()
+
+    def join(self, timeout: float | None = None):
+        self.finished.wait(timeout)
+
+    def _run(self):
+        if not self.finished.is_set():
+            try:
+                StackThread.run_with_stack(self._origin, self.function, *self.args, **self.kwargs)
+            finally:
+                self.finished.set()
+
+
+class Watchdog:
+    """卡死任务看门狗
+
+    记录正在执行的任务 (如线程池任务、`ServerSocket` 的 on_recv 回调) 的开始时间，
+    由后台线程定期检查，执行时间超过阈值的任务会被报告一次，报告中包含任务、已执行时长，
+    以及该线程当前的完整调用栈 (拼接 `StackThread` 记录的父线程调用栈)。
+
+    Args:
+        threshold (float): 执行时间阈值 (秒)
+        interval (float, optional): 检查间隔 (秒)，默认为 threshold 的一半
+        on_hung (Callable[[dict], Any], optional): 发现卡死任务时的回调函数，参数为报告字典
+            `{label, thread, ident, elapsed, stack}`，默认输出警告日志
+        name (str, optional): 检查线程名称. 默认为 'Watchdog'.
+
+    Raises:
+        ValueError: 当 threshold <= 0 或 interval <= 0 时抛出
+
+    Examples:
+
+        >>> watchdog = Watchdog(threshold=5)
+        >>> executor = PriorityThreadPoolExecutor(max_workers=4, watchdog=watchdog)
+        >>> server = ServerSocket(protocol='UDP', bind=('0.0.0.0', 8080), on_recv=on_recv, watchdog=watchdog)
+        >>>
+        >>> with watchdog.watch('sync_devices'):
+        ...     sync_devices()
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        *,
+        interval: float | None = None,
+        on_hung: Callable[[dict[str, Any]], Any] | None = None,
+        name: str = 'Watchdog',
+    ):
+        if threshold <= 0:
+            raise ValueError('threshold 必须大于 0')
+        if interval is None:
+            interval = threshold / 2
+        if interval <= 0:
+            raise ValueError('interval 必须大于 0')
+
+        self.threshold = threshold
+        self.interval = interval
+        self.on_hung = on_hung or self._log_hung
+        # 令牌 -> [线程标识符, 任务, 分组, 开始时间, 是否已报告]
+        self._running: dict[int, list] = {}
+        self._counter = itertools.count().__next__
+        self._lock = Lock()
+        self._hung_total = 0
+        self._stopped = Event()
+        self._thread = Thread(name=name, target=self._run, daemon=True)
+        self._thread.start()
+
+    def begin(self, task: Any, group: Any = None) -> int:
+        """记录任务开始执行
+
+        Args:
+            task (Any): 任务，报告时显示其名称 (函数显示 `__qualname__`)
+            group (Any, optional): 分组，用于统计某一组任务中卡死的数量. 默认为 None.
+
+        Returns:
+            int: 令牌，任务结束时传给 `end`
+        """
+        token = self._counter()
+        with self._lock:
+            self._running[token] = [get_ident(), task, group, perf_counter(), False]
+        return token
+
+    def end(self, token: int):
+        """记录任务执行结束"""
+        with self._lock:
+            self._running.pop(token, None)
+
+    @contextmanager
+    def watch(self, task: Any, group: Any = None):
+        """上下文管理器，监视代码块的执行时间"""
+        token = self.begin(task, group)
+        try:
+            yield
+        finally:
+            self.end(token)
+
+    def stuck_count(self, group: Any = None) -> int:
+        """获取当前执行时间超过阈值的任务数
+
+        Args:
+            group (Any, optional): 只统计指定分组. 默认为 None (统计全部).
+        """
+        limit = perf_counter() - self.threshold
+        with self._lock:
+            return sum(
+                1 for _, _, g, start, _ in self._running.values()
+                if start <= limit and (group is None or g is group)
+            )
+
+    def stats(self) -> dict[str, int]:
+        """获取看门狗指标
+
+        Returns:
+            dict[str, int]: `{running, stuck, hung_total}`，分别为正在执行、当前卡死、累计报告的任务数
+        """
+        stuck = self.stuck_count()
+        with self._lock:
+            return {'running': len(self._running), 'stuck': stuck, 'hung_total': self._hung_total}
+
+    @staticmethod
+    def describe(task: Any) -> str:
+        """获取任务名称"""
+        task = unwrap(task) if callable(task) else task
+        if isinstance(task, partial):
+            task = task.func
+        return getattr(task, '__qualname__', None) or repr(task)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.check()
+
+    def check(self):
+        """检查并报告新出现的卡死任务"""
+        now = perf_counter()
+        hung = []
+        with self._lock:
+            for entry in self._running.values():
+                if not entry[4] and now - entry[3] >= self.threshold:
+                    entry[4] = True
+                    hung.append((entry[0], entry[1], now - entry[3]))
+            self._hung_total += len(hung)
+
+        if not hung:
+            return
+
+        threads = {t.ident: t for t in enumerate()}
+        frames = sys._current_frames()
+        for ident, task, elapsed in hung:
+            thread = threads.get(ident)
+            codes = tuple(StackThread._walk(frames.get(ident)))
+            if thread is not None:
+                codes = StackThread._inherited(thread) + codes
+
+            report = {
+                'label': self.describe(task),
+                'thread': thread.name if thread is not None else str(ident),
+                'ident': ident,
+                'elapsed': elapsed,
+                'stack': StackThread._resolve(codes),
+            }
+            try:
+                self.on_hung(report)
+            except BaseException:
+                LOGGER.exception('on_hung 中出现异常：')
+
+    @staticmethod
+    def _log_hung(report: dict[str, Any]):
+        LOGGER.warning(
+            '任务 "%s" 在线程 %s 中已执行 %.3f 秒，调用栈: %s',
+            report['label'], report['thread'], report['elapsed'], ' -> '.join(report['stack']),
+        )
+
+    def stop(self):
+        """停止检查线程"""
+        self._stopped.set()
+        self._thread.join()
+
+
+class BucketPriorityQueue(Queue):
+    """分桶多级优先级队列
+
+    为每个整数优先级维护一个 FIFO 队列，并用位图记录非空的优先级，
+    入队、出队均为 O(1)，适用于优先级为少量小整数的场景。
+    队列元素为 `(priority, ...)` 元组，同优先级元素按入队顺序出队。
+
+    Args:
+        maxsize (int, optional): 队列最大长度，小于等于 0 时不限制. 默认为 0.
+        priority_range (tuple[int, int], optional): 允许的优先级范围 (包含两端). 默认为 (-16, 15).
+
+    Raises:
+        ValueError: 当 priority_range 无效时抛出
+
+    Examples:
+
+        >>> q = BucketPriorityQueue(priority_range=(0, 7))
+        >>> q.put((3, 'c'))
+        >>> q.put((1, 'a'))
+        >>> q.put((3, 'd'))
+        >>> [q.get()[1] for _ in range(3)]
+        ['a', 'c', 'd']
+    """
+
+    def __init__(self, maxsize: int = 0, priority_range: tuple[int, int] = (-16, 15)):
+        if priority_range[0] > priority_range[1]:
+            raise ValueError(f'无效的优先级范围 {priority_range}')
+
+        self.priority_range = priority_range
+        super().__init__(maxsize)
+
+    def _init(self, maxsize):
+        self._low = self.priority_range[0]
+        self._buckets = [deque() for _ in range(self.priority_range[1] - self._low + 1)]
+        self._bitmap = 0
+        self._size = 0
+
+    def _qsize(self):
+        return self._size
+
+    def _put(self, item):
+        index = item[0] - self._low
+        self._buckets[index].append(item)
+        self._bitmap |= 1 << index
+        self._size += 1
+
+    def _get(self):
+        # 最低位的 1 即为最小的非空优先级
+        index = (self._bitmap & -self._bitmap).bit_length() - 1
+        bucket = self._buckets[index]
+        item = bucket.popleft()
+        if not bucket:
+            self._bitmap &= ~(1 << index)
+        self._size -= 1
+        return item
+
+    def check_priority(self, priority: int):
+        """检查优先级是否在允许范围内
+
+        Raises:
+            ValueError: 优先级超出范围或不是整数
+        """
+        if not isinstance(priority, int) or not self.priority_range[0] <= priority <= self.priority_range[1]:
+            raise ValueError(f'优先级 {priority!r} 超出范围 {self.priority_range}')
+
+
+class TenantFairQueue(Queue):
+    """多租户加权公平队列
+
+    每个租户拥有独立的优先级堆，租户内按优先级严格调度 (同优先级先进先出)，
+    租户之间按权重进行加权公平调度 (基于虚拟时间)：每取出一个元素，
+    该租户的虚拟时间增加 1 / 权重，每次从虚拟时间最小的非空租户中取出元素。
+    空闲租户重新入队时，虚拟时间不低于当前虚拟时钟，因此无法积攒额度。
+
+    队列元素为 `(priority, counter, payload)` 元组，租户取自 `payload.tenant` (没有该属性时为 None)。
+
+    Args:
+        maxsize (int, optional): 队列最大长度，小于等于 0 时不限制. 默认为 0.
+        weights (Mapping[Hashable, float], optional): 租户权重，未指定的租户使用 default_weight. 默认为 None.
+        default_weight (float, optional): 默认权重. 默认为 1.
+
+    Raises:
+        ValueError: 当权重小于等于 0 时抛出
+
+    Examples:
+
+        >>> q = TenantFairQueue(weights={'ui': 3, 'discovery': 1})
+    """
+
+    def __init__(self, maxsize: int = 0, weights: Mapping[Hashable, float] | None = None, default_weight: float = 1):
+        self.weights = dict(weights or {})
+        self.default_weight = default_weight
+        if default_weight <= 0 or any(w <= 0 for w in self.weights.values()):
+            raise ValueError('租户权重必须大于 0')
+        super().__init__(maxsize)
+
+    def _init(self, maxsize):
+        self._tenants: dict[Hashable, list] = {}
+        self._vtime: dict[Hashable, float] = {}
+        self._clock = 0.0
+        self._control = deque()
+        self._size = 0
+
+    def _qsize(self):
+        return self._size
+
+    def _put(self, item):
+        self._size += 1
+        payload = item[-1]
+
+        # 关闭信号优先于所有租户
+        if isinstance(payload, _ShutdownSentinel):
+            self._control.append(item)
+            return
+
+        tenant = getattr(payload, 'tenant', None)
+        if (heap := self._tenants.get(tenant)) is None:
+            heap = self._tenants[tenant] = []
+            self._vtime[tenant] = max(self._vtime.get(tenant, 0.0), self._clock)
+        heapq.heappush(heap, item)
+
+    def _get(self):
+        self._size -= 1
+        if self._control:
+            return self._control.popleft()
+
+        tenant = min(self._tenants, key=self._vtime.__getitem__)
+        heap = self._tenants[tenant]
+        item = heapq.heappop(heap)
+
+        self._clock = self._vtime[tenant]
+        self._vtime[tenant] += 1 / self.weights.get(tenant, self.default_weight)
+        if not heap:
+            del self._tenants[tenant]
+            # 虚拟时间未超前的租户重新入队时会被重置为虚拟时钟，无需保留
+            if self._vtime[tenant] <= self._clock:
+                del self._vtime[tenant]
+        return item
+
+    def tenant_sizes(self) -> dict[Hashable, int]:
+        """获取各租户排队中的元素数"""
+        with self.mutex:
+            return {tenant: len(heap) for tenant, heap in self._tenants.items()}
+
+
+class RingChannel:
+    """有界环形缓冲通道
+
+    预分配固定数量的槽位，生产者只推进写指针，消费者只推进读指针，
+    单生产者时读写均无需加锁；多生产者时生产者之间通过一把锁串行写入，消费者仍无锁。
+    等待时先让出 GIL 自旋 `spin` 次，仍未就绪才挂起到 Event 上，
+    对端只有在发现有线程挂起时才会唤醒，避免每个元素都操作条件变量。
+
+    只支持单个消费者，`get` / `get_many` 不能在多个线程中同时调用。
+
+    Args:
+        capacity (int, optional): 槽位数，向上取整为 2 的幂. 默认为 1024.
+        multi_producer (bool, optional): 是否允许多个线程同时写入. 默认为 False.
+        spin (int, optional): 挂起前的自旋次数. 默认为 64.
+
+    Raises:
+        ValueError: capacity 小于等于 0
+
+    Examples:
+
+        >>> channel = RingChannel(4096)
+        >>> server = ServerSocket(protocol='UDP', bind=('0.0.0.0', 8080), on_recv=lambda data, addr, _: channel.put((data, addr)))
+        >>> while True:
+        ...     for data, addr in channel.get_many(64):
+        ...         handle(data, addr)
+    """
+
+    def __init__(self, capacity: int = 1024, *, multi_producer: bool = False, spin: int = 64):
+        if capacity <= 0:
+            raise ValueError('capacity 必须大于 0')
+
+        size = 1 << (capacity - 1).bit_length()
+        self.capacity = size
+        self.spin = spin
+        self._mask = size - 1
+        self._buffer: list[Any] = [None] * size
+        self._head = 0  # 仅消费者修改
+        self._tail = 0  # 仅生产者修改
+        self._put_lock = Lock() if multi_producer else None
+        self._not_empty = Event()
+        self._not_full = Event()
+        self._consumer_parked = False
+        self._producer_parked = False
+        self._closed = False
+
+    def __len__(self) -> int:
+        return self._tail - self._head
+
+    def qsize(self) -> int:
+        """获取通道中的元素数"""
+        return self._tail - self._head
+
+    def empty(self) -> bool:
+        return self._tail == self._head
+
+    def full(self) -> bool:
+        return self._tail - self._head >= self.capacity
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def put(self, item: Any, block: bool = True, timeout: float | None = None):
+        """写入一个元素，通道已满时等待
+
+        Raises:
+            RuntimeError: 通道已关闭
+            queue.Full: 非阻塞或超时时通道已满
+        """
+        if not self.put_many((item, ), block, timeout):
+            raise Full
+
+    def put_many(self, items, block: bool = True, timeout: float | None = None) -> int:
+        """批量写入，空间不足时分批写入并等待消费者腾出空间
+
+        Args:
+            items (Iterable): 要写入的元素
+            block (bool, optional): 空间不足时是否等待. 默认为 True.
+            timeout (float, optional): 最长等待时间 (秒)，为 None 时一直等待. 默认为 None.
+
+        Returns:
+            int: 实际写入的元素数，非阻塞或超时时可能小于元素总数
+
+        Raises:
+            RuntimeError: 通道已关闭
+        """
+        items = items if isinstance(items, (list, tuple)) else list(items)
+        deadline = None if timeout is None else monotonic() + timeout
+
+        lock = self._put_lock
+        if lock is not None:
+            # 非阻塞时 Lock.acquire 不接受超时参数
+            if block:
+                acquired = lock.acquire(True, -1 if deadline is None else max(timeout, 0))
+            else:
+                acquired = lock.acquire(False)
+            if not acquired:
+                return 0
+        try:
+            written = 0
+            total = len(items)
+            while written < total:
+                if self._closed:
+                    raise RuntimeError('通道已关闭')
+
+                free = self.capacity - (self._tail - self._head)
+                if not free:
+                    if not block or not self._wait(self._has_space, self._not_full, True, deadline):
+                        if self._closed:
+                            raise RuntimeError('通道已关闭')
+                        break
+                    continue
+
+                count = min(free, total - written)
+                buffer, mask, tail = self._buffer, self._mask, self._tail
+                for i in range(count):
+                    buffer[(tail + i) & mask] = items[written + i]
+                # 先写槽位再推进写指针，消费者看到新的写指针时数据已就绪
+                self._tail = tail + count
+                written += count
+
+                if self._consumer_parked:
+                    self._consumer_parked = False
+                    self._not_empty.set()
+            return written
+        finally:
+            if lock is not None:
+                lock.release()
+
+    def get(self, block: bool = True, timeout: float | None = None) -> Any:
+        """取出一个元素
+
+        Raises:
+            queue.Empty: 非阻塞或超时时通道为空
+            StopIteration: 通道已关闭且所有元素均已取出
+        """
+        items = self.get_many(1, block, timeout)
+        if not items:
+            raise Empty
+        return items[0]
+
+    def get_many(self, max_items: int | None = None, block: bool = True, timeout: float | None = None) -> list[Any]:
+        """批量取出，至少有一个元素可用时立即返回当前已就绪的元素
+
+        Args:
+            max_items (int, optional): 最多取出的元素数，为 None 时取出全部. 默认为 None.
+            block (bool, optional): 通道为空时是否等待. 默认为 True.
+            timeout (float, optional): 最长等待时间 (秒)，为 None 时一直等待. 默认为 None.
+
+        Returns:
+            list[Any]: 取出的元素，非阻塞或超时时可能为空
+
+        Raises:
+            StopIteration: 通道已关闭且所有元素均已取出
+        """
+        head = self._head
+        if self._tail == head:
+            if self._closed:
+                raise StopIteration
+            deadline = None if timeout is None else monotonic() + timeout
+            if not block or not self._wait(self._has_data, self._not_empty, False, deadline):
+                return []
+            if self._tail == head:
+                # 因关闭而被唤醒
+                raise StopIteration
+
+        count = self._tail - head
+        if max_items is not None and count > max_items:
+            count = max_items
+
+        buffer, mask = self._buffer, self._mask
+        items = [None] * count
+        for i in range(count):
+            index = (head + i) & mask
+            items[i] = buffer[index]
+            buffer[index] = None  # 释放引用
+        self._head = head + count
+
+        if self._producer_parked:
+            self._producer_parked = False
+            self._not_full.set()
+        return items
+
+    def __iter__(self):
+        while True:
+            try:
+                yield self.get()
+            except StopIteration:
+                return
+
+    def close(self):
+        """关闭通道，之后写入会抛出 RuntimeError，消费者取完剩余元素后收到 StopIteration"""
+        self._closed = True
+        self._not_empty.set()
+        self._not_full.set()
+
+    def _has_data(self) -> bool:
+        return self._tail != self._head or self._closed
+
+    def _has_space(self) -> bool:
+        return self._tail - self._head < self.capacity or self._closed
+
+    def _wait(self, ready: Callable[[], bool], event: Event, producer: bool, deadline: float | None) -> bool:
+        """先自旋再挂起，等待 ready 成立，超时返回 False"""
+        for _ in range(self.spin):
+            if ready():
+                return True
+            sleep(0)
+
+        while True:
+            event.clear()
+            # 先声明挂起再复查条件，对端推进指针后一定能看到挂起标记
+            if producer:
+                self._producer_parked = True
+            else:
+                self._consumer_parked = True
+            if ready():
+                return True
+
+            if deadline is None:
+                event.wait()
+            else:
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    return False
+                event.wait(remaining)
+
+
 @func_util.singleton
 class _ShutdownSentinel:
     """线程池关闭信号的哨兵对象"""
@@ -109,23 +978,43 @@ class _ShutdownSentinel:
 class _PriorityWorkItem:
     """包装优先级任务的工作项"""
 
-    __slots__ = ('priority', 'future', 'task', 'args', 'kwargs')
+    __slots__ = ('priority', 'future', 'task', 'args', 'kwargs', 'enqueue_time', 'key', 'tag', 'deadline', 'tenant')
 
-    def __init__(self, priority: int, future: Future, task: Task, args: tuple, kwargs: dict):
+    # 是否由工作线程记录运行指标
+    counted = True
+
+    def __init__(
+        self,
+        priority: int,
+        future: Future,
+        task: Task,
+        args: tuple,
+        kwargs: dict,
+        key: Hashable | None = None,
+        tag: Hashable | None = None,
+        deadline: float | None = None,
+        tenant: Hashable | None = None,
+    ):
         self.priority = priority
         self.future = future
         self.task = task
         self.args = args
         self.kwargs = kwargs
+        self.enqueue_time = perf_counter()
+        self.key = key
+        self.tag = tag
+        # 最迟开始时间 (perf_counter 时间戳)
+        self.deadline = None if deadline is None else self.enqueue_time + deadline
+        self.tenant = tenant
 
     def __lt__(self, other):
         """用于优先级队列的比较，优先级小的任务优先执行"""
         return self.priority < other.priority
 
-    def run(self):
-        """执行任务并设置 future 的结果"""
+    def run(self) -> Literal['completed', 'failed', 'cancelled']:
+        """执行任务并设置 future 的结果，返回任务的执行结果类型"""
         if not self.future.set_running_or_notify_cancel():
-            return
+            return 'cancelled'
 
         try:
             result = self.task(*self.args, **self.kwargs)
@@ -133,8 +1022,194 @@ class _PriorityWorkItem:
             self.future.set_exception(exc)
             # 打破异常和 self 的引用循环
             self = None
+            return 'failed'
         else:
             self.future.set_result(result)
+            return 'completed'
+
+
+class _SerialWorkItem(_PriorityWorkItem):
+    """按键串行任务的调度工作项，运行指标由 `_run_serial` 按实际任务记录"""
+
+    __slots__ = ()
+
+    counted = False
+
+
+class _ExecutorStats:
+    """执行器运行指标
+
+    只在任务入队、开始、结束时各更新一次计数，不记录单个任务的日志。
+    """
+
+    def __init__(self, max_workers: int):
+        self._lock = Lock()
+        self._max_workers = max_workers
+        self._created = perf_counter()
+        self._busy_workers = 0
+        self._busy_time = 0.0
+        self._counts = {'submitted': 0, 'coalesced': 0, 'completed': 0, 'failed': 0, 'cancelled': 0, 'expired': 0}
+        # 优先级 -> [排队数, 已开始数, 等待总时长, 最大等待时长, 运行总时长, 最大运行时长]
+        self._levels: dict[int, list] = {}
+
+    def _level(self, priority: int) -> list:
+        if (level := self._levels.get(priority)) is None:
+            level = self._levels[priority] = [0, 0, 0.0, 0.0, 0.0, 0.0]
+        return level
+
+    def on_submit(self, priority: int):
+        with self._lock:
+            self._counts['submitted'] += 1
+            self._level(priority)[0] += 1
+
+    def on_coalesce(self):
+        with self._lock:
+            self._counts['coalesced'] += 1
+
+    def on_start(self, priority: int, wait: float):
+        with self._lock:
+            level = self._level(priority)
+            level[0] -= 1
+            level[1] += 1
+            level[2] += wait
+            if wait > level[3]: level[3] = wait
+            self._busy_workers += 1
+
+    def on_finish(self, priority: int, elapsed: float, outcome: str):
+        with self._lock:
+            level = self._level(priority)
+            level[4] += elapsed
+            if elapsed > level[5]: level[5] = elapsed
+            self._busy_workers -= 1
+            self._busy_time += elapsed
+            self._counts[outcome] += 1
+
+    def on_reject(self, priority: int):
+        """撤销提交计数 (任务已计入提交但最终未能放入队列)"""
+        with self._lock:
+            self._counts['submitted'] -= 1
+            self._level(priority)[0] -= 1
+
+    def on_cancel(self, priority: int, outcome: Literal['cancelled', 'expired'] = 'cancelled'):
+        """任务未开始执行就被取消 (如关闭线程池时取消待执行任务、任务超过最迟开始时间)"""
+        with self._lock:
+            self._level(priority)[0] -= 1
+            self._counts[outcome] += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            uptime = perf_counter() - self._created
+            priorities = {
+                priority: {
+                    'queued': queued,
+                    'started': started,
+                    'wait_avg': wait_total / started if started else 0.0,
+                    'wait_max': wait_max,
+                    'run_avg': run_total / started if started else 0.0,
+                    'run_max': run_max,
+                }
+                for priority, (queued, started, wait_total, wait_max, run_total, run_max)
+                in sorted(self._levels.items())
+            }
+            return {
+                **self._counts,
+                'workers': self._max_workers,
+                'busy_workers': self._busy_workers,
+                'utilization': self._busy_time / (uptime * self._max_workers) if uptime else 0.0,
+                'queue_depth': sum(p['queued'] for p in priorities.values()),
+                'priorities': priorities,
+            }
+
+
+class _CoroutineRunner:
+    """在专用事件循环线程中按优先级运行协程
+
+    协程先进入优先级堆排队，同时运行的协程数达到上限时，后续协程按优先级依次准入。
+    除事件循环线程外，其他线程只通过 `call_soon_threadsafe` 访问内部状态。
+    """
+
+    def __init__(self, name: str, max_concurrency: int | None):
+        self._loop = asyncio.new_event_loop()
+        self._heap = []
+        self._counter = itertools.count().__next__
+        self._running = 0
+        self._max_concurrency = max_concurrency
+        self._closing = False
+        self._thread = Thread(name=name, target=self._run_loop, daemon=True)
+        self._thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.close()
+
+    def submit(self, priority: int, future: Future, coro_fn: Callable[..., Any], args: tuple, kwargs: dict):
+        """将协程函数放入准入队列"""
+        entry = (priority, self._counter(), future, coro_fn, args, kwargs)
+        self._loop.call_soon_threadsafe(self._push, entry)
+
+    def _push(self, entry: tuple):
+        heapq.heappush(self._heap, entry)
+        self._admit()
+
+    def _admit(self):
+        """按优先级准入协程，直到达到并发上限"""
+        while self._heap and (self._max_concurrency is None or self._running < self._max_concurrency):
+            _, _, future, coro_fn, args, kwargs = heapq.heappop(self._heap)
+            if future.cancelled():
+                continue
+
+            try:
+                task = self._loop.create_task(coro_fn(*args, **kwargs))
+            except BaseException as exc:
+                future.set_exception(exc)
+                continue
+
+            self._running += 1
+            task.add_done_callback(partial(self._on_task_done, future))
+            future.add_done_callback(partial(self._on_future_done, task))
+
+        if self._closing and not self._heap and not self._running:
+            self._loop.stop()
+
+    def _on_future_done(self, task: asyncio.Task, future: Future):
+        """调用方取消 future 时，同步取消事件循环中的 task"""
+        if future.cancelled():
+            self._loop.call_soon_threadsafe(task.cancel)
+
+    def _on_task_done(self, future: Future, task: asyncio.Task):
+        self._running -= 1
+
+        try:
+            if future.done():
+                pass
+            elif task.cancelled():
+                future.cancel()
+            elif (exc := task.exception()) is not None:
+                future.set_exception(exc)
+            else:
+                future.set_result(task.result())
+        except InvalidStateError:
+            # future 在此期间被调用方取消
+            pass
+
+        self._admit()
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False):
+        """待所有协程结束后停止事件循环"""
+        def close():
+            self._closing = True
+            if cancel_futures:
+                for entry in self._heap:
+                    entry[2].cancel()
+                self._heap.clear()
+            self._admit()
+
+        self._loop.call_soon_threadsafe(close)
+        if wait:
+            self._thread.join()
 
 
 class PriorityThreadPoolExecutor(Executor):
@@ -148,6 +1223,14 @@ class PriorityThreadPoolExecutor(Executor):
         thread_name_prefix: str = '',
         initializer: Callable[..., None] | None = None,
         initargs: tuple = (),
+        coroutine_concurrency: int | None = None,
+        stats_callback: Callable[[dict[str, Any]], Any] | None = None,
+        stats_interval: float = 60,
+        queue_backend: Literal['heap', 'bucket', 'fair'] = 'heap',
+        priority_range: tuple[int, int] = (-16, 15),
+        tenant_weights: Mapping[Hashable, float] | None = None,
+        scheduling: Literal['priority', 'edf'] = 'priority',
+        watchdog: Watchdog | None = None,
     ):
         """基于优先级队列的线程池执行器
 
@@ -159,10 +1242,31 @@ class PriorityThreadPoolExecutor(Executor):
             thread_name_prefix (str, optional): 线程名称前缀，用于调试和日志记录
             initializer (Callable[..., None], optional): 可选的初始化函数，在每个工作线程启动时调用
             initargs (tuple, optional): 传递给初始化函数的参数元组
+            coroutine_concurrency (int, optional): 专用事件循环中同时运行的协程数上限，默认为不限制
+            stats_callback (Callable[[dict], Any], optional): 定期以 `stats()` 快照为参数调用的回调函数
+            stats_interval (float, optional): 调用 stats_callback 的间隔 (秒)，默认为 60
+            queue_backend (str, optional): 任务队列实现，默认为 'heap'
+
+                - 'heap': 基于堆的 `PriorityQueue`，支持任意可比较的优先级
+                - 'bucket': 分桶多级队列 `BucketPriorityQueue`，入队、出队均为 O(1)，
+                  仅支持 priority_range 范围内的整数优先级
+                - 'fair': 多租户加权公平队列 `TenantFairQueue`，租户之间按权重公平调度，
+                  租户内按优先级调度，通过 submit 的 tenant 参数指定租户
+
+            priority_range (tuple[int, int], optional): 'bucket' 队列允许的优先级范围 (包含两端)，默认为 (-16, 15)
+            tenant_weights (Mapping[Hashable, float], optional): 'fair' 队列的租户权重，未指定的租户权重为 1
+            scheduling (str, optional): 调度方式，默认为 'priority'
+
+                - 'priority': 按优先级调度，优先级相同时按提交顺序执行
+                - 'edf': 最早截止时间优先，按最迟开始时间调度，相同时按优先级调度，
+                  未指定 deadline 的任务排在所有指定了 deadline 的任务之后，仅支持 'heap' 队列
+
+            watchdog (Watchdog, optional): 卡死任务看门狗，设置后监视每个任务的执行时间
 
         Raises:
-            ValueError: 当 max_workers <= 0 时抛出
-            TypeError: 当 initializer 不可调用时抛出
+            ValueError: 当 max_workers <= 0、coroutine_concurrency <= 0、stats_interval <= 0
+                或 queue_backend、priority_range、scheduling 无效时抛出
+            TypeError: 当 initializer 或 stats_callback 不可调用时抛出
 
         Examples:
 
@@ -192,11 +1296,40 @@ class PriorityThreadPoolExecutor(Executor):
             max_workers = min(32, (os.cpu_count() or 1) + 4)
         if max_workers <= 0:
             raise ValueError('max_workers 必须大于 0')
+        if coroutine_concurrency is not None and coroutine_concurrency <= 0:
+            raise ValueError('coroutine_concurrency 必须大于 0')
+        if stats_interval <= 0:
+            raise ValueError('stats_interval 必须大于 0')
         if initializer is not None and not callable(initializer):
             raise TypeError('initializer 必须是 callable 对象')
+        if stats_callback is not None and not callable(stats_callback):
+            raise TypeError('stats_callback 必须是 callable 对象')
 
         self._max_workers = max_workers
-        self._queue = PriorityQueue[tuple[int, int, _PriorityWorkItem | _ShutdownSentinel] | _ShutdownSentinel]()
+        match queue_backend:
+            case 'heap':
+                self._queue = PriorityQueue[tuple[int, int, _PriorityWorkItem | _ShutdownSentinel] | _ShutdownSentinel]()
+                self._sentinel_priority = -1
+            case 'bucket':
+                self._queue = BucketPriorityQueue(priority_range=priority_range)
+                self._sentinel_priority = priority_range[0]
+            case 'fair':
+                self._queue = TenantFairQueue(weights=tenant_weights)
+                self._sentinel_priority = -1
+            case _:
+                raise ValueError(f'无效的 queue_backend "{queue_backend}"，应为 [heap, bucket, fair]')
+        match scheduling:
+            case 'priority':
+                pass
+            case 'edf' if queue_backend == 'heap':
+                # 队列排序键为 (最迟开始时间, 优先级)
+                self._sentinel_priority = (float('-inf'), -1)
+            case 'edf':
+                raise ValueError("scheduling 为 'edf' 时 queue_backend 必须为 'heap'")
+            case _:
+                raise ValueError(f'无效的 scheduling "{scheduling}"，应为 [priority, edf]')
+        self._edf = scheduling == 'edf'
+        self._watchdog = watchdog
         self._idle_semaphore = Semaphore(0)
         self._threads = set()
         self._shutdown = False
@@ -210,6 +1343,14 @@ class PriorityThreadPoolExecutor(Executor):
         self._broken = False
         self._task_counter = 0  # 用于同优先级任务的 FIFO 排序
         self._task_wrapper = None
+        self._coroutine_concurrency = coroutine_concurrency
+        self._coroutine_runner: _CoroutineRunner | None = None
+        self._stats = _ExecutorStats(max_workers)
+        self._stats_stopped = Event()
+        self._pending_keys: dict[Hashable, _PriorityWorkItem] = {}
+        self._pending_tags: dict[Hashable, set[_PriorityWorkItem]] = {}
+        self._serial_queues: dict[Hashable, deque[_PriorityWorkItem]] = {}
+        self._serial_lock = Lock()
 
         # 在初始化时创建所有工作线程
         for i in range(self._max_workers):
@@ -222,6 +1363,14 @@ class PriorityThreadPoolExecutor(Executor):
             t.start()
             self._threads.add(t)
 
+        if stats_callback is not None:
+            Thread(
+                name='%s_stats' % self._thread_name_prefix,
+                target=self._report_stats,
+                args=(stats_callback, stats_interval),
+                daemon=True,
+            ).start()
+
     def task_wrapper(self, wrapper: Callable[[Task, ParamSpecArgs, ParamSpecKwargs], Any]):
         """装饰器，设置任务包装函数
 
@@ -244,6 +1393,10 @@ class PriorityThreadPoolExecutor(Executor):
         task: Task,
         *args,
         priority: int = 0,
+        key: Hashable | None = None,
+        tag: Hashable | None = None,
+        deadline: float | None = None,
+        tenant: Hashable | None = None,
         **kwargs
     ) -> Future:
         """提交任务到线程池
@@ -252,76 +1405,349 @@ class PriorityThreadPoolExecutor(Executor):
             task: 要执行的可调用对象
             *args: 传递给 task 的位置参数
             priority: 任务优先级，值越小越优先执行。默认为 0
-            **kwargs: 传递给 task 的关键字参数
+                使用 'bucket' 队列时必须为 priority_range 范围内的整数
+            key: 去重键，存在 key 相同且尚未开始执行的任务时，不再提交新任务，
+                直接返回已有任务的 future (保持已有任务的优先级与参数)。默认为 None
+            tag: 分组标签，可通过 `cancel_group(tag)` 取消该组所有尚未开始的任务。默认为 None
+            deadline: 最迟开始时间，为相对提交时刻的秒数，任务出队时已超过该时间则不再执行，
+                并取消其 future。默认为 None (不限制)
+            tenant: 租户，仅 'fair' 队列可用，不同租户之间按权重公平调度。默认为 None
+            **kwargs: 传递给 task 的关键字参数，
+                priority、key、tag、deadline、tenant 为保留参数，不会传递给 task，
+                需要传递同名参数时请使用 `functools.partial` 包装 task
 
         Returns:
             Future: 表示异步执行的任务
 
         Raises:
             RuntimeError: 当线程池已关闭或线程初始化失败时
+            ValueError: 使用 'bucket' 队列且优先级超出范围，或非 'fair' 队列指定了 tenant 时
+            TypeError: key 为可调用对象时 (通常是想传递给 task 的参数，如 `sorted` 的 key)
 
         例子：
             >>> executor = PriorityThreadPoolExecutor()
             >>> f1 = executor.submit(lambda x: x * 2, 5, priority=0)
             >>> f2 = executor.submit(lambda x: x + 10, 3, priority=-1)
             >>> print(f1.result(), f2.result())
+
+            >>> # 合并重复的刷新任务
+            >>> f1 = executor.submit(refresh, device_id, key=('refresh', device_id), tag='refresh')
+            >>> f2 = executor.submit(refresh, device_id, key=('refresh', device_id), tag='refresh')
+            >>> assert f1 is f2
+            >>> executor.cancel_group('refresh')
+
+            >>> # 向 task 传递 key 参数
+            >>> f = executor.submit(partial(sorted, key=len), ['b', 'aa'])
+
+            >>> # 500 毫秒内未开始执行则放弃
+            >>> f = executor.submit(reply_poll, device_id, deadline=0.5)
+
+            >>> # 按租户加权公平调度
+            >>> executor = PriorityThreadPoolExecutor(queue_backend='fair', tenant_weights={'ui': 3})
+            >>> f = executor.submit(render, tenant='ui')
         """
+        if callable(key):
+            raise TypeError('key 为去重键，不能是可调用对象，需要向 task 传递 key 参数时请使用 functools.partial')
+
         with self._shutdown_lock:
             if self._broken:
                 raise RuntimeError(self._broken)
             if self._shutdown:
                 raise RuntimeError('线程池已关闭，无法提交任务')
 
-            def wrapped_task(*args, **kwargs):
-                if callable(self._task_wrapper):
-                    return self._task_wrapper(task, *args, **kwargs)
+            if isinstance(self._queue, BucketPriorityQueue):
+                self._queue.check_priority(priority)
+            if tenant is not None and not isinstance(self._queue, TenantFairQueue):
+                raise ValueError("指定 tenant 时 queue_backend 必须为 'fair'")
 
-                return task(*args, **kwargs)
+            if key is not None and (pending := self._pending_keys.get(key)) and not pending.future.cancelled():
+                self._stats.on_coalesce()
+                return pending.future
 
             f = Future()
-            w = _PriorityWorkItem(priority, f, wrapped_task, args, kwargs)
+            w = _PriorityWorkItem(priority, f, self._wrap_task(task), args, kwargs, key, tag, deadline, tenant)
 
-            # 将任务和计数器一起放入队列，确保同优先级任务按提交顺序执行
-            self._queue.put((priority, self._task_counter, w))
-            self._task_counter += 1
+            if key is not None:
+                self._pending_keys[key] = w
+            if tag is not None:
+                self._pending_tags.setdefault(tag, set()).add(w)
+
+            self._stats.on_submit(priority)
+            self._put_work_item(w)
 
             return f
 
-    def _worker(self):
-        """工作线程的主循环"""
-        try:
-            # 调用初始化函数
-            print(5666, self._initializer)
-            if self._initializer:
-                try:
-                    self._initializer(*self._initargs)
-                except BaseException:
-                    LOGGER.critical('initializer 中出现异常：', exc_info=True)
-                    with self._shutdown_lock:
-                        self._broken = (
-                            'initializer 执行异常，线程池不再可用'
-                        )
-                    # 唤醒其他等待中的工作线程
-                    self._queue.put((-1, -1, _ShutdownSentinel()))
-                    return
+    def _wrap_task(self, task: Task) -> Task:
+        """使用任务包装函数包装 task"""
+        def wrapped_task(*args, **kwargs):
+            if callable(self._task_wrapper):
+                return self._task_wrapper(task, *args, **kwargs)
+
+            return task(*args, **kwargs)
+        wrapped_task.__wrapped__ = task
+        return wrapped_task
+
+    def _put_work_item(self, w: _PriorityWorkItem):
+        """将工作项放入队列，调用方需持有 _shutdown_lock"""
+        # 将任务和计数器一起放入队列，确保同优先级任务按提交顺序执行
+        if self._edf:
+            sort_key = (float('inf') if w.deadline is None else w.deadline, w.priority)
+            self._queue.put((sort_key, self._task_counter, w))
+        else:
+            self._queue.put((w.priority, self._task_counter, w))
+        self._task_counter += 1
 
-            while True:
-                # 尝试获取任务
-                try:
-                    work_item = self._queue.get_nowait()
-                except Empty:
-                    # 队列为空，尝试增加空闲信号量
-                    with self._shutdown_lock:
-                        # 再检查一次队列不为空且未关闭
-                        if self._queue.empty() and not self._shutdown:
-                            self._idle_semaphore.release()
-                    # 阻塞等待任务
-                    work_item = self._queue.get(block=True)
+    def submit_keyed(
+        self,
+        key: Hashable,
+        task: Task,
+        *args,
+        priority: int = 0,
+        **kwargs
+    ) -> Future:
+        """按键串行提交任务
+
+        key 相同的任务按提交顺序依次执行，同一时刻最多只有一个在执行；
+        key 不同的任务在共享的工作线程中并行执行。
+        每个任务执行完毕后，同 key 的下一个任务以其自身的优先级重新排队，避免长时间占用工作线程。
+        某个 key 的任务全部执行完毕后，自动清除该 key 的队列。
+        运行指标 (`stats()`) 按每个任务单独记录，等待同 key 前序任务的时间计入排队时长。
+
+        Args:
+            key: 串行键，如设备 id
+            task: 要执行的可调用对象
+            *args: 传递给 task 的位置参数
+            priority: 任务优先级，值越小越优先执行。默认为 0
+            **kwargs: 传递给 task 的关键字参数
+
+        Returns:
+            Future: 表示异步执行的任务
+
+        Raises:
+            RuntimeError: 当线程池已关闭或线程初始化失败时
+            ValueError: 使用 'bucket' 队列且优先级超出范围时
+
+        例子：
+            >>> for state in states:
+            ...     executor.submit_keyed(state.device_id, apply_state, state)
+        """
+        if isinstance(self._queue, BucketPriorityQueue):
+            self._queue.check_priority(priority)
+
+        f = Future()
+        w = _PriorityWorkItem(priority, f, task, args, kwargs)
+
+        with self._serial_lock:
+            self._stats.on_submit(priority)
+            if (queue := self._serial_queues.get(key)) is not None:
+                # 该 key 已有任务在排队或执行，由其执行完毕后调度
+                queue.append(w)
+                return f
+            self._serial_queues[key] = deque([w])
+
+        try:
+            self._submit_serial(key, priority)
+        except BaseException:
+            # 期间其他线程可能已向该 key 追加任务，或 shutdown 已清除队列 (已计为取消)
+            with self._serial_lock:
+                queue = self._serial_queues.pop(key, ())
+            for other in queue:
+                if other is w:
+                    self._stats.on_reject(w.priority)
+                else:
+                    other.future.cancel()
+                    self._stats.on_cancel(other.priority)
+            raise
+
+        return f
+
+    def _submit_serial(self, key: Hashable, priority: int):
+        """提交执行 key 队列中下一个任务的调度工作项"""
+        with self._shutdown_lock:
+            if self._broken:
+                raise RuntimeError(self._broken)
+            if self._shutdown:
+                raise RuntimeError('线程池已关闭，无法提交任务')
+
+            self._put_work_item(_SerialWorkItem(priority, Future(), self._wrap_task(self._run_serial), (key, ), {}))
+
+    def _run_serial(self, key: Hashable):
+        """执行 key 队列中的第一个任务，并调度下一个任务"""
+        with self._serial_lock:
+            # 关闭线程池并取消任务时，队列会被整体移除
+            if not (queue := self._serial_queues.get(key)):
+                return
+            w = queue.popleft()
+
+        if w.future.cancelled():
+            self._stats.on_cancel(w.priority)
+        else:
+            start = perf_counter()
+            self._stats.on_start(w.priority, start - w.enqueue_time)
+            outcome = 'failed'
+            try:
+                outcome = w.run()
+            finally:
+                self._stats.on_finish(w.priority, perf_counter() - start, outcome)
+        del w
+
+        with self._serial_lock:
+            if (queue := self._serial_queues.get(key)) is None:
+                return
+            if not queue:
+                del self._serial_queues[key]
+                return
+            priority = queue[0].priority
+
+        try:
+            self._submit_serial(key, priority)
+        except RuntimeError:
+            # 线程池已关闭，取消剩余任务
+            with self._serial_lock:
+                queue = self._serial_queues.pop(key, ())
+            for w in queue:
+                w.future.cancel()
+                self._stats.on_cancel(w.priority)
+
+    def submit_coroutine(
+        self,
+        coro_fn: Callable[..., Any],
+        *args,
+        priority: int = 0,
+        **kwargs
+    ) -> Future:
+        """提交协程函数，在执行器专用的事件循环线程中作为 task 运行
+
+        事件循环线程在首次提交时创建，同时运行的协程数受 coroutine_concurrency 限制，
+        超出上限的协程按优先级排队准入。取消返回的 future 会同时取消对应的 task。
+
+        Args:
+            coro_fn: 协程函数
+            *args: 传递给 coro_fn 的位置参数
+            priority: 准入优先级，值越小越优先。默认为 0
+            **kwargs: 传递给 coro_fn 的关键字参数
+
+        Returns:
+            Future: 表示协程执行结果
+
+        Raises:
+            RuntimeError: 当线程池已关闭或线程初始化失败时
+
+        例子：
+            >>> async def fetch(url):
+            ...     await asyncio.sleep(1)
+            ...     return url
+            >>> f = executor.submit_coroutine(fetch, 'http://example.com', priority=-1)
+            >>> print(f.result())
+        """
+        with self._shutdown_lock:
+            if self._broken:
+                raise RuntimeError(self._broken)
+            if self._shutdown:
+                raise RuntimeError('线程池已关闭，无法提交任务')
+
+            if self._coroutine_runner is None:
+                self._coroutine_runner = _CoroutineRunner(
+                    '%s_loop' % self._thread_name_prefix,
+                    self._coroutine_concurrency,
+                )
+
+            f = Future()
+            self._coroutine_runner.submit(priority, f, coro_fn, args, kwargs)
+
+            return f
+
+    def cancel_group(self, tag: Hashable) -> int:
+        """取消指定分组中所有尚未开始执行的任务
+
+        Args:
+            tag: 提交任务时指定的分组标签
+
+        Returns:
+            int: 成功取消的任务数
+        """
+        with self._shutdown_lock:
+            group = self._pending_tags.pop(tag, ())
+            for w in group:
+                if w.key is not None and self._pending_keys.get(w.key) is w:
+                    del self._pending_keys[w.key]
+
+        return sum(1 for w in group if w.future.cancel())
+
+    def _forget(self, work_item: _PriorityWorkItem):
+        """任务出队后，从去重表与分组表中移除"""
+        if work_item.key is None and work_item.tag is None:
+            return
+
+        with self._shutdown_lock:
+            if work_item.key is not None and self._pending_keys.get(work_item.key) is work_item:
+                del self._pending_keys[work_item.key]
+            if work_item.tag is not None and (group := self._pending_tags.get(work_item.tag)):
+                group.discard(work_item)
+                if not group:
+                    del self._pending_tags[work_item.tag]
+
+    async def run(self, task: Task, *args, priority: int = 0, **kwargs) -> Any:
+        """在 asyncio 中等待任务执行结果
+
+        普通函数提交到工作线程执行，协程函数提交到专用事件循环执行 (见 `submit_coroutine`)。
+        取消等待中的 asyncio task 会取消尚未开始的任务 (或对应的协程)，
+        任务被取消时等待方也会收到 `asyncio.CancelledError`。
+
+        Args:
+            task: 要执行的函数或协程函数
+            *args: 传递给 task 的位置参数
+            priority: 任务优先级，值越小越优先执行。默认为 0
+            **kwargs: 传递给 task 的关键字参数
+
+        Returns:
+            Any: 任务返回值
+
+        例子：
+            >>> async def main():
+            ...     data = await executor.run(read_file, 'a.txt', priority=-1)
+        """
+        if iscoroutinefunction(task):
+            f = self.submit_coroutine(task, *args, priority=priority, **kwargs)
+        else:
+            f = self.submit(task, *args, priority=priority, **kwargs)
+
+        return await asyncio.wrap_future(f)
+
+    def _worker(self):
+        """工作线程的主循环"""
+        try:
+            # 调用初始化函数
+            if self._initializer:
+                try:
+                    self._initializer(*self._initargs)
+                except BaseException:
+                    LOGGER.critical('initializer 中出现异常：', exc_info=True)
+                    with self._shutdown_lock:
+                        self._broken = (
+                            'initializer 执行异常，线程池不再可用'
+                        )
+                    # 唤醒其他等待中的工作线程
+                    self._queue.put((self._sentinel_priority, -1, _ShutdownSentinel()))
+                    return
+
+            while True:
+                # 尝试获取任务
+                try:
+                    work_item = self._queue.get_nowait()
+                except Empty:
+                    # 队列为空，尝试增加空闲信号量
+                    with self._shutdown_lock:
+                        # 再检查一次队列不为空且未关闭
+                        if self._queue.empty() and not self._shutdown:
+                            self._idle_semaphore.release()
+                    # 阻塞等待任务
+                    work_item = self._queue.get(block=True)
 
                 # 如果收到哨兵对象，说明线程池关闭或初始化失败
                 if isinstance(work_item, _ShutdownSentinel):
                     # 把哨兵对象放回去，以便其他线程也能收到关闭信号
-                    self._queue.put((-1, -1, work_item))
+                    self._queue.put((self._sentinel_priority, -1, work_item))
                     return
 
                 if isinstance(work_item, tuple):
@@ -334,14 +1760,78 @@ class PriorityThreadPoolExecutor(Executor):
 
                     work_item = actual_item
 
+                self._forget(work_item)
+
+                if (
+                    work_item.deadline is not None
+                    and perf_counter() > work_item.deadline
+                    and not work_item.future.cancelled()
+                ):
+                    work_item.future.cancel()
+                    self._stats.on_cancel(work_item.priority, 'expired')
+                    del work_item
+                    continue
+
+                # 已取消 (如 cancel_group 或调用方取消 future) 的任务不计入开始与等待时长
+                if work_item.future.cancelled():
+                    if work_item.counted:
+                        self._stats.on_cancel(work_item.priority)
+                    del work_item
+                    continue
+
+                # 按键串行的调度工作项不计入指标，由 _run_serial 记录实际任务
+                counted = work_item.counted
+                start = perf_counter()
+                if counted:
+                    self._stats.on_start(work_item.priority, start - work_item.enqueue_time)
+                outcome = 'failed'
+                token = self._watchdog.begin(work_item.task, self) if self._watchdog else None
                 try:
-                    work_item.run()
+                    outcome = work_item.run()
                 finally:
+                    if token is not None:
+                        self._watchdog.end(token)
+                    if counted:
+                        self._stats.on_finish(work_item.priority, perf_counter() - start, outcome)
                     del work_item
 
         except BaseException:
             LOGGER.critical('Exception in worker', exc_info=True)
 
+    def stats(self) -> dict[str, Any]:
+        """获取线程池运行指标快照
+
+        Returns:
+            dict[str, Any]: 指标快照，包含以下字段:
+
+                - submitted / completed / failed / cancelled: 已提交、成功、失败、取消的任务数
+                - coalesced: 因 key 相同而合并到已有任务的提交次数
+                - expired: 超过最迟开始时间而被取消的任务数
+                - workers: 工作线程数
+                - busy_workers: 正在执行任务的线程数
+                - stuck_workers: 执行时间超过看门狗阈值的线程数 (未设置 watchdog 时为 0)
+                - utilization: 创建以来工作线程的平均利用率 (0~1)
+                - queue_depth: 排队中的任务数 (包括 `submit_keyed` 中等待同 key 前序任务的任务)，
+                  已取消的任务在工作线程将其取出时才计为取消
+                - priorities: 各优先级的指标 `{priority: {queued, started, wait_avg, wait_max, run_avg, run_max}}`,
+                  wait 为入队到开始执行的时长，run 为执行时长，单位为秒
+
+        例子：
+            >>> executor.stats()['priorities'][0]['wait_avg']
+            0.0012
+        """
+        snapshot = self._stats.snapshot()
+        snapshot['stuck_workers'] = self._watchdog.stuck_count(self) if self._watchdog else 0
+        return snapshot
+
+    def _report_stats(self, callback: Callable[[dict[str, Any]], Any], interval: float):
+        """定期调用指标回调函数，直到线程池关闭"""
+        while not self._stats_stopped.wait(interval):
+            try:
+                callback(self.stats())
+            except BaseException:
+                LOGGER.exception('stats_callback 中出现异常：')
+
     def shutdown(self, wait: bool = True, cancel_futures: bool = False):
         """关闭线程池
 
@@ -370,12 +1860,33 @@ class PriorityThreadPoolExecutor(Executor):
 
                             if not isinstance(work_item, _ShutdownSentinel):
                                 work_item.future.cancel()
+                                if work_item.counted:
+                                    self._stats.on_cancel(work_item.priority)
                         elif not isinstance(item, _ShutdownSentinel):
                             work_item = item
                             work_item.future.cancel()
+                            if work_item.counted:
+                                self._stats.on_cancel(work_item.priority)
+
+                self._pending_keys.clear()
+                self._pending_tags.clear()
+
+                # 取消 submit_keyed 中排队的任务 (正在执行的任务已从队列中取出，不受影响)
+                with self._serial_lock:
+                    serial_queues = list(self._serial_queues.values())
+                    self._serial_queues.clear()
+                for queue in serial_queues:
+                    for work_item in queue:
+                        work_item.future.cancel()
+                        self._stats.on_cancel(work_item.priority)
 
             # 发送哨兵信号告知所有工作线程关闭
-            self._queue.put((-1, -1, _ShutdownSentinel()))
+            self._queue.put((self._sentinel_priority, -1, _ShutdownSentinel()))
+
+        self._stats_stopped.set()
+
+        if self._coroutine_runner is not None:
+            self._coroutine_runner.shutdown(wait=wait, cancel_futures=cancel_futures)
 
         if wait:
             for t in self._threads:
@@ -391,6 +1902,661 @@ class PriorityThreadPoolExecutor(Executor):
         return False
 
 
+def _run_process_chunk(calls: list[tuple[Task, tuple, dict]]) -> list[tuple[bool, Any]]:
+    """在子进程中依次执行一批任务，返回 (是否成功, 结果或异常) 列表"""
+    results = []
+    for task, args, kwargs in calls:
+        try:
+            results.append((True, task(*args, **kwargs)))
+        except BaseException as exc:
+            results.append((False, exc))
+    return results
+
+
+class PriorityProcessPoolExecutor(Executor):
+
+    # 用于生成唯一的执行器 ID
+    _counter = itertools.count().__next__
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        mp_context: BaseContext | None = None,
+        initializer: Callable[..., None] | None = None,
+        initargs: tuple = (),
+        chunksize: int = 1,
+    ):
+        """基于优先级队列的进程池执行器
+
+        适用于 CPU 密集型任务，接口与 `PriorityThreadPoolExecutor` 保持一致。
+        任务在父进程中按优先级排队，由调度线程成批 (chunksize) 发送给子进程执行，
+        同时在途的批次数不超过 max_workers，以保证高优先级任务能尽快被调度。
+
+        注：任务及其参数、返回值必须可以被 pickle 序列化。
+
+        Args:
+            max_workers (int, optional): 最大工作进程数，默认为 CPU 核数
+            mp_context (BaseContext, optional): multiprocessing 上下文，默认为 None
+            initializer (Callable[..., None], optional): 可选的初始化函数，在每个工作进程启动时调用
+            initargs (tuple, optional): 传递给初始化函数的参数元组
+            chunksize (int, optional): 每次发送给子进程的最大任务数，任务很小时调大可以减少进程间通信开销. 默认为 1.
+
+        Raises:
+            ValueError: 当 max_workers <= 0 或 chunksize <= 0 时抛出
+            TypeError: 当 initializer 不可调用时抛出
+
+        Examples:
+
+            >>> with PriorityProcessPoolExecutor(max_workers=4, chunksize=16) as executor:
+            ...     f1 = executor.submit(pow, 2, 10, priority=1)
+            ...     f2 = executor.submit(sum, [1, 2, 3], priority=-1)
+            ...     print(f1.result(), f2.result())
+        """
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        if max_workers <= 0:
+            raise ValueError('max_workers 必须大于 0')
+        if chunksize <= 0:
+            raise ValueError('chunksize 必须大于 0')
+        if initializer is not None and not callable(initializer):
+            raise TypeError('initializer 必须是 callable 对象')
+
+        self._max_workers = max_workers
+        self._chunksize = chunksize
+        self._queue = PriorityQueue[tuple[float, int, _PriorityWorkItem | _ShutdownSentinel]]()
+        self._pool = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=mp_context,
+            initializer=initializer,
+            initargs=initargs,
+        )
+        # 限制在途批次数，未发送的任务留在父进程中按优先级排队
+        self._slots = Semaphore(max_workers)
+        self._shutdown = False
+        self._shutdown_lock = Lock()
+        self._broken = False
+        self._task_counter = 0  # 用于同优先级任务的 FIFO 排序
+
+        self._dispatcher = Thread(
+            name='PriorityProcessPoolExecutor-%d' % self._counter(),
+            target=self._dispatch,
+            daemon=True,
+        )
+        self._dispatcher.start()
+
+    def submit(
+        self,
+        task: Task,
+        *args,
+        priority: int = 0,
+        **kwargs
+    ) -> Future:
+        """提交任务到进程池
+
+        Args:
+            task: 要执行的可调用对象，必须可以被 pickle 序列化
+            *args: 传递给 task 的位置参数
+            priority: 任务优先级，值越小越优先执行。默认为 0
+            **kwargs: 传递给 task 的关键字参数
+
+        Returns:
+            Future: 表示异步执行的任务
+
+        Raises:
+            RuntimeError: 当进程池已关闭或不可用时
+        """
+        with self._shutdown_lock:
+            if self._broken:
+                raise RuntimeError(self._broken)
+            if self._shutdown:
+                raise RuntimeError('进程池已关闭，无法提交任务')
+
+            f = Future()
+            w = _PriorityWorkItem(priority, f, task, args, kwargs)
+
+            self._queue.put((priority, self._task_counter, w))
+            self._task_counter += 1
+
+            return f
+
+    def _dispatch(self):
+        """调度线程的主循环，按优先级成批取出任务并发送给子进程"""
+        try:
+            while True:
+                self._slots.acquire()
+                _, _, work_item = self._queue.get(block=True)
+
+                if isinstance(work_item, _ShutdownSentinel):
+                    # 不再提交新批次，已在途的批次仍会执行完毕
+                    self._pool.shutdown(wait=False)
+                    return
+
+                chunk = [work_item]
+                while len(chunk) < self._chunksize:
+                    try:
+                        item = self._queue.get_nowait()
+                    except Empty:
+                        break
+                    if isinstance(item[2], _ShutdownSentinel):
+                        # 放回哨兵，先发送当前批次
+                        self._queue.put(item)
+                        break
+                    chunk.append(item[2])
+
+                chunk = [w for w in chunk if w.future.set_running_or_notify_cancel()]
+                if not chunk:
+                    self._slots.release()
+                    continue
+
+                try:
+                    pf = self._pool.submit(_run_process_chunk, [(w.task, w.args, w.kwargs) for w in chunk])
+                except BaseException as exc:
+                    self._slots.release()
+                    self._set_chunk_exception(chunk, exc)
+                    continue
+
+                pf.add_done_callback(partial(self._on_chunk_done, chunk))
+        except BaseException:
+            LOGGER.critical('Exception in dispatcher', exc_info=True)
+
+    def _on_chunk_done(self, chunk: list[_PriorityWorkItem], pf: Future):
+        """批次执行完毕，将结果分发到各任务的 future"""
+        self._slots.release()
+
+        try:
+            results = pf.result()
+        except BaseException as exc:
+            self._set_chunk_exception(chunk, exc)
+            return
+
+        for w, (ok, value) in zip(chunk, results):
+            if ok:
+                w.future.set_result(value)
+            else:
+                w.future.set_exception(value)
+
+    def _set_chunk_exception(self, chunk: list[_PriorityWorkItem], exc: BaseException):
+        """批次无法执行（序列化失败、子进程崩溃等），将异常设置到各任务"""
+        if isinstance(exc, BrokenExecutor):
+            with self._shutdown_lock:
+                self._broken = '子进程异常退出，进程池不再可用'
+        for w in chunk:
+            w.future.set_exception(exc)
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False):
+        """关闭进程池
+
+        Args:
+            wait: 是否等待所有任务完成。默认为 True
+            cancel_futures: 是否取消所有待执行的任务。默认为 False
+        """
+        with self._shutdown_lock:
+            self._shutdown = True
+            if cancel_futures:
+                while True:
+                    try:
+                        _, _, work_item = self._queue.get_nowait()
+                    except Empty:
+                        break
+                    if not isinstance(work_item, _ShutdownSentinel):
+                        work_item.future.cancel()
+
+            # 哨兵排在所有任务之后，保证已提交的任务执行完毕
+            self._queue.put((float('inf'), -1, _ShutdownSentinel()))
+
+        if wait:
+            self._dispatcher.join()
+            self._pool.shutdown(wait=True)
+
+    def __enter__(self):
+        """支持上下文管理器"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """自动关闭进程池"""
+        self.shutdown(wait=True)
+        return False
+
+
+class SamplingProfiler:
+    """采样分析器
+
+    在后台线程中按固定间隔采样所有线程的调用栈 (`sys._current_frames()`)，
+    并借助 `StackThread` 记录的调用关系，将子线程的样本归属到父线程的调用栈下，
+    最终输出折叠栈格式 (collapsed stack)，可直接用于 flamegraph.pl、speedscope 等工具生成火焰图。
+
+    采样时只记录代码对象，函数名在输出时才解析，开销远低于跟踪式分析器。
+
+    Args:
+        interval (float, optional): 采样间隔 (秒). 默认为 0.01.
+        stitch (bool, optional): 是否拼接父线程调用栈. 默认为 True.
+        by_thread (bool, optional): 是否以线程名作为调用栈的根节点. 默认为 False.
+        name (str, optional): 采样线程名称. 默认为 'SamplingProfiler'.
+
+    Raises:
+        ValueError: 当 interval <= 0 时抛出
+
+    Examples:
+
+        >>> with SamplingProfiler(interval=0.005) as profiler:
+        ...     server.serve_for(60)
+        >>> profiler.write_collapsed('profile.folded')
+    """
+
+    def __init__(self, interval: float = 0.01, *, stitch: bool = True, by_thread: bool = False, name: str = 'SamplingProfiler'):
+        if interval <= 0:
+            raise ValueError('interval 必须大于 0')
+
+        self.interval = interval
+        self.stitch = stitch
+        self.by_thread = by_thread
+        self.name = name
+        self._counts: dict[tuple, int] = {}
+        self._samples = 0
+        self._lock = Lock()
+        self._stopped = Event()
+        self._thread: Thread | None = None
+
+    @property
+    def samples(self) -> int:
+        """采样次数"""
+        return self._samples
+
+    def start(self):
+        """开始采样"""
+        if self._thread is not None and self._thread.is_alive():
+            raise RuntimeError('采样分析器已启动')
+
+        self._stopped.clear()
+        self._thread = Thread(name=self.name, target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止采样"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def reset(self):
+        """清空已采集的样本"""
+        with self._lock:
+            self._counts.clear()
+            self._samples = 0
+
+    def _run(self):
+        own = get_ident()
+        while not self._stopped.wait(self.interval):
+            self.sample(exclude=own)
+
+    def sample(self, exclude: int | None = None):
+        """采样一次所有线程的调用栈
+
+        Args:
+            exclude (int, optional): 不采样的线程标识符. 默认为 None.
+        """
+        threads = {t.ident: t for t in enumerate()}
+        frames = sys._current_frames()
+
+        with self._lock:
+            for ident, frame in frames.items():
+                if ident == exclude:
+                    continue
+
+                thread = threads.get(ident)
+                codes = tuple(StackThread._walk(frame))
+                if self.stitch and thread is not None and (inherited := StackThread._inherited(thread)):
+                    codes = inherited + codes
+                if self.by_thread:
+                    codes = (thread.name if thread is not None else str(ident), ) + codes
+
+                self._counts[codes] = self._counts.get(codes, 0) + 1
+            self._samples += 1
+
+    @staticmethod
+    def _label(code: CodeType | str) -> str:
+        if isinstance(code, str):
+            return code
+        return f'{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+    def collapsed(self) -> list[str]:
+        """获取折叠栈格式的结果
+
+        Returns:
+            list[str]: 每行格式为 `根函数;...;叶函数 样本数`，按样本数降序排列
+        """
+        with self._lock:
+            counts = list(self._counts.items())
+
+        lines: dict[str, int] = {}
+        for codes, count in counts:
+            # 分号是折叠栈的分隔符，样本数以最后一个空格分隔
+            stack = ';'.join(self._label(code).replace(';', ':') for code in codes)
+            lines[stack] = lines.get(stack, 0) + count
+
+        return [f'{stack} {count}' for stack, count in sorted(lines.items(), key=lambda x: -x[1])]
+
+    def write_collapsed(self, path: str):
+        """将折叠栈格式的结果写入文件
+
+        Args:
+            path (str): 文件路径
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            f.writelines(line + '\n' for line in self.collapsed())
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        return False
+
+
+_DROPPED = object()
+"""流水线中出错被丢弃的数据的占位对象"""
+
+
+class _Stage:
+    """流水线的一个阶段"""
+
+    def __init__(self, name: str, fn: Callable, workers: int, maxsize: int, batch_size: int, batch_timeout: float):
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self.queue = Queue(maxsize)
+        self.lock = Lock()
+        self.alive = workers
+        self.processed = 0
+        self.errors = 0
+        self.busy_time = 0.0
+        self.latency_max = 0.0
+
+    def record(self, count: int, errors: int, elapsed: float):
+        with self.lock:
+            self.processed += count
+            self.errors += errors
+            self.busy_time += elapsed
+            if count and elapsed / count > self.latency_max:
+                self.latency_max = elapsed / count
+
+
+class Pipeline:
+    """多阶段有界流水线
+
+    每个阶段拥有独立的工作线程数与有界队列，下游处理不过来时队列写满，
+    上游的 `put` 随之阻塞，从而将背压逐级传递到数据源。
+
+    Args:
+        ordered (bool, optional): 是否按输入顺序输出结果. 默认为 False.
+        collect (bool, optional): 是否收集最后一个阶段的结果，收集时需要通过 `get` 或迭代取出结果，
+            否则结果队列写满后会阻塞流水线. 默认为 True.
+        output_maxsize (int, optional): 结果队列的最大长度，小于等于 0 时不限制. 默认为 1024.
+        on_error (Callable[[BaseException, Any, str], Any], optional): 阶段函数抛出异常时的回调，
+            参数为 (异常, 数据, 阶段名称)，出错的数据会被丢弃. 默认输出错误日志.
+
+    Examples:
+
+        >>> pipeline = Pipeline(ordered=True)
+        >>> pipeline.add_stage(parse, workers=2, maxsize=256)
+        >>> pipeline.add_stage(enrich, workers=4)
+        >>> pipeline.add_stage(persist_many, batch_size=64, batch_timeout=0.05)
+        >>> pipeline.start()
+        >>>
+        >>> server = ServerSocket(protocol='UDP', bind=('0.0.0.0', 8080), on_recv=lambda data, *_: pipeline.put(data))
+        >>> for result in pipeline:
+        ...     print(result)
+    """
+
+    def __init__(
+        self,
+        *,
+        ordered: bool = False,
+        collect: bool = True,
+        output_maxsize: int = 1024,
+        on_error: Callable[[BaseException, Any, str], Any] | None = None,
+    ):
+        self.ordered = ordered
+        self.collect = collect
+        self.on_error = on_error or self._log_error
+        self._stages: list[_Stage] = []
+        self._output = Queue(output_maxsize)
+        self._threads: list[Thread] = []
+        self._counter = itertools.count().__next__
+        self._reorder: list[tuple[int, Any]] = []
+        self._next_seq = 0
+        self._reorder_lock = Lock()
+        self._started = None
+        self._closed = False
+
+    def add_stage(
+        self,
+        fn: Callable,
+        *,
+        workers: int = 1,
+        maxsize: int = 128,
+        batch_size: int = 1,
+        batch_timeout: float = 0.01,
+        name: str | None = None,
+    ) -> 'Pipeline':
+        """添加阶段
+
+        Args:
+            fn (Callable): 处理函数，batch_size 为 1 时参数为单个数据，返回处理结果；
+                batch_size 大于 1 时参数为数据列表，返回等长的结果列表
+            workers (int, optional): 工作线程数. 默认为 1.
+            maxsize (int, optional): 阶段输入队列的最大长度，小于等于 0 时不限制. 默认为 128.
+            batch_size (int, optional): 每批最多处理的数据数. 默认为 1.
+            batch_timeout (float, optional): 凑批的最长等待时间 (秒). 默认为 0.01.
+            name (str, optional): 阶段名称，默认为函数名
+
+        Returns:
+            Pipeline: 流水线本身，便于链式调用
+
+        Raises:
+            RuntimeError: 流水线已启动
+            ValueError: workers 或 batch_size 小于等于 0
+        """
+        if self._started is not None:
+            raise RuntimeError('流水线已启动，无法添加阶段')
+        if workers <= 0:
+            raise ValueError('workers 必须大于 0')
+        if batch_size <= 0:
+            raise ValueError('batch_size 必须大于 0')
+
+        name = name or getattr(fn, '__name__', None) or 'stage-%d' % len(self._stages)
+        self._stages.append(_Stage(name, fn, workers, maxsize, batch_size, batch_timeout))
+        return self
+
+    def start(self) -> 'Pipeline':
+        """启动所有阶段的工作线程"""
+        if not self._stages:
+            raise RuntimeError('流水线没有任何阶段')
+        if self._started is not None:
+            raise RuntimeError('流水线已启动')
+
+        self._started = perf_counter()
+        for index in range(len(self._stages)):
+            stage = self._stages[index]
+            for i in range(stage.workers):
+                t = StackThread(target=self._worker, args=(index, ), name='Pipeline-%s_%d' % (stage.name, i), daemon=True)
+                t.start()
+                self._threads.append(t)
+        return self
+
+    def put(self, item: Any, block: bool = True, timeout: float | None = None):
+        """向流水线输入数据，第一个阶段的队列已满时阻塞
+
+        Raises:
+            RuntimeError: 流水线未启动或已关闭
+            queue.Full: 非阻塞或超时时队列已满
+        """
+        if self._started is None or self._closed:
+            raise RuntimeError('流水线未启动或已关闭')
+        self._stages[0].queue.put((self._counter(), item), block, timeout)
+
+    def get(self, block: bool = True, timeout: float | None = None) -> Any:
+        """取出一个结果
+
+        Raises:
+            queue.Empty: 非阻塞或超时时没有结果
+            StopIteration: 流水线已关闭且所有结果均已取出
+        """
+        item = self._output.get(block, timeout)
+        if isinstance(item, _ShutdownSentinel):
+            # 放回结束标记，以便其他消费者也能收到
+            self._output.put(item)
+            raise StopIteration
+        return item
+
+    def __iter__(self):
+        while True:
+            try:
+                yield self.get()
+            except StopIteration:
+                return
+
+    def close(self):
+        """停止接收新数据，已输入的数据处理完毕后各阶段依次退出"""
+        if self._closed:
+            return
+        self._closed = True
+        for _ in range(self._stages[0].workers):
+            self._stages[0].queue.put(_ShutdownSentinel())
+
+    def join(self, timeout: float | None = None):
+        """等待所有工作线程退出"""
+        for t in self._threads:
+            t.join(timeout)
+
+    def stats(self) -> list[dict[str, Any]]:
+        """获取各阶段指标
+
+        Returns:
+            list[dict[str, Any]]: 各阶段的 `{name, workers, queued, processed, errors, throughput, latency_avg, latency_max}`,
+                throughput 为启动以来每秒处理的数据数，latency 为单个数据的处理时长 (秒)
+        """
+        elapsed = perf_counter() - self._started if self._started is not None else 0
+        result = []
+        for stage in self._stages:
+            with stage.lock:
+                result.append({
+                    'name': stage.name,
+                    'workers': stage.workers,
+                    'queued': stage.queue.qsize(),
+                    'processed': stage.processed,
+                    'errors': stage.errors,
+                    'throughput': stage.processed / elapsed if elapsed else 0.0,
+                    'latency_avg': stage.busy_time / stage.processed if stage.processed else 0.0,
+                    'latency_max': stage.latency_max,
+                })
+        return result
+
+    def _worker(self, index: int):
+        stage = self._stages[index]
+        stop = False
+
+        while not stop:
+            first = stage.queue.get()
+            if isinstance(first, _ShutdownSentinel):
+                break
+
+            batch = [first]
+            if stage.batch_size > 1:
+                deadline = perf_counter() + stage.batch_timeout
+                while len(batch) < stage.batch_size:
+                    try:
+                        item = stage.queue.get(timeout=max(deadline - perf_counter(), 0))
+                    except Empty:
+                        break
+                    if isinstance(item, _ShutdownSentinel):
+                        stop = True
+                        break
+                    batch.append(item)
+
+            self._process(index, stage, batch)
+
+        with stage.lock:
+            stage.alive -= 1
+            last = stage.alive == 0
+
+        # 本阶段全部退出后通知下一阶段
+        if last:
+            if index + 1 < len(self._stages):
+                for _ in range(self._stages[index + 1].workers):
+                    self._stages[index + 1].queue.put(_ShutdownSentinel())
+            elif self.collect:
+                self._output.put(_ShutdownSentinel())
+
+    def _process(self, index: int, stage: _Stage, batch: list[tuple[int, Any]]):
+        """处理一批数据，并交给下一阶段"""
+        # 出错的数据以 _DROPPED 占位，保证有序输出时序号连续
+        dropped = _DROPPED
+        items = [(seq, value) for seq, value in batch if value is not dropped]
+        results = [(seq, dropped) for seq, value in batch if value is dropped]
+        errors = 0
+
+        start = perf_counter()
+        if stage.batch_size > 1 and items:
+            try:
+                values = stage.fn([value for _, value in items])
+                if len(values) != len(items):
+                    raise ValueError(f'阶段 "{stage.name}" 返回的结果数 {len(values)} 与输入数 {len(items)} 不一致')
+                results.extend((seq, value) for (seq, _), value in zip(items, values))
+            except BaseException as exc:
+                errors = len(items)
+                results.extend((seq, dropped) for seq, _ in items)
+                self._report_error(exc, [value for _, value in items], stage.name)
+        else:
+            for seq, value in items:
+                try:
+                    results.append((seq, stage.fn(value)))
+                except BaseException as exc:
+                    errors += 1
+                    results.append((seq, dropped))
+                    self._report_error(exc, value, stage.name)
+        stage.record(len(items), errors, perf_counter() - start)
+
+        if index + 1 < len(self._stages):
+            put = self._stages[index + 1].queue.put
+            for item in results:
+                put(item)
+        else:
+            for item in results:
+                self._emit(item)
+
+    def _emit(self, item: tuple[int, Any]):
+        """输出最后一个阶段的结果"""
+        if not self.collect:
+            return
+
+        dropped = _DROPPED
+        if not self.ordered:
+            if item[1] is not dropped:
+                self._output.put(item[1])
+            return
+
+        with self._reorder_lock:
+            heapq.heappush(self._reorder, item)
+            while self._reorder and self._reorder[0][0] == self._next_seq:
+                _, value = heapq.heappop(self._reorder)
+                self._next_seq += 1
+                if value is not dropped:
+                    self._output.put(value)
+
+    def _report_error(self, exc: BaseException, item: Any, stage: str):
+        try:
+            self.on_error(exc, item, stage)
+        except BaseException:
+            LOGGER.exception('on_error 中出现异常：')
+
+    @staticmethod
+    def _log_error(exc: BaseException, item: Any, stage: str):
+        LOGGER.error('流水线阶段 "%s" 处理数据 %r 时出现异常', stage, item, exc_info=exc)
+
+
 def get_current_name():
     """获取当前线程的名称"""
     return current_thread().name
@@ -282,3 +282,618 @@ def test_singleton_decorator():
     assert obj1.b == 2
     assert obj2.a == 1
     assert obj2.b == 2
+
+
+def test_memoize_lru():
+    mock_func = MagicMock(side_effect=lambda x: x * 2)
+    cached = func_util.memoize(maxsize=2)(mock_func)
+
+    assert cached(1) == 2
+    assert cached(2) == 4
+    assert cached(1) == 2
+    assert cached(3) == 6  # 淘汰最久未使用的 2
+    assert cached(2) == 4
+    assert mock_func.call_count == 4
+
+    info = cached.cache_info()
+    assert (info['hits'], info['misses'], info['evictions'], info['size']) == (1, 4, 2, 2)
+
+    assert cached.invalidate(2)
+    assert not cached.invalidate(2)
+    cached.cache_clear()
+    assert cached.cache_info()['size'] == 0
+
+
+def test_memoize_ttl_and_typed():
+    mock_func = MagicMock(side_effect=lambda x: x)
+    cached = func_util.memoize(ttl=0.05, typed=True)(mock_func)
+
+    cached(1)
+    cached(1.0)
+    cached(1)
+    assert mock_func.call_count == 2
+
+    sleep(0.1)
+    cached(1)
+    assert mock_func.call_count == 3
+    assert cached.cache_info()['expirations'] == 1
+
+
+def test_memoize_exception_not_cached():
+    mock_func = MagicMock(side_effect=[ValueError('test error'), 5])
+    cached = func_util.memoize(key=lambda x, **_: x)(mock_func)
+
+    with pytest.raises(ValueError):
+        cached(1, retry=False)
+    assert cached(1, retry=True) == 5
+    assert cached(1) == 5
+    assert mock_func.call_count == 2
+
+
+def test_memoize_single_flight():
+    import threading
+
+    release = threading.Event()
+    calls = []
+
+    @func_util.memoize()
+    def slow(x):
+        calls.append(x)
+        release.wait(2)
+        return x + 1
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(slow(1))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join(2)
+
+    assert calls == [1]
+    assert results == [2] * 5
+
+
+def test_async_log_and_catch():
+    import asyncio
+
+    logger = MagicMock()
+    catch_logger = MagicMock()
+    on_except = MagicMock()
+
+    @func_util.catch(logger=catch_logger, on_except=on_except)
+    @func_util.log(logger=logger)
+    async def test_func(a):
+        await asyncio.sleep(0)
+        raise ValueError(a)
+
+    assert asyncio.iscoroutinefunction(test_func)
+    assert asyncio.run(test_func(1)) is None
+    logger.assert_called_once_with('调用 "test_func" 函数, 位置参数: (1,)')
+    catch_logger.assert_called_once()
+    assert isinstance(on_except.call_args[0][0], ValueError)
+
+
+def test_async_class_catch():
+    import asyncio
+
+    @func_util.class_catch(logger=MagicMock(), is_raise=True)
+    class TestClass:
+        async def method(self):
+            raise ValueError('test error')
+
+    with pytest.raises(ValueError, match='test error'):
+        asyncio.run(TestClass().method())
+
+
+def test_async_hook():
+    import asyncio
+
+    async def hook(mode, result, a):
+        if mode == 'after':
+            return result * 10
+
+    @func_util.hook(hook=hook)
+    async def test_func(a):
+        return a + 1
+
+    assert asyncio.run(test_func(1)) == 20
+
+
+def test_async_debounced_and_throttle():
+    import asyncio
+
+    debounced_calls = []
+    throttled_calls = []
+
+    @func_util.debounced(0.05, diff_params=True)
+    async def debounced_func(a):
+        debounced_calls.append(a)
+
+    @func_util.throttle(0.05)
+    async def throttled_func(a):
+        throttled_calls.append(a)
+        return a
+
+    async def main():
+        for a in [1, 2, 1, 2, 1]:
+            await debounced_func(a)
+            assert await throttled_func(a) in (1, None)
+        await asyncio.sleep(0.1)
+        assert await throttled_func(3) == 3
+
+    asyncio.run(main())
+    assert sorted(debounced_calls) == [1, 2]
+    assert throttled_calls == [1, 3]
+
+
+def test_debounced_no_thread_per_call():
+    import threading
+
+    mock_func = MagicMock()
+    debounced_func = func_util.debounced(0.1, diff_params=True)(mock_func)
+    debounced_func(0)
+    before = threading.active_count()
+    for i in range(200):
+        debounced_func(i % 5)
+    assert threading.active_count() <= before + 1
+    assert debounced_func.pending() == 5
+
+    sleep(0.3)
+    assert mock_func.call_count == 5
+    assert debounced_func.pending() == 0
+
+
+def test_debounced_flush_cancel_and_max_keys():
+    mock_func = MagicMock()
+    debounced_func = func_util.debounced(10, diff_params=True, max_keys=2)(mock_func)
+
+    debounced_func(1)
+    debounced_func(2)
+    debounced_func(3)  # 超出 max_keys，最早的调用立即执行
+    mock_func.assert_called_once_with(1)
+
+    assert debounced_func.flush() == 2
+    mock_func.assert_has_calls([call(1), call(2), call(3)])
+
+    debounced_func(4)
+    assert debounced_func.cancel() == 1
+    assert debounced_func.pending() == 0
+    assert mock_func.call_count == 3
+
+
+def test_throttle_keyed():
+    mock_func = MagicMock()
+    throttled_func = func_util.throttle(0.2, key=lambda device, value: device)(mock_func)
+
+    throttled_func('a', 1)
+    throttled_func('b', 1)
+    throttled_func('a', 2)
+    throttled_func('b', 2)
+    mock_func.assert_has_calls([call('a', 1), call('b', 1)])
+    assert mock_func.call_count == 2
+
+
+def test_throttle_trailing():
+    mock_func = MagicMock()
+    throttled_func = func_util.throttle(0.1, trailing=True)(mock_func)
+
+    for i in range(5):
+        throttled_func(i)
+    mock_func.assert_called_once_with(0)
+
+    sleep(0.2)
+    mock_func.assert_has_calls([call(0), call(4)])
+    assert mock_func.call_count == 2
+
+
+def test_throttle_thread_safe():
+    import threading
+
+    mock_func = MagicMock()
+    throttled_func = func_util.throttle(10)(mock_func)
+    barrier = threading.Barrier(8)
+
+    def worker():
+        barrier.wait()
+        for _ in range(100):
+            throttled_func()
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    mock_func.assert_called_once()
+
+
+def test_call_adapter_cache():
+    class Handler:
+        def on_event(self, a, b=2, *, c=3):
+            return a + b + c
+
+    handler = Handler()
+    assert func_util.call(handler.on_event, 1, 10, 100, b=20) == 24
+    assert func_util.call(handler.on_event, 1) == 6
+    assert func_util.call(Handler.on_event, handler, 1, c=30) == 33
+
+    def target(a, b=2):
+        return a + b
+
+    assert func_util.call(target, 1, 2, 3) == 3
+    assert target in func_util._call_adapters
+    assert Handler.on_event in func_util._method_adapters
+
+    # 不支持弱引用的内置函数不缓存
+    assert func_util.call(len, [1, 2], 3) == 2
+
+    del target
+    import gc
+    gc.collect()
+    assert len([f for f in func_util._call_adapters if f.__name__ == 'target']) == 0
+
+
+def test_catch_message_format():
+    logger = MagicMock()
+
+    @func_util.catch(logger=logger)
+    def test_func(a, b=None):
+        raise ValueError('test error')
+
+    test_func(1, b=2)
+    msg, tb = logger.call_args[0]
+    assert msg == "函数 test_func, 发生异常: ValueError: test error, 调用者: test_func, 位置参数: (1,), 关键字参数: {'b': 2}"
+    assert tb.startswith('错误回溯开始 test_func -> unknown ')
+    assert 'Traceback (most recent call last)' in tb
+
+
+def test_catch_rate_limit():
+    logger = MagicMock()
+    on_except = MagicMock()
+
+    @func_util.catch(logger=logger, on_except=on_except, rate_limit=2, rate_period=0.1)
+    def test_func(kind):
+        if kind:
+            raise ValueError(kind)
+        raise KeyError(kind)
+
+    for _ in range(10):
+        test_func(1)
+    test_func(0)
+    assert logger.call_count == 3
+    assert on_except.call_count == 11
+
+    sleep(0.15)
+    test_func(1)
+    assert logger.call_count == 4
+    assert '已抑制 8 次相同异常' in logger.call_args[0][0]
+
+
+def test_catch_structured_lazy_traceback():
+    records = []
+
+    @func_util.catch(logger=records.append, structured=True)
+    def test_func():
+        raise ValueError('test error')
+
+    test_func()
+    test_func()
+    record = records[-1]
+    assert isinstance(record, func_util.ExceptionRecord)
+    assert record._traceback is None
+    assert record.count == 2
+    assert record.raise_function == 'test_func'
+    assert record.exc_text == 'ValueError: test error'
+    assert 'ValueError: test error' in record.traceback
+
+
+def test_profile_registry():
+    import json
+
+    registry = func_util.LatencyRegistry()
+
+    @func_util.profile(registry=registry)
+    def fast(fail=False):
+        if fail:
+            raise ValueError('test error')
+
+    @func_util.profile(name='slow', registry=registry)
+    def slow():
+        sleep(0.01)
+
+    for _ in range(20):
+        fast()
+    with pytest.raises(ValueError):
+        fast(True)
+    slow()
+
+    snapshot = registry.snapshot()
+    fast_stats = snapshot[f'{fast.__module__}.{fast.__qualname__}']
+    assert (fast_stats['calls'], fast_stats['errors']) == (21, 1)
+    assert fast_stats['p50'] <= fast_stats['p99'] <= fast_stats['max']
+    assert 0.01 <= snapshot['slow']['max'] < 1
+    assert 0.0075 <= snapshot['slow']['p50'] <= snapshot['slow']['max']
+
+    assert json.loads(registry.export())['slow']['calls'] == 1
+    assert 'easy_pyoc_function_seconds_count{function="slow"} 1' in registry.export('prometheus')
+
+    registry.reset('slow')
+    assert registry.snapshot('slow')['slow']['calls'] == 0
+    assert registry.snapshot()[f'{fast.__module__}.{fast.__qualname__}']['calls'] == 21
+
+
+def test_profile_disabled_and_async():
+    import asyncio
+
+    registry = func_util.LatencyRegistry(enabled=False)
+
+    @func_util.profile(name='async', registry=registry)
+    async def test_func():
+        await asyncio.sleep(0)
+        return 1
+
+    assert asyncio.run(test_func()) == 1
+    assert registry.snapshot()['async']['calls'] == 0
+
+    registry.enable()
+    assert asyncio.run(test_func()) == 1
+    assert registry.snapshot()['async']['calls'] == 1
+
+
+def test_compose_matches_stacked():
+    def build(fused):
+        logs, errors, hooks = [], [], []
+        registry = func_util.LatencyRegistry()
+
+        def hook(mode, result, x):
+            hooks.append((mode, result))
+            if mode == 'before' and x == 'skip':
+                return ...
+            if mode == 'after' and x == 'override':
+                return 'overridden'
+
+        decorators = [
+            func_util.profile(name='f', registry=registry),
+            func_util.catch(lambda msg, tb: errors.append(msg)),
+            func_util.log(logs.append),
+            func_util.hook(hook),
+            func_util.throttle(0, key=lambda x: x),
+        ]
+
+        def f(x):
+            if x == 'fail':
+                raise ValueError(x)
+            return x * 2
+
+        if fused:
+            f = func_util.compose(*decorators)(f)
+        else:
+            for decorator in reversed(decorators):
+                f = decorator(f)
+
+        results = [f(x) for x in ['a', 'skip', 'override', 'fail']]
+        return results, logs, [e.split(', 调用者')[0] for e in errors], hooks, registry.snapshot('f')['f']['calls']
+
+    assert build(True) == build(False)
+
+    results, logs, errors, hooks, calls = build(True)
+    assert results == ['aa', None, 'overridden', None]
+    assert errors == ['函数 f, 发生异常: ValueError: fail']
+    assert calls == 4
+
+
+def test_compose_async_and_unsupported():
+    import asyncio
+
+    logger = MagicMock()
+
+    @func_util.compose(func_util.catch(logger), func_util.log(logger))
+    async def test_func(a):
+        raise ValueError(a)
+
+    assert asyncio.iscoroutinefunction(test_func)
+    assert asyncio.run(test_func(1)) is None
+    assert logger.call_count == 2
+    assert test_func.__name__ == 'test_func'
+    assert 'async def wrapper' in test_func.__fusion_source__
+
+    with pytest.raises(TypeError):
+        func_util.compose(func_util.memoize())
+
+
+def test_retry():
+    mock_func = MagicMock(side_effect=[TimeoutError(), TimeoutError(), 'ok'])
+    on_retry = MagicMock()
+    retried = func_util.retry(attempts=3, backoff=0.01, jitter=0.5, retry_on=TimeoutError, on_retry=on_retry)(mock_func)
+
+    assert retried() == 'ok'
+    assert mock_func.call_count == 3
+    assert on_retry.call_count == 2
+    assert retried.retry_stats() == {'calls': 1, 'successes': 1, 'retries': 2, 'failures': 0}
+
+    mock_func.side_effect = ValueError('test error')
+    with pytest.raises(ValueError):
+        retried()
+    assert mock_func.call_count == 4
+    assert retried.retry_stats()['failures'] == 1
+
+
+def test_retry_async():
+    import asyncio
+
+    calls = []
+
+    @func_util.retry(attempts=2, backoff=0.01)
+    async def test_func():
+        calls.append(1)
+        raise ConnectionError()
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(test_func())
+    assert len(calls) == 2
+
+
+def test_circuit_breaker():
+    mock_func = MagicMock(side_effect=TimeoutError())
+    guarded = func_util.circuit_breaker(failure_threshold=2, reset_timeout=0.05)(mock_func)
+
+    for _ in range(2):
+        with pytest.raises(TimeoutError):
+            guarded()
+    assert guarded.breaker.state == 'open'
+
+    with pytest.raises(func_util.CircuitOpenError):
+        guarded()
+    assert mock_func.call_count == 2
+
+    # 半开状态试探失败，重新打开
+    sleep(0.06)
+    assert guarded.breaker.state == 'half_open'
+    with pytest.raises(TimeoutError):
+        guarded()
+    assert guarded.breaker.state == 'open'
+
+    # 试探成功，关闭
+    sleep(0.06)
+    mock_func.side_effect = None
+    mock_func.return_value = 'ok'
+    assert guarded() == 'ok'
+
+    stats = guarded.breaker.stats()
+    assert stats['state'] == 'closed'
+    assert (stats['calls'], stats['failures'], stats['successes'], stats['rejected']) == (4, 3, 1, 1)
+    assert (stats['opened'], stats['half_opened'], stats['closed']) == (2, 2, 1)
+
+
+def test_retry_stops_on_open_circuit():
+    mock_func = MagicMock(side_effect=TimeoutError())
+    guarded = func_util.retry(attempts=5, backoff=0)(
+        func_util.circuit_breaker(failure_threshold=2, reset_timeout=10)(mock_func)
+    )
+
+    with pytest.raises(func_util.CircuitOpenError):
+        guarded()
+    assert mock_func.call_count == 2
+    assert guarded.breaker.stats()['rejected'] == 1
+
+
+def test_batched():
+    batches = []
+
+    @func_util.batched(max_size=3, max_delay=0.05)
+    def double_all(items):
+        batches.append(list(items))
+        return [ValueError(x) if x < 0 else x * 2 for x in items]
+
+    futures = [double_all(x) for x in [1, 2, 3, 4, -5]]
+    assert [f.result(1) for f in futures[:4]] == [2, 4, 6, 8]
+    with pytest.raises(ValueError):
+        futures[4].result(1)
+    assert batches == [[1, 2, 3], [4, -5]]
+
+    future = double_all(6)
+    assert double_all.pending() == 1
+    assert double_all.flush() == 1
+    assert future.result(0) == 12
+    assert double_all.pending() == 0
+
+
+def test_batched_error_and_async():
+    import asyncio
+
+    @func_util.batched(max_size=10, max_delay=0.01)
+    def broken(items):
+        return []
+
+    with pytest.raises(ValueError):
+        broken(1).result(1)
+
+    @func_util.batched(max_size=2, max_delay=0.01)
+    def forgot_return(items):
+        pass
+
+    with pytest.raises(TypeError):
+        forgot_return(1).result(1)
+
+    @func_util.batched(max_size=2, max_delay=0.01)
+    def doubled(items):
+        return (x * 2 for x in items)
+
+    futures = [doubled(x) for x in (1, 2)]
+    assert [f.result(1) for f in futures] == [2, 4]
+
+    batches = []
+
+    @func_util.batched(max_size=2, max_delay=0.01)
+    async def save(items):
+        batches.append(list(items))
+        await asyncio.sleep(0)
+        return [x + 1 for x in items]
+
+    async def main():
+        return await asyncio.gather(*(save(x) for x in range(5)))
+
+    assert asyncio.run(main()) == [1, 2, 3, 4, 5]
+    assert batches == [[0, 1], [2, 3], [4]]
+
+
+def test_profile_stripes_spread_across_threads():
+    import threading
+
+    registry = func_util.LatencyRegistry(stripes=8)
+
+    @func_util.profile(name='striped', registry=registry)
+    def test_func():
+        pass
+
+    barrier = threading.Barrier(8)
+
+    def worker():
+        barrier.wait()
+        for _ in range(100):
+            test_func()
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    counts = [stripe.calls for stripe in registry.get('striped').stripes]
+    assert sum(counts) == 800
+    assert sum(1 for c in counts if c) > 1
+
+
+def test_compose_trailing_throttle_shares_inner_state():
+    def build(fused, make_inner):
+        records = []
+
+        def f(x):
+            records.append(('call', x))
+            raise ValueError(x)
+
+        logger = lambda msg, tb: records.append(('log', msg.split(', 调用者')[0]))
+        decorators = [func_util.throttle(0.05, trailing=True), *make_inner(logger)]
+        if fused:
+            f = func_util.compose(*decorators)(f)
+        else:
+            for decorator in reversed(decorators):
+                f = decorator(f)
+
+        f(1)
+        f(2)
+        sleep(0.15)
+        return records
+
+    # 尾调用与正常调用共享 catch 的限流状态
+    rate_limited = lambda logger: [func_util.catch(logger, rate_limit=1)]
+    assert build(True, rate_limited) == build(False, rate_limited) == [
+        ('call', 1), ('log', '函数 f, 发生异常: ValueError: 1'), ('call', 2),
+    ]
+
+    # 尾调用与正常调用共享内层 throttle 的状态
+    inner_throttle = lambda logger: [func_util.catch(logger), func_util.throttle(10)]
+    assert build(True, inner_throttle) == build(False, inner_throttle) == [
+        ('call', 1), ('log', '函数 f, 发生异常: ValueError: 1'),
+    ]
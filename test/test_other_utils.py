@@ -1,6 +1,7 @@
 """测试其他工具模块"""
 
 import pytest
+import time
 from datetime import datetime, timedelta, timezone
 import tempfile
 import os
@@ -227,6 +228,487 @@ class TestThreadUtil:
         stack = thread_util.StackThread.get_brief_stack()
         assert isinstance(stack, list)
 
+    def test_stack_thread_stitch_parent(self):
+        """测试子线程调用栈拼接父线程调用栈"""
+        result = []
+
+        def child_task():
+            result.extend(thread_util.StackThread.get_brief_stack())
+
+        def parent_task():
+            t = thread_util.StackThread(target=child_task)
+            t.start()
+            t.join()
+
+        parent = thread_util.StackThread(target=parent_task)
+        parent.start()
+        parent.join()
+
+        assert result.index('test_stack_thread_stitch_parent') < result.index('parent_task') < result.index('child_task')
+
+    def test_stack_thread_set_parent(self):
+        """测试手动设置父线程"""
+        import threading
+        import queue
+
+        result = []
+        q = queue.Queue()
+        done = threading.Event()
+
+        def producer():
+            thread_util.StackThread.push_summary()
+            q.put(threading.get_ident())
+            done.wait(2)
+
+        def consumer():
+            threading.current_thread().set_parent(q.get())
+            result.extend(thread_util.StackThread.get_brief_stack())
+            done.set()
+
+        t1 = threading.Thread(target=producer)
+        t2 = thread_util.StackThread(target=consumer)
+        t2.start()
+        t1.start()
+        t1.join()
+        t2.join()
+
+        assert 'producer' in result
+        assert result.index('producer') < result.index('consumer')
+
+    def test_stack_thread_summary_cleanup(self):
+        """测试线程退出后清除记录的调用栈"""
+        import threading
+
+        idents = []
+
+        def producer():
+            thread_util.StackThread.push_summary()
+            idents.append(threading.get_ident())
+            assert threading.get_ident() in thread_util.StackThread._summary
+
+        t = threading.Thread(target=producer)
+        t.start()
+        t.join()
+
+        assert idents[0] not in thread_util.StackThread._summary
+
+    def test_stack_thread_summary_bound(self, monkeypatch):
+        """测试记录数量有上限"""
+        monkeypatch.setattr(thread_util.StackThread, 'max_summaries', 2)
+        thread_util.StackThread.push_summary()
+        for ident in range(-5, 0):
+            thread_util.StackThread._summary[ident] = (0, ())
+        thread_util.StackThread.push_summary()
+
+        assert len(thread_util.StackThread._summary) <= 2
+
+
+class TestTimerScheduler:
+    """共享定时调度器测试"""
+
+    def test_call_later_order(self):
+        """测试按到期时间执行"""
+        import time
+        import threading
+
+        result = []
+        done = threading.Event()
+        scheduler = thread_util.TimerScheduler()
+        scheduler.call_later(0.06, lambda: (result.append(3), done.set()))
+        scheduler.call_later(0.02, result.append, 1)
+        scheduler.call_later(0.04, result.append, 2)
+
+        assert done.wait(2)
+        time.sleep(0.01)
+        scheduler.shutdown()
+        assert result == [1, 2, 3]
+
+    def test_cancel(self):
+        """测试取消定时任务"""
+        import time
+
+        result = []
+        scheduler = thread_util.TimerScheduler()
+        handle = scheduler.call_later(0.02, result.append, 1)
+        assert scheduler.pending() == 1
+        handle.cancel()
+        handle.cancel()
+        assert scheduler.pending() == 0
+
+        time.sleep(0.05)
+        scheduler.shutdown()
+        assert result == []
+
+    def test_compact(self):
+        """测试大量取消后整理队列"""
+        scheduler = thread_util.TimerScheduler()
+        handles = [scheduler.call_later(10, print) for _ in range(200)]
+        for handle in handles[:150]:
+            handle.cancel()
+
+        assert scheduler.pending() == 50
+        assert len(scheduler._heap) < 200
+        scheduler.shutdown()
+
+    def test_custom_executor(self):
+        """测试在指定执行器中执行回调"""
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+
+        names = []
+        done = threading.Event()
+        executor = ThreadPoolExecutor(thread_name_prefix='CustomTimer')
+        scheduler = thread_util.TimerScheduler(executor)
+        scheduler.call_later(0, lambda: (names.append(threading.current_thread().name), done.set()))
+
+        assert done.wait(2)
+        scheduler.shutdown()
+        executor.shutdown()
+        assert names[0].startswith('CustomTimer')
+
+    def test_shutdown(self):
+        """测试关闭后无法添加定时任务"""
+        scheduler = thread_util.TimerScheduler()
+        scheduler.call_later(10, print)
+        scheduler.shutdown()
+
+        assert scheduler.pending() == 0
+        with pytest.raises(RuntimeError):
+            scheduler.call_later(1, print)
+
+    def test_shared_stack_timer(self):
+        """测试共享定时器执行并保留调用栈"""
+        stack = []
+
+        def callback(value):
+            stack.extend(thread_util.StackThread.get_brief_stack())
+            stack.append(value)
+
+        def create_timer():
+            timer = thread_util.SharedStackTimer(0.02, callback, args=('ok', ))
+            timer.start()
+            return timer
+
+        timer = create_timer()
+        assert timer.is_alive()
+        timer.join(2)
+
+        assert not timer.is_alive()
+        assert stack[-1] == 'ok'
+        assert stack.index('create_timer') < stack.index('callback')
+
+    def test_shared_stack_timer_cancel(self):
+        """测试取消共享定时器"""
+        import time
+
+        result = []
+        timer = thread_util.SharedStackTimer(0.02, result.append, args=(1, ))
+        timer.start()
+        timer.cancel()
+        time.sleep(0.05)
+
+        assert result == []
+        assert timer.finished.is_set()
+
+
+class TestSamplingProfiler:
+    """采样分析器测试"""
+
+    def test_collapsed_stitch(self):
+        """测试子线程样本归属到父线程调用栈下"""
+        import time
+
+        def busy_child():
+            end = time.perf_counter() + 0.2
+            while time.perf_counter() < end:
+                pass
+
+        def spawn_child():
+            t = thread_util.StackThread(target=busy_child)
+            t.start()
+            t.join()
+
+        with thread_util.SamplingProfiler(interval=0.005) as profiler:
+            spawn_child()
+
+        assert profiler.samples > 0
+        lines = [line for line in profiler.collapsed() if 'busy_child' in line]
+        assert lines
+        stack, count = lines[0].rsplit(' ', 1)
+        assert int(count) > 0
+        frames = stack.split(';')
+        names = [f.split(' ')[0] for f in frames]
+        assert names.index('TestSamplingProfiler.test_collapsed_stitch') < names.index(
+            'TestSamplingProfiler.test_collapsed_stitch.<locals>.spawn_child'
+        ) < names.index('TestSamplingProfiler.test_collapsed_stitch.<locals>.busy_child')
+
+    def test_by_thread_and_write(self, tmp_path):
+        """测试按线程分组并写入文件"""
+        import threading
+
+        profiler = thread_util.SamplingProfiler(by_thread=True, stitch=False)
+        profiler.sample()
+        profiler.sample()
+
+        assert profiler.samples == 2
+        assert any(line.startswith(threading.current_thread().name + ';') for line in profiler.collapsed())
+
+        path = tmp_path / 'profile.folded'
+        profiler.write_collapsed(str(path))
+        assert path.read_text(encoding='utf-8').splitlines() == profiler.collapsed()
+
+        profiler.reset()
+        assert profiler.samples == 0
+        assert profiler.collapsed() == []
+
+    def test_invalid_interval(self):
+        """测试无效的采样间隔"""
+        with pytest.raises(ValueError):
+            thread_util.SamplingProfiler(interval=0)
+
+
+class TestWatchdog:
+    """卡死任务看门狗测试"""
+
+    def test_report_hung(self):
+        """测试报告执行时间超过阈值的任务"""
+        import threading
+
+        reports = []
+        release = threading.Event()
+        watchdog = thread_util.Watchdog(0.05, interval=0.01, on_hung=reports.append)
+
+        def slow_task():
+            release.wait(2)
+
+        def run_watched():
+            with watchdog.watch(slow_task):
+                slow_task()
+
+        t = thread_util.StackThread(target=run_watched, name='HungWorker')
+        t.start()
+        deadline = time.time() + 2
+        while not reports and time.time() < deadline:
+            time.sleep(0.01)
+
+        assert watchdog.stuck_count() == 1
+        assert watchdog.stats() == {'running': 1, 'stuck': 1, 'hung_total': 1}
+        release.set()
+        t.join()
+        watchdog.stop()
+
+        assert len(reports) == 1
+        report = reports[0]
+        assert report['label'].endswith('slow_task')
+        assert report['thread'] == 'HungWorker'
+        assert report['elapsed'] >= 0.05
+        assert report['stack'].index('test_report_hung') < report['stack'].index('run_watched') < report['stack'].index('slow_task')
+        assert watchdog.stuck_count() == 0
+
+    def test_fast_task_not_reported(self):
+        """测试未超过阈值的任务不被报告"""
+        reports = []
+        watchdog = thread_util.Watchdog(1, interval=0.01, on_hung=reports.append)
+        with watchdog.watch('fast'):
+            pass
+        watchdog.check()
+        watchdog.stop()
+
+        assert reports == []
+        assert watchdog.stats() == {'running': 0, 'stuck': 0, 'hung_total': 0}
+
+    def test_invalid_arguments(self):
+        """测试无效参数"""
+        with pytest.raises(ValueError):
+            thread_util.Watchdog(0)
+        with pytest.raises(ValueError):
+            thread_util.Watchdog(1, interval=0)
+
+
+class TestPipeline:
+    """多阶段流水线测试"""
+
+    def test_ordered(self):
+        """测试多线程阶段按输入顺序输出"""
+        import random
+
+        def parse(x):
+            time.sleep(random.random() / 1000)
+            return x * 2
+
+        pipeline = thread_util.Pipeline(ordered=True)
+        pipeline.add_stage(parse, workers=4).add_stage(lambda x: x + 1, workers=3).start()
+        for i in range(100):
+            pipeline.put(i)
+        pipeline.close()
+
+        assert list(pipeline) == [i * 2 + 1 for i in range(100)]
+        pipeline.join()
+        stats = pipeline.stats()
+        assert [s['name'] for s in stats] == ['parse', '<lambda>']
+        assert all(s['processed'] == 100 and s['errors'] == 0 for s in stats)
+
+    def test_unordered_and_errors(self):
+        """测试无序输出与出错数据被丢弃"""
+        errors = []
+
+        def check(x):
+            if x % 10 == 0:
+                raise ValueError(x)
+            return x
+
+        pipeline = thread_util.Pipeline(on_error=lambda e, item, stage: errors.append((item, stage)))
+        pipeline.add_stage(check, workers=3, name='check').start()
+        for i in range(50):
+            pipeline.put(i)
+        pipeline.close()
+
+        assert sorted(pipeline) == [i for i in range(50) if i % 10]
+        assert sorted(errors) == [(i, 'check') for i in range(0, 50, 10)]
+        assert pipeline.stats()[0]['errors'] == 5
+
+    def test_ordered_with_errors(self):
+        """测试有序输出时跳过出错的数据"""
+        def check(x):
+            if x == 3:
+                raise ValueError(x)
+            return x
+
+        pipeline = thread_util.Pipeline(ordered=True, on_error=lambda *args: None)
+        pipeline.add_stage(check, workers=2).add_stage(str, workers=2).start()
+        for i in range(6):
+            pipeline.put(i)
+        pipeline.close()
+
+        assert list(pipeline) == ['0', '1', '2', '4', '5']
+
+    def test_batch(self):
+        """测试按批处理"""
+        batches = []
+
+        def persist(items):
+            batches.append(len(items))
+            return [item * 10 for item in items]
+
+        pipeline = thread_util.Pipeline(ordered=True)
+        pipeline.add_stage(persist, batch_size=8, batch_timeout=0.05).start()
+        for i in range(20):
+            pipeline.put(i)
+        pipeline.close()
+
+        assert list(pipeline) == [i * 10 for i in range(20)]
+        assert max(batches) > 1
+        assert sum(batches) == 20
+
+    def test_backpressure(self):
+        """测试下游阻塞时上游 put 阻塞"""
+        import queue
+        import threading
+
+        release = threading.Event()
+        pipeline = thread_util.Pipeline(collect=False)
+        pipeline.add_stage(lambda x: x, maxsize=1)
+        pipeline.add_stage(lambda x: release.wait(2), maxsize=1)
+        pipeline.start()
+
+        with pytest.raises(queue.Full):
+            for i in range(10):
+                pipeline.put(i, timeout=0.05)
+
+        release.set()
+        pipeline.close()
+        pipeline.join()
+
+    def test_invalid_usage(self):
+        """测试无效用法"""
+        pipeline = thread_util.Pipeline()
+        with pytest.raises(RuntimeError):
+            pipeline.start()
+        with pytest.raises(RuntimeError):
+            pipeline.put(1)
+        with pytest.raises(ValueError):
+            pipeline.add_stage(print, workers=0)
+        with pytest.raises(ValueError):
+            pipeline.add_stage(print, batch_size=0)
+
+
+class TestRingChannel:
+    """环形缓冲通道测试"""
+
+    def test_basic(self):
+        """测试容量取整、批量读写与非阻塞读写"""
+        import queue
+
+        channel = thread_util.RingChannel(5)
+        assert channel.capacity == 8
+        assert channel.put_many(range(10), block=False) == 8
+        assert channel.full()
+        with pytest.raises(queue.Full):
+            channel.put(10, block=False)
+
+        assert channel.get_many(3) == [0, 1, 2]
+        assert channel.put_many([8, 9]) == 2
+        assert channel.get() == 3
+        assert channel.get_many() == [4, 5, 6, 7, 8, 9]
+        with pytest.raises(queue.Empty):
+            channel.get(timeout=0.01)
+        assert channel.get_many(block=False) == []
+
+    def test_close(self):
+        """测试关闭后取完剩余元素即结束"""
+        import threading
+
+        channel = thread_util.RingChannel(4)
+        channel.put_many([1, 2])
+
+        result = []
+        t = threading.Thread(target=lambda: result.extend(channel))
+        t.start()
+        channel.put(3)
+        channel.close()
+        t.join(2)
+
+        assert result == [1, 2, 3]
+        with pytest.raises(RuntimeError):
+            channel.put(4)
+
+    def test_multi_producer_timeout(self):
+        """测试多生产者通道在非阻塞或带超时时的写入"""
+        import queue
+
+        channel = thread_util.RingChannel(2, multi_producer=True)
+        assert channel.put_many([1], block=False, timeout=1) == 1
+        channel.put(2, block=False, timeout=1)
+        with pytest.raises(queue.Full):
+            channel.put(3, block=False, timeout=1)
+        assert channel.put_many([3], timeout=0.01) == 0
+
+        assert channel.get_many() == [1, 2]
+        assert channel.put_many([3, 4, 5], timeout=0.01) == 2
+
+    def test_multi_producer(self):
+        """测试多生产者在通道写满时等待，且每个生产者的元素保持顺序"""
+        import threading
+
+        channel = thread_util.RingChannel(16, multi_producer=True, spin=4)
+
+        def produce(n):
+            for i in range(0, 2000, 50):
+                channel.put_many([(n, j) for j in range(i, i + 50)])
+
+        producers = [threading.Thread(target=produce, args=(n, )) for n in range(4)]
+        for t in producers:
+            t.start()
+
+        received = []
+        while len(received) < 8000:
+            received.extend(channel.get_many(32, timeout=2))
+        for t in producers:
+            t.join(2)
+
+        for n in range(4):
+            assert [j for p, j in received if p == n] == list(range(2000))
+
 
 class TestJsonUtil:
     """JSON工具测试"""
@@ -1,8 +1,31 @@
 """测试 PriorityThreadPoolExecutor"""
 
 import time
+import asyncio
+import threading
 import pytest
-from easy_pyoc.utils.thread_util import PriorityThreadPoolExecutor
+from functools import partial
+from easy_pyoc.utils.thread_util import PriorityThreadPoolExecutor, PriorityProcessPoolExecutor, BucketPriorityQueue, Watchdog, TenantFairQueue
+
+
+def _double(x):
+    return x * 2
+
+
+def _fail():
+    raise ValueError("Test error")
+
+
+_init_value = None
+
+
+def _init_worker(value):
+    global _init_value
+    _init_value = value
+
+
+def _get_init_value():
+    return _init_value
 
 
 class TestPriorityThreadPoolExecutor:
@@ -189,3 +212,752 @@ class TestPriorityThreadPoolExecutor:
 
         assert len(results) == 100
         assert all(isinstance(r, int) for r in results)
+
+
+class TestBucketPriorityQueue:
+    """BucketPriorityQueue 及 'bucket' 队列执行器的测试类"""
+
+    def test_queue_order(self):
+        """测试按优先级出队，同优先级先进先出"""
+        q = BucketPriorityQueue(priority_range=(-2, 5))
+        for item in [(3, 'a'), (-2, 'b'), (5, 'c'), (3, 'd'), (0, 'e'), (-2, 'f')]:
+            q.put(item)
+
+        assert q.qsize() == 6
+        assert [q.get_nowait()[1] for _ in range(6)] == ['b', 'f', 'e', 'a', 'd', 'c']
+        assert q.empty()
+
+    def test_queue_refill(self):
+        """测试清空后的优先级再次入队"""
+        q = BucketPriorityQueue(priority_range=(0, 3))
+        q.put((1, 'a'))
+        assert q.get_nowait() == (1, 'a')
+        q.put((2, 'b'))
+        q.put((1, 'c'))
+        assert q.get_nowait() == (1, 'c')
+        assert q.get_nowait() == (2, 'b')
+
+    def test_invalid_range(self):
+        """测试无效的优先级范围"""
+        with pytest.raises(ValueError):
+            BucketPriorityQueue(priority_range=(5, 0))
+
+    def test_executor_priority_order(self):
+        """测试 'bucket' 队列执行器的优先级执行顺序"""
+        execution_order = []
+        event = threading.Event()
+
+        with PriorityThreadPoolExecutor(max_workers=1, queue_backend='bucket') as executor:
+            executor.submit(event.wait, 2)
+            futures = [
+                executor.submit(execution_order.append, task_id, priority=priority)
+                for task_id, priority in [(1, 10), (2, 1), (3, 5), (4, 0), (5, 1), (6, -3)]
+            ]
+            event.set()
+            for f in futures:
+                f.result()
+
+        assert execution_order == [6, 4, 2, 5, 3, 1]
+
+    def test_executor_priority_out_of_range(self):
+        """测试 'bucket' 队列执行器拒绝超出范围的优先级"""
+        with PriorityThreadPoolExecutor(
+            max_workers=1,
+            queue_backend='bucket',
+            priority_range=(0, 3),
+        ) as executor:
+            with pytest.raises(ValueError):
+                executor.submit(lambda: 1, priority=4)
+            with pytest.raises(ValueError):
+                executor.submit(lambda: 1, priority=0.5)
+            assert executor.submit(lambda: 1, priority=3).result() == 1
+
+    def test_executor_shutdown(self):
+        """测试最小优先级不为 -1 时仍能正常关闭"""
+        executor = PriorityThreadPoolExecutor(
+            max_workers=2,
+            queue_backend='bucket',
+            priority_range=(0, 3),
+        )
+        executor.submit(lambda: 1).result()
+        executor.shutdown(wait=True)
+
+        assert all(not t.is_alive() for t in executor._threads)
+
+    def test_invalid_backend(self):
+        """测试无效的队列实现"""
+        with pytest.raises(ValueError):
+            PriorityThreadPoolExecutor(queue_backend='list')
+
+
+class TestTenantFairQueue:
+    """TenantFairQueue 及 'fair' 队列执行器的测试类"""
+
+    class _Item:
+        def __init__(self, tenant, name):
+            self.tenant = tenant
+            self.name = name
+
+    def test_queue_weighted_share(self):
+        """测试租户之间按权重交替出队"""
+        q = TenantFairQueue(weights={'a': 2})
+        for i in range(6):
+            q.put((0, i, self._Item('a', f'a{i}')))
+        for i in range(3):
+            q.put((0, 10 + i, self._Item('b', f'b{i}')))
+
+        order = [q.get_nowait()[-1].name for _ in range(9)]
+        assert order == ['a0', 'b0', 'a1', 'a2', 'b1', 'a3', 'a4', 'b2', 'a5']
+        assert q.empty()
+
+    def test_queue_idle_tenant_no_credit(self):
+        """测试空闲租户重新入队时不会积攒额度"""
+        q = TenantFairQueue()
+        for i in range(4):
+            q.put((0, i, self._Item('a', f'a{i}')))
+        assert [q.get_nowait()[-1].name for _ in range(2)] == ['a0', 'a1']
+
+        q.put((0, 10, self._Item('b', 'b0')))
+        q.put((0, 11, self._Item('b', 'b1')))
+        order = [q.get_nowait()[-1].name for _ in range(4)]
+        assert order in (['a2', 'b0', 'a3', 'b1'], ['b0', 'a2', 'b1', 'a3'])
+
+    def test_invalid_weight(self):
+        """测试无效的权重"""
+        with pytest.raises(ValueError):
+            TenantFairQueue(weights={'a': 0})
+
+    def test_executor_fair_order(self):
+        """测试 'fair' 队列执行器在租户之间公平调度，租户内按优先级调度"""
+        execution_order = []
+        event = threading.Event()
+
+        with PriorityThreadPoolExecutor(max_workers=1, queue_backend='fair') as executor:
+            executor.submit(event.wait, 2)
+            time.sleep(0.05)
+            futures = [
+                executor.submit(execution_order.append, f'a{i}', tenant='a', priority=-i)
+                for i in range(4)
+            ]
+            futures += [
+                executor.submit(execution_order.append, f'b{i}', tenant='b')
+                for i in range(2)
+            ]
+            event.set()
+            for f in futures:
+                f.result()
+
+        assert execution_order == ['a3', 'b0', 'a2', 'b1', 'a1', 'a0']
+
+    def test_tenant_requires_fair(self):
+        """测试非 'fair' 队列指定 tenant"""
+        with PriorityThreadPoolExecutor(max_workers=1) as executor:
+            with pytest.raises(ValueError):
+                executor.submit(print, tenant='a')
+
+
+class TestPriorityThreadPoolExecutorStats:
+    """PriorityThreadPoolExecutor 运行指标的测试类"""
+
+    def test_stats_counts(self):
+        """测试任务完成、失败、取消计数"""
+        def failing_task():
+            raise ValueError("Test error")
+
+        executor = PriorityThreadPoolExecutor(max_workers=1)
+        executor.submit(time.sleep, 0.01).result()
+        executor.submit(failing_task).exception()
+
+        event = threading.Event()
+        executor.submit(event.wait, 2)
+        pending = [executor.submit(time.sleep, 0, priority=p) for p in (1, 1, 2)]
+        time.sleep(0.05)
+
+        stats = executor.stats()
+        assert stats['busy_workers'] == 1
+        assert stats['queue_depth'] == 3
+        assert stats['priorities'][1]['queued'] == 2
+        assert stats['priorities'][2]['queued'] == 1
+
+        executor.shutdown(wait=False, cancel_futures=True)
+        event.set()
+        executor.shutdown(wait=True)
+
+        stats = executor.stats()
+        assert all(f.cancelled() for f in pending)
+        assert stats['submitted'] == 6
+        assert stats['completed'] == 2
+        assert stats['failed'] == 1
+        assert stats['cancelled'] == 3
+        assert stats['queue_depth'] == 0
+        assert stats['busy_workers'] == 0
+
+    def test_stats_cancelled(self):
+        """测试已取消的任务出队时计为取消，不计入开始数与等待时长"""
+        event = threading.Event()
+
+        with PriorityThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(event.wait, 2, priority=-1)
+            group = [executor.submit(time.sleep, 0, tag='g') for _ in range(3)]
+            other = executor.submit(time.sleep, 0)
+            assert executor.cancel_group('g') == 3
+            event.set()
+            other.result(2)
+
+        stats = executor.stats()
+        assert all(f.cancelled() for f in group)
+        assert stats['cancelled'] == 3
+        assert stats['completed'] == 2
+        assert stats['priorities'][0]['started'] == 1
+        assert stats['queue_depth'] == 0
+
+    def test_stats_keyed(self):
+        """测试按键串行的任务逐个计入指标"""
+        def failing_task():
+            raise ValueError("Test error")
+
+        executor = PriorityThreadPoolExecutor(max_workers=1)
+        event = threading.Event()
+        executor.submit_keyed('a', event.wait, 2)
+        failed = executor.submit_keyed('a', failing_task)
+        cancelled = executor.submit_keyed('a', lambda: 1)
+        pending = [executor.submit_keyed('a', lambda: 2, priority=1) for _ in range(2)]
+        assert cancelled.cancel()
+        time.sleep(0.05)
+
+        stats = executor.stats()
+        assert stats['submitted'] == 5
+        assert stats['busy_workers'] == 1
+        assert stats['queue_depth'] == 4
+        assert stats['priorities'][1]['queued'] == 2
+
+        event.set()
+        assert failed.exception(2) is not None
+        for f in pending:
+            f.result(2)
+        executor.shutdown(wait=True)
+
+        stats = executor.stats()
+        assert stats['completed'] == 3
+        assert stats['failed'] == 1
+        assert stats['cancelled'] == 1
+        assert stats['queue_depth'] == 0
+        assert stats['busy_workers'] == 0
+
+    def test_stats_timing(self):
+        """测试等待时长、运行时长与利用率"""
+        with PriorityThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(time.sleep, 0.05)
+            executor.submit(time.sleep, 0.05).result()
+
+            level = executor.stats()['priorities'][0]
+            assert level['started'] == 2
+            assert level['run_max'] >= 0.05
+            assert level['run_avg'] >= 0.05
+            assert level['wait_max'] >= 0.04
+            assert 0 < executor.stats()['utilization'] <= 1
+
+    def test_stats_callback(self):
+        """测试定期回调"""
+        snapshots = []
+
+        with PriorityThreadPoolExecutor(
+            max_workers=1,
+            stats_callback=snapshots.append,
+            stats_interval=0.02,
+        ) as executor:
+            executor.submit(lambda: 1).result()
+            time.sleep(0.1)
+
+        assert snapshots
+        assert snapshots[-1]['completed'] == 1
+
+    def test_invalid_stats_arguments(self):
+        """测试无效的指标参数"""
+        with pytest.raises(ValueError):
+            PriorityThreadPoolExecutor(stats_interval=0)
+
+        with pytest.raises(TypeError):
+            PriorityThreadPoolExecutor(stats_callback="not_callable")
+
+
+class TestPriorityThreadPoolExecutorWatchdog:
+    """PriorityThreadPoolExecutor 看门狗的测试类"""
+
+    def test_stuck_workers(self):
+        """测试统计卡死的工作线程"""
+        reports = []
+        event = threading.Event()
+        watchdog = Watchdog(0.05, interval=0.01, on_hung=reports.append)
+
+        def hang():
+            event.wait(2)
+
+        with PriorityThreadPoolExecutor(max_workers=2, watchdog=watchdog) as executor:
+            executor.submit(hang)
+            executor.submit(lambda: 1).result()
+            time.sleep(0.15)
+
+            assert executor.stats()['stuck_workers'] == 1
+            event.set()
+
+        watchdog.stop()
+        assert executor.stats()['stuck_workers'] == 0
+        assert [r['label'] for r in reports] == [hang.__qualname__]
+        assert 'hang' in reports[0]['stack']
+
+
+class TestPriorityThreadPoolExecutorGroup:
+    """PriorityThreadPoolExecutor 任务去重与分组取消的测试类"""
+
+    def test_key_coalesce(self):
+        """测试 key 相同的待执行任务被合并"""
+        calls = []
+        event = threading.Event()
+
+        with PriorityThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(event.wait, 2)
+            f1 = executor.submit(calls.append, 1, key=('refresh', 1))
+            f2 = executor.submit(calls.append, 2, key=('refresh', 1))
+            f3 = executor.submit(calls.append, 3, key=('refresh', 2))
+            event.set()
+            f1.result()
+            f3.result()
+
+            assert f1 is f2
+            assert executor.stats()['coalesced'] == 1
+
+            # 任务开始执行后，相同 key 会提交新任务
+            f4 = executor.submit(calls.append, 4, key=('refresh', 1))
+            assert f4 is not f1
+            f4.result()
+
+        assert calls == [1, 3, 4]
+
+    def test_key_after_cancel(self):
+        """测试已取消的任务不参与合并"""
+        event = threading.Event()
+
+        with PriorityThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(event.wait, 2)
+            f1 = executor.submit(lambda: 1, key='k')
+            assert f1.cancel()
+            f2 = executor.submit(lambda: 2, key='k')
+            event.set()
+
+            assert f2 is not f1
+            assert f2.result() == 2
+
+    def test_key_reserved(self):
+        """测试 key 为保留参数，可调用对象被拒绝，需通过 partial 传递给 task"""
+        with PriorityThreadPoolExecutor(max_workers=1) as executor:
+            with pytest.raises(TypeError, match='partial'):
+                executor.submit(sorted, ['b', 'aa'], key=len)
+            assert executor.submit(partial(sorted, key=len), ['b', 'aa']).result() == ['b', 'aa']
+            assert executor.submit(sorted, ['b', 'aa'], key='sort').result() == ['aa', 'b']
+
+    def test_cancel_group(self):
+        """测试按分组取消待执行任务"""
+        event = threading.Event()
+
+        with PriorityThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(event.wait, 2)
+            discovery = [executor.submit(time.sleep, 0, tag='discovery') for _ in range(5)]
+            other = executor.submit(lambda: 'other', tag='other')
+
+            assert executor.cancel_group('discovery') == 5
+            assert executor.cancel_group('discovery') == 0
+            event.set()
+
+            assert other.result() == 'other'
+            assert all(f.cancelled() for f in discovery)
+
+    def test_cancel_group_releases_key(self):
+        """测试分组取消后 key 可以重新提交"""
+        event = threading.Event()
+
+        with PriorityThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(event.wait, 2)
+            f1 = executor.submit(lambda: 1, key='k', tag='g')
+            executor.cancel_group('g')
+            f2 = executor.submit(lambda: 2, key='k', tag='g')
+            event.set()
+
+            assert f1.cancelled()
+            assert f2.result() == 2
+            time.sleep(0.05)
+            assert not executor._pending_keys
+            assert not executor._pending_tags
+
+
+class TestPriorityThreadPoolExecutorDeadline:
+    """PriorityThreadPoolExecutor 最迟开始时间与 EDF 调度的测试类"""
+
+    def test_deadline_expired(self):
+        """测试超过最迟开始时间的任务被取消"""
+        calls = []
+
+        with PriorityThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(time.sleep, 0.1)
+            expired = executor.submit(calls.append, 1, deadline=0.02)
+            on_time = executor.submit(calls.append, 2, deadline=5)
+            on_time.result()
+
+            assert expired.cancelled()
+            assert executor.stats()['expired'] == 1
+            assert executor.stats()['cancelled'] == 0
+
+        assert calls == [2]
+
+    def test_edf_order(self):
+        """测试最早截止时间优先调度"""
+        execution_order = []
+        event = threading.Event()
+
+        with PriorityThreadPoolExecutor(max_workers=1, scheduling='edf') as executor:
+            executor.submit(event.wait, 2)
+            futures = [
+                executor.submit(execution_order.append, 1, priority=-5),
+                executor.submit(execution_order.append, 2, deadline=3),
+                executor.submit(execution_order.append, 3, deadline=1),
+                executor.submit(execution_order.append, 4, priority=-10),
+                executor.submit(execution_order.append, 5, deadline=2),
+            ]
+            event.set()
+            for f in futures:
+                f.result()
+
+        assert execution_order == [3, 5, 2, 4, 1]
+
+    def test_invalid_scheduling(self):
+        """测试无效的调度方式"""
+        with pytest.raises(ValueError):
+            PriorityThreadPoolExecutor(scheduling='fifo')
+
+        with pytest.raises(ValueError):
+            PriorityThreadPoolExecutor(scheduling='edf', queue_backend='bucket')
+
+
+class TestPriorityThreadPoolExecutorKeyed:
+    """PriorityThreadPoolExecutor 按键串行执行的测试类"""
+
+    def test_keyed_order(self):
+        """测试相同 key 的任务按提交顺序串行执行"""
+        results = {'a': [], 'b': []}
+        running = {'a': 0, 'b': 0}
+        overlap = []
+
+        def update(device, value):
+            running[device] += 1
+            if running[device] > 1:
+                overlap.append(device)
+            time.sleep(0.001)
+            results[device].append(value)
+            running[device] -= 1
+
+        with PriorityThreadPoolExecutor(max_workers=4) as executor:
+            futures = [
+                executor.submit_keyed(device, update, device, i)
+                for i in range(20)
+                for device in ('a', 'b')
+            ]
+            for f in futures:
+                f.result()
+
+        assert results == {'a': list(range(20)), 'b': list(range(20))}
+        assert overlap == []
+
+    def test_keyed_parallel(self):
+        """测试不同 key 的任务并行执行"""
+        barrier = threading.Barrier(2, timeout=2)
+
+        with PriorityThreadPoolExecutor(max_workers=2) as executor:
+            f1 = executor.submit_keyed('a', barrier.wait)
+            f2 = executor.submit_keyed('b', barrier.wait)
+            f1.result()
+            f2.result()
+
+    def test_keyed_exception_and_cancel(self):
+        """测试异常与取消不影响同 key 的后续任务"""
+        def failing_task():
+            raise ValueError("Test error")
+
+        event = threading.Event()
+
+        with PriorityThreadPoolExecutor(max_workers=2) as executor:
+            f1 = executor.submit_keyed('a', event.wait, 2)
+            f2 = executor.submit_keyed('a', failing_task)
+            f3 = executor.submit_keyed('a', lambda: 3)
+            f4 = executor.submit_keyed('a', lambda: 4)
+            assert f3.cancel()
+            event.set()
+
+            with pytest.raises(ValueError):
+                f2.result()
+            assert f3.cancelled()
+            assert f4.result() == 4
+
+    def test_keyed_cleanup(self):
+        """测试空闲 key 的队列被清除"""
+        with PriorityThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit_keyed(i % 5, lambda: None) for i in range(50)]
+            for f in futures:
+                f.result()
+            time.sleep(0.05)
+
+            assert executor._serial_queues == {}
+
+    def test_keyed_submit_failure(self):
+        """测试调度失败时抛出原异常，并取消期间追加到同 key 的任务"""
+        executor = PriorityThreadPoolExecutor(max_workers=1)
+        submit = executor._submit_serial
+        appended = []
+
+        def failing_submit(*args, **kwargs):
+            appended.append(executor.submit_keyed('k', lambda: 2))
+            raise RuntimeError('submit failed')
+
+        executor._submit_serial = failing_submit
+        with pytest.raises(RuntimeError, match='submit failed'):
+            executor.submit_keyed('k', lambda: 1)
+        assert appended[0].cancelled()
+        assert executor._serial_queues == {}
+
+        # 调度期间线程池被关闭并清除了队列
+        def shutdown_submit(*args, **kwargs):
+            executor.shutdown(wait=False, cancel_futures=True)
+            return submit(*args, **kwargs)
+
+        executor._submit_serial = shutdown_submit
+        with pytest.raises(RuntimeError, match='已关闭'):
+            executor.submit_keyed('k', lambda: 1)
+        assert executor._serial_queues == {}
+        executor.shutdown(wait=True)
+
+    def test_keyed_shutdown_cancel_futures(self):
+        """测试 shutdown(cancel_futures=True) 取消排队中的按键任务"""
+        started = threading.Event()
+        event = threading.Event()
+
+        def blocking():
+            started.set()
+            return event.wait(2)
+
+        executor = PriorityThreadPoolExecutor(max_workers=1)
+        running = executor.submit_keyed('a', blocking)
+        assert started.wait(2)
+        queued = [executor.submit_keyed('a', lambda: 1) for _ in range(2)]
+        queued += [executor.submit_keyed('k', lambda: 1) for _ in range(3)]
+
+        executor.shutdown(wait=False, cancel_futures=True)
+        assert all(f.cancelled() for f in queued)
+        assert executor._serial_queues == {}
+
+        event.set()
+        assert running.result(timeout=2) is True
+        executor.shutdown(wait=True)
+
+
+class TestPriorityThreadPoolExecutorAsyncio:
+    """PriorityThreadPoolExecutor 与 asyncio 协作的测试类"""
+
+    def test_run(self):
+        """测试在协程中等待任务结果"""
+        async def main(executor):
+            return await executor.run(lambda x: x * 2, 5, priority=-1)
+
+        with PriorityThreadPoolExecutor(max_workers=2) as executor:
+            assert asyncio.run(main(executor)) == 10
+
+    def test_run_exception(self):
+        """测试协程中抛出任务异常"""
+        def failing_task():
+            raise ValueError("Test error")
+
+        async def main(executor):
+            with pytest.raises(ValueError, match="Test error"):
+                await executor.run(failing_task)
+
+        with PriorityThreadPoolExecutor(max_workers=1) as executor:
+            asyncio.run(main(executor))
+
+    def test_run_cancel_from_asyncio(self):
+        """测试取消 asyncio task 时取消尚未开始的任务"""
+        event = threading.Event()
+        called = []
+
+        async def main(executor):
+            executor.submit(event.wait, 2)
+            task = asyncio.ensure_future(executor.run(called.append, 1))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            event.set()
+
+        with PriorityThreadPoolExecutor(max_workers=1) as executor:
+            asyncio.run(main(executor))
+
+        assert called == []
+
+    def test_run_cancel_from_future(self):
+        """测试任务被取消时等待方收到 CancelledError"""
+        event = threading.Event()
+
+        async def main(executor):
+            executor.submit(event.wait, 2)
+            task = asyncio.ensure_future(executor.run(time.sleep, 0))
+            await asyncio.sleep(0.05)
+            executor.shutdown(wait=False, cancel_futures=True)
+            event.set()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        executor = PriorityThreadPoolExecutor(max_workers=1)
+        asyncio.run(main(executor))
+        executor.shutdown(wait=True)
+
+    def test_submit_coroutine(self):
+        """测试在专用事件循环中运行协程"""
+        async def add(a, b):
+            await asyncio.sleep(0.01)
+            return a + b
+
+        with PriorityThreadPoolExecutor(max_workers=1, thread_name_prefix='Loop') as executor:
+            assert executor.submit_coroutine(add, 1, b=2).result(timeout=2) == 3
+
+    def test_submit_coroutine_priority(self):
+        """测试协程按优先级准入"""
+        execution_order = []
+        event = threading.Event()
+
+        async def blocker():
+            while not event.is_set():
+                await asyncio.sleep(0.01)
+
+        async def record(task_id):
+            execution_order.append(task_id)
+
+        with PriorityThreadPoolExecutor(max_workers=1, coroutine_concurrency=1) as executor:
+            first = executor.submit_coroutine(blocker)
+            futures = [
+                executor.submit_coroutine(record, task_id, priority=priority)
+                for task_id, priority in [(1, 10), (2, 1), (3, 5), (4, 0)]
+            ]
+            event.set()
+            first.result(timeout=2)
+            for f in futures:
+                f.result(timeout=2)
+
+        assert execution_order == [4, 2, 3, 1]
+
+    def test_submit_coroutine_cancel(self):
+        """测试取消 future 时取消正在运行的协程"""
+        cancelled = threading.Event()
+
+        async def forever():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with PriorityThreadPoolExecutor(max_workers=1) as executor:
+            f = executor.submit_coroutine(forever)
+            time.sleep(0.05)
+            assert f.cancel()
+            assert cancelled.wait(2)
+
+    def test_run_coroutine_function(self):
+        """测试 run 自动识别协程函数"""
+        async def get_thread_name():
+            return threading.current_thread().name
+
+        async def main(executor):
+            return await executor.run(get_thread_name)
+
+        with PriorityThreadPoolExecutor(max_workers=1, thread_name_prefix='Loop') as executor:
+            assert asyncio.run(main(executor)) == 'Loop_loop'
+
+    def test_invalid_coroutine_concurrency(self):
+        """测试无效的 coroutine_concurrency"""
+        with pytest.raises(ValueError):
+            PriorityThreadPoolExecutor(coroutine_concurrency=0)
+
+
+class TestPriorityProcessPoolExecutor:
+    """PriorityProcessPoolExecutor 的测试类"""
+
+    def test_basic_submit(self):
+        """测试基本的提交和执行"""
+        with PriorityProcessPoolExecutor(max_workers=2) as executor:
+            future = executor.submit(_double, 5)
+            assert future.result(timeout=10) == 10
+
+    def test_priority_execution_order(self):
+        """测试优先级执行顺序"""
+        execution_order = []
+
+        with PriorityProcessPoolExecutor(max_workers=1) as executor:
+            # 先占住唯一的工作进程，使后续任务在父进程中排队
+            blocker = executor.submit(time.sleep, 0.3)
+            time.sleep(0.1)
+
+            futures = []
+            for task_id, priority in [(1, 10), (2, 1), (3, 5), (4, 0)]:
+                f = executor.submit(_double, task_id, priority=priority)
+                f.add_done_callback(lambda _, task_id=task_id: execution_order.append(task_id))
+                futures.append(f)
+
+            blocker.result(timeout=10)
+            for f in futures:
+                f.result(timeout=10)
+
+        assert execution_order == [4, 2, 3, 1]
+
+    def test_exception_handling(self):
+        """测试异常处理"""
+        with PriorityProcessPoolExecutor(max_workers=2) as executor:
+            future = executor.submit(_fail)
+            with pytest.raises(ValueError, match="Test error"):
+                future.result(timeout=10)
+
+    def test_chunksize(self):
+        """测试成批发送任务"""
+        with PriorityProcessPoolExecutor(max_workers=2, chunksize=8) as executor:
+            futures = [executor.submit(_double, i, priority=i % 3) for i in range(50)]
+            assert [f.result(timeout=10) for f in futures] == [i * 2 for i in range(50)]
+
+    def test_initializer(self):
+        """测试进程初始化函数"""
+        with PriorityProcessPoolExecutor(
+            max_workers=1,
+            initializer=_init_worker,
+            initargs=('ready',),
+        ) as executor:
+            assert executor.submit(_get_init_value).result(timeout=10) == 'ready'
+
+    def test_cancel_futures(self):
+        """测试任务取消"""
+        executor = PriorityProcessPoolExecutor(max_workers=1)
+        futures = [executor.submit(time.sleep, 0.1) for _ in range(5)]
+        executor.shutdown(wait=True, cancel_futures=True)
+
+        assert sum(1 for f in futures if f.cancelled()) > 0
+
+    def test_invalid_arguments(self):
+        """测试无效参数"""
+        with pytest.raises(ValueError):
+            PriorityProcessPoolExecutor(max_workers=0)
+        with pytest.raises(ValueError):
+            PriorityProcessPoolExecutor(chunksize=0)
+        with pytest.raises(TypeError):
+            PriorityProcessPoolExecutor(initializer="not_callable")
+
+    def test_shutdown_after_submission(self):
+        """测试关闭后无法提交任务"""
+        executor = PriorityProcessPoolExecutor(max_workers=1)
+        executor.shutdown(wait=True)
+
+        with pytest.raises(RuntimeError):
+            executor.submit(_double, 1)
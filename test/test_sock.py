@@ -1,5 +1,62 @@
-from easy_pyoc import network_util
+import time
+import socket
+import threading
+
+from easy_pyoc import network_util, ServerSocket
+from easy_pyoc.utils.thread_util import Watchdog
 
 
 def test_send_WOL():
     network_util.send_WOL('001122334455')
+
+
+def test_server_watchdog():
+    reports = []
+    release = threading.Event()
+    watchdog = Watchdog(0.05, interval=0.01, on_hung=reports.append)
+
+    def on_recv(data, client_addr, send_back):
+        release.wait(2)
+
+    server = ServerSocket(protocol='UDP', bind=('127.0.0.1', 0), on_recv=on_recv, watchdog=watchdog)
+    server.start()
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as client:
+        client.sendto(b'ping', server.getsockname())
+
+    deadline = time.time() + 2
+    while not reports and time.time() < deadline:
+        time.sleep(0.01)
+    assert watchdog.stuck_count(server) == 1
+
+    release.set()
+    server.close()
+    watchdog.stop()
+
+    assert reports[0]['label'].endswith('on_recv')
+
+
+def test_server_handoff():
+    received = []
+    done = threading.Event()
+    receiver = None
+
+    def on_recv(data, client_addr, send_back):
+        nonlocal receiver
+        receiver = threading.current_thread()
+        received.append(data)
+        if len(received) == 3:
+            done.set()
+
+    server = ServerSocket(protocol='UDP', bind=('127.0.0.1', 0), on_recv=on_recv, handoff=8)
+    server.start()
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as client:
+        for data in [b'a', b'b', b'c']:
+            client.sendto(data, server.getsockname())
+
+    assert done.wait(2)
+    server.close()
+
+    # 关闭 UDP 套接字时 recvfrom 可能返回一个空包
+    assert received[:3] == [b'a', b'b', b'c']
+    assert receiver is not server.thread
+    assert server.channel.closed